@@ -18,19 +18,19 @@ from ocp_resources.dsc_initialization import DSCInitialization
 from ocp_resources.mariadb_operator import MariadbOperator
 from ocp_resources.namespace import Namespace
 from ocp_resources.package_manifest import PackageManifest
-from ocp_resources.pod import Pod
 from ocp_resources.resource import get_client
 
 from ocp_utilities.operators import install_operator
 
 from timeout_sampler import TimeoutSampler, TimeoutExpiredError
 
+from trustyai_tests.tests.informers import informer_cache
 from trustyai_tests.tests.utils import (
     log_namespace_events,
-    get_num_running_containers,
     log_namespace_pods,
     log_namespace_logs,
 )
+from trustyai_tests.tests.waiters import WaitCondition, get_num_started_containers, resource_waiter
 
 logger: logging.Logger = logging.getLogger(__name__)
 logging.basicConfig(stream=sys.stdout, level=logging.DEBUG)
@@ -125,25 +125,29 @@ def install_operators(client, operator_data):
 
 
 def verify_operator_running(client, operator_data):
-    """Make sure all operator pods are running"""
+    """Make sure all operator pods are running, waiting for all of them at the same time"""
     header("Verifying Operator Pods")
 
-    for operator in operator_data:
-        for target_pod_name in operator["correspondingPods"]:
-            sampler = TimeoutSampler(
-                wait_timeout=300,
-                sleep=RECHECK_INTERVAL,
-                func=lambda target_name: any(
-                    target_pod_name in pod.name and get_num_running_containers(pod) == 1
-                    for pod in Pod.get(dyn_client=client, namespace=operator["namespace"])
-                ),
-                print_func_log=False,
-                target_name=target_pod_name,
-            )
-
-            check_sampler(
-                sampler, f"{operator['name']} pod running", f"Timeout waiting for {operator['name']} pod to start"
-            )
+    conditions = [
+        WaitCondition(
+            api_version="v1",
+            kind="Pod",
+            namespace=operator["namespace"],
+            condition=lambda pods, target_name=target_pod_name: any(
+                target_name in pod.metadata.name and get_num_started_containers(pod=pod) == 1 for pod in pods
+            ),
+            description=f"running ({operator['name']} {target_pod_name})",
+            pod_name=target_pod_name,
+        )
+        for operator in operator_data
+        for target_pod_name in operator["correspondingPods"]
+    ]
+
+    try:
+        resource_waiter.wait_all(conditions=conditions, deadline=time.time() + 300)
+    except TimeoutError as e:
+        logger.error(e)
+        raise e
 
 
 # === ODH INSTALL ==================================================================================
@@ -209,6 +213,8 @@ def setup_cluster(args):
     namespaces = {od["name"]: od["namespace"] for od in operator_data}
 
     client = get_client()
+    # Waits and artifact logging read from the shared informers, which use the same client
+    informer_cache.client = client
 
     # make sure cluster is ready for operator installation
     if not args.skip_operators_installation:
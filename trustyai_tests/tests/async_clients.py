@@ -0,0 +1,401 @@
+import asyncio
+import http
+import json
+import logging
+import os
+from time import perf_counter
+from typing import Any, Awaitable, Callable, Optional, TypeVar
+from urllib.parse import urlparse
+
+import aiohttp
+from ocp_resources.inference_service import InferenceService
+from ocp_resources.namespace import Namespace
+
+from trustyai_tests.tests.constants import TRUSTYAI_SERVICE
+from trustyai_tests.tests.datasets import BatchFile, get_dataset_manifest
+from trustyai_tests.tests.endpoints import EndpointKind, endpoint_resolver
+from trustyai_tests.tests.tokens import get_ocp_token, invalidate_ocp_token
+from trustyai_tests.tests.trustyai_client import IDEMPOTENT_METHODS
+from trustyai_tests.tests.utils import (
+    OBSERVATION_TIMEOUT_SECONDS,
+    get_backoff_delays,
+    get_inference_url,
+    parse_trustyai_model_metadata,
+)
+
+logger: logging.Logger = logging.getLogger(__name__)
+
+MAX_CONCURRENCY_PER_HOST: int = 8
+
+T = TypeVar("T")
+
+
+class AsyncResponse:
+    """Body and status of an async request, exposing the same attributes the assertions use on requests.Response"""
+
+    def __init__(self, status_code: int, content: bytes, request_info: Optional[aiohttp.RequestInfo] = None):
+        self.status_code = status_code
+        self.content = content
+        self.request_info = request_info
+
+    @property
+    def text(self) -> str:
+        return self.content.decode("utf-8")
+
+    @property
+    def ok(self) -> bool:
+        return self.status_code < http.HTTPStatus.BAD_REQUEST
+
+    def json(self) -> Any:
+        return json.loads(self.content)
+
+    def raise_for_status(self) -> None:
+        if not self.ok:
+            raise aiohttp.ClientResponseError(
+                request_info=self.request_info, history=(), status=self.status_code, message=self.text[:200]
+            )
+
+
+class AsyncHTTPClient:
+    """
+    aiohttp session shared by the async helpers.
+
+    Each host gets its own semaphore, so no more than `max_concurrency_per_host` requests are in flight
+    against a single Route, however many coroutines are fanned out.
+    """
+
+    def __init__(self, max_concurrency_per_host: int = MAX_CONCURRENCY_PER_HOST):
+        self.max_concurrency_per_host = max_concurrency_per_host
+        self.session: Optional[aiohttp.ClientSession] = None
+        self._semaphores: dict[str, asyncio.Semaphore] = {}
+
+    async def __aenter__(self) -> "AsyncHTTPClient":
+        self.session = aiohttp.ClientSession(connector=aiohttp.TCPConnector(ssl=False, limit=0))
+        return self
+
+    async def __aexit__(self, *exc_info: Any) -> None:
+        await self.session.close()
+
+    def get_semaphore(self, url: str) -> asyncio.Semaphore:
+        host = urlparse(url).netloc
+        semaphore = self._semaphores.get(host)
+        if semaphore is None:
+            semaphore = asyncio.Semaphore(self.max_concurrency_per_host)
+            self._semaphores[host] = semaphore
+
+        return semaphore
+
+    async def request(
+        self, method: str, url: str, headers: Optional[dict[str, str]] = None, data: Any = None, json: Any = None
+    ) -> AsyncResponse:
+        async with self.get_semaphore(url=url):
+            async with self.session.request(method=method, url=url, headers=headers, data=data, json=json) as response:
+                return AsyncResponse(
+                    status_code=response.status, content=await response.read(), request_info=response.request_info
+                )
+
+
+def is_async_connect_failure(error: aiohttp.ClientConnectionError) -> bool:
+    """Whether the connection couldn't be established, so the server can't have received the request."""
+    return isinstance(error, (aiohttp.ClientConnectorError, aiohttp.ConnectionTimeoutError))
+
+
+async def get_trustyai_headers_async(namespace: Namespace) -> tuple[str, dict[str, str]]:
+    """TrustyAIService Route URL and request headers, from the endpoint and token caches shared with the sync client."""
+    base_url = await asyncio.to_thread(
+        endpoint_resolver.get_url, namespace=namespace.name, name=TRUSTYAI_SERVICE, kind=EndpointKind.ROUTE
+    )
+    token = await asyncio.to_thread(get_ocp_token, namespace=namespace)
+
+    return base_url, {"Authorization": f"Bearer {token}", "Content-Type": "application/json"}
+
+
+async def send_trustyai_service_request_async(
+    client: AsyncHTTPClient, namespace: Namespace, endpoint: str, method: str, data: Any = None, json: Any = None
+) -> AsyncResponse:
+    """
+    Async counterpart of `send_trustyai_service_request`, with the same retry rules as the sync TrustyAIClient.
+    If the token was rejected a new one is minted, and if the connection failed the Route is resolved again.
+    In both cases the request is retried once. A POST is only retried if the connection couldn't be established.
+
+    :param client (AsyncHTTPClient): Session the request is sent through.
+    :param namespace (Namespace): Namespace where the TrustyAIService lives.
+    :param endpoint (str): TrustyAI endpoint, e.g. /info.
+    :param method (str): HTTP method, either GET, POST or DELETE.
+    :param data (Any): Raw request body.
+    :param json (Any): JSON-serializable request body.
+    """
+    if method not in ("GET", "POST", "DELETE"):
+        raise ValueError(f"Unsupported HTTP method: {method}")
+
+    base_url, headers = await get_trustyai_headers_async(namespace=namespace)
+    try:
+        response = await client.request(
+            method=method, url=f"{base_url}{endpoint}", headers=headers, data=data, json=json
+        )
+        if response.status_code != http.HTTPStatus.UNAUTHORIZED:
+            return response
+        logger.info(f"TrustyAI request to {endpoint} was unauthorized. Refreshing token.")
+        invalidate_ocp_token(namespace=namespace)
+    except aiohttp.ClientConnectionError as e:
+        if method not in IDEMPOTENT_METHODS and not is_async_connect_failure(error=e):
+            raise
+        logger.info(f"Connection to TrustyAI service failed: {e}. Resolving route again.")
+        endpoint_resolver.invalidate(namespace=namespace.name, name=TRUSTYAI_SERVICE, kind=EndpointKind.ROUTE)
+
+    base_url, headers = await get_trustyai_headers_async(namespace=namespace)
+    return await client.request(method=method, url=f"{base_url}{endpoint}", headers=headers, data=data, json=json)
+
+
+async def get_trustyai_model_metadata_async(client: AsyncHTTPClient, namespace: Namespace) -> AsyncResponse:
+    return await send_trustyai_service_request_async(client=client, namespace=namespace, endpoint="/info", method="GET")
+
+
+async def get_num_observations_async(client: AsyncHTTPClient, namespace: Namespace, model_name: str) -> int:
+    """Number of observations TrustyAI has stored for a model, 0 if it doesn't know the model yet."""
+    response = await get_trustyai_model_metadata_async(client=client, namespace=namespace)
+    if response.status_code != http.HTTPStatus.OK:
+        return 0
+
+    model_metadata_list = parse_trustyai_model_metadata(model_metadata=response.content)
+    model_metadata = next((m for m in model_metadata_list if m.model_name == model_name), None)
+
+    return model_metadata.num_observations if model_metadata else 0
+
+
+async def wait_for_observations_async(
+    client: AsyncHTTPClient,
+    namespace: Namespace,
+    model_name: str,
+    expected: int,
+    timeout: float = OBSERVATION_TIMEOUT_SECONDS,
+) -> int:
+    """
+    Poll TrustyAI's /info with exponential backoff until it reports at least `expected` observations for a model.
+    Polls that fail are retried until the timeout expires, since they are often transient.
+
+    :return: The last observed count.
+    :raises TimeoutError: If TrustyAI didn't store the observations in time.
+    """
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout
+    observations, last_error = 0, None
+
+    for delay in get_backoff_delays():
+        try:
+            observations = await get_num_observations_async(client=client, namespace=namespace, model_name=model_name)
+            last_error = None
+        except aiohttp.ClientError as e:
+            logger.debug(f"Failed to get observations of {model_name} from TrustyAI: {e}")
+            last_error = e
+
+        if observations >= expected:
+            return observations
+        if loop.time() + delay >= deadline:
+            last_poll = f". Last poll failed: {last_error}" if last_error is not None else ""
+            raise TimeoutError(
+                f"TrustyAI stored {observations} observations of {model_name}, expected {expected}{last_poll}"
+            )
+        await asyncio.sleep(delay)
+
+
+async def post_inference_request_async(
+    client: AsyncHTTPClient,
+    namespace: Namespace,
+    inference_service: InferenceService,
+    data: bytes,
+    type: str = "modelmesh",
+    refresh: bool = False,
+) -> AsyncResponse:
+    """
+    Post a request body to an InferenceService, with a bearer token from the token cache.
+
+    :param refresh (bool): Resolve the inference URL through the API server even if it is cached.
+    """
+    url = await asyncio.to_thread(
+        get_inference_url, namespace=namespace, inference_service=inference_service, type=type, refresh=refresh
+    )
+    token = await asyncio.to_thread(get_ocp_token, namespace=namespace)
+
+    return await client.request(method="POST", url=url, headers={"Authorization": f"Bearer {token}"}, data=data)
+
+
+def read_batch_body(batch: BatchFile) -> bytes:
+    with open(batch.path, "rb") as file:
+        return file.read()
+
+
+async def send_data_to_inference_service_async(
+    client: AsyncHTTPClient,
+    namespace: Namespace,
+    inference_service: InferenceService,
+    data_path: str,
+    type: str = "modelmesh",
+    max_retries: int = 5,
+    retry_delay: int = 1,
+    num_batches: int = None,
+    window: int = None,
+    observation_timeout: float = OBSERVATION_TIMEOUT_SECONDS,
+) -> None:
+    """
+    Async counterpart of `send_batches_pipelined` for the REST endpoint of an InferenceService.
+    A batch is only sent once TrustyAI has stored the batch sent `window` batches before it, and at the end
+    /info is polled until every batch has been stored.
+
+    :param client (AsyncHTTPClient): Session the requests are sent through.
+    :param namespace (Namespace): Namespace where the InferenceService and TrustyAIService live.
+    :param inference_service (InferenceService): Model to send the batches to.
+    :param data_path (str): Directory containing the batch files.
+    :param type (str): Serving platform of the model, either modelmesh or kserve.
+    :param max_retries (int): Maximum number of attempts to send each batch.
+    :param retry_delay (int): Delay between attempts in seconds.
+    :param num_batches (int): Maximum number of batch files to send.
+    :param window (int): Maximum number of batches in flight. Batches are sent one at a time if not set.
+    :param observation_timeout (float): Maximum time in seconds to wait for TrustyAI to store a batch.
+    """
+    model_name = inference_service.name
+    window = window or 1
+    batches = await asyncio.to_thread(
+        lambda: get_dataset_manifest(data_path=data_path).batches(num_batches=num_batches)
+    )
+    expected_observations = [
+        await get_num_observations_async(client=client, namespace=namespace, model_name=model_name)
+    ]
+
+    for batch in batches:
+        if len(expected_observations) > window:
+            await wait_for_observations_async(
+                client=client,
+                namespace=namespace,
+                model_name=model_name,
+                expected=expected_observations[-window],
+                timeout=observation_timeout,
+            )
+
+        data = await asyncio.to_thread(read_batch_body, batch=batch)
+        for retry_count in range(1, max_retries + 1):
+            try:
+                response = await post_inference_request_async(
+                    client=client,
+                    namespace=namespace,
+                    inference_service=inference_service,
+                    data=data,
+                    type=type,
+                    refresh=retry_count > 1,
+                )
+                response.raise_for_status()
+                break
+            except aiohttp.ClientError as e:
+                logger.error(f"Error sending data for file: {os.path.basename(batch.path)}. Error: {str(e)}")
+                if retry_count == max_retries:
+                    raise
+                await asyncio.sleep(retry_delay)
+
+        expected_observations.append(expected_observations[-1] + batch.num_observations)
+
+    await wait_for_observations_async(
+        client=client,
+        namespace=namespace,
+        model_name=model_name,
+        expected=expected_observations[-1],
+        timeout=observation_timeout,
+    )
+    logger.info(f"Successfully sent {len(batches)} batches to {model_name}")
+
+
+def run_async(
+    func: Callable[..., Awaitable[T]],
+    *args: Any,
+    max_concurrency_per_host: int = MAX_CONCURRENCY_PER_HOST,
+    **kwargs: Any,
+) -> T:
+    """Run an async helper from sync code. The helper gets a fresh AsyncHTTPClient as its first argument."""
+
+    async def _run() -> T:
+        async with AsyncHTTPClient(max_concurrency_per_host=max_concurrency_per_host) as client:
+            return await func(client, *args, **kwargs)
+
+    return asyncio.run(_run())
+
+
+def send_trustyai_service_request_sync(
+    namespace: Namespace, endpoint: str, method: str, data: Any = None, json: Any = None
+) -> AsyncResponse:
+    return run_async(
+        send_trustyai_service_request_async, namespace=namespace, endpoint=endpoint, method=method, data=data, json=json
+    )
+
+
+class IngestionJob:
+    def __init__(
+        self,
+        namespace: Namespace,
+        inference_service: InferenceService,
+        data_path: str,
+        type: str = "modelmesh",
+        num_batches: int = None,
+    ):
+        self.namespace = namespace
+        self.inference_service = inference_service
+        self.data_path = data_path
+        self.type = type
+        self.num_batches = num_batches
+
+
+class IngestionResult:
+    def __init__(self, job: IngestionJob, elapsed: float, error: Exception = None):
+        self.job = job
+        self.elapsed = elapsed
+        self.error = error
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+async def run_ingestion_job_async(client: AsyncHTTPClient, job: IngestionJob, window: int = None) -> IngestionResult:
+    start_time = perf_counter()
+    try:
+        await send_data_to_inference_service_async(
+            client=client,
+            namespace=job.namespace,
+            inference_service=job.inference_service,
+            data_path=job.data_path,
+            type=job.type,
+            num_batches=job.num_batches,
+            window=window,
+        )
+    except Exception as e:
+        logger.error(f"Ingestion into {job.inference_service.name} in namespace {job.namespace.name} failed: {e}")
+        return IngestionResult(job=job, elapsed=perf_counter() - start_time, error=e)
+
+    return IngestionResult(job=job, elapsed=perf_counter() - start_time)
+
+
+def run_ingestion_jobs(
+    jobs: list[IngestionJob], window: int = None, max_concurrency_per_host: int = MAX_CONCURRENCY_PER_HOST
+) -> list[IngestionResult]:
+    """
+    Runs several ingestion jobs concurrently on one event loop,
+    so the total time tracks the slowest model rather than the sum of all of them.
+
+    :param jobs (list[IngestionJob]): Namespace, InferenceService and data path of each model to send data to.
+    :param window (int): Maximum number of batches in flight per model. Batches are sent one at a time if not set.
+    :param max_concurrency_per_host (int): Maximum number of requests in flight against a single Route.
+    :return: One IngestionResult per job, in the same order as the jobs.
+    """
+
+    async def _run_all(client: AsyncHTTPClient) -> list[IngestionResult]:
+        return await asyncio.gather(*[run_ingestion_job_async(client=client, job=job, window=window) for job in jobs])
+
+    start_time = perf_counter()
+    results = run_async(_run_all, max_concurrency_per_host=max_concurrency_per_host)
+
+    for result in results:
+        logger.info(
+            f"Ingestion into {result.job.inference_service.name} in namespace {result.job.namespace.name} "
+            f"took {result.elapsed:.2f}s"
+        )
+    logger.info(f"Ingested data into {len(jobs)} models in {perf_counter() - start_time:.2f}s")
+
+    return results
@@ -0,0 +1,19 @@
+from typing import Any, Generator
+
+import pytest
+
+from trustyai_tests.tests.benchmarks.utils import BenchmarkResult, DriftBenchmarkResult, write_benchmark_results
+from trustyai_tests.tests.synthetic_data import DatasetProfile, get_loan_model_profile
+
+
+@pytest.fixture(scope="session")
+def benchmark_results(request) -> Generator[list[BenchmarkResult | DriftBenchmarkResult], Any, None]:
+    results = []
+    yield results
+    if results:
+        write_benchmark_results(results=results, results_path=request.config.getoption("--benchmark-results"))
+
+
+@pytest.fixture(scope="session")
+def loan_model_profile() -> DatasetProfile:
+    return get_loan_model_profile()
@@ -0,0 +1,97 @@
+import http
+
+from ocp_resources.inference_service import InferenceService
+from ocp_resources.namespace import Namespace
+from ocp_resources.trustyai_service import TrustyAIService
+
+import pytest
+
+from trustyai_tests.tests.benchmarks.utils import (
+    BENCHMARK_BATCH_SIZE,
+    BENCHMARK_SEED,
+    DRIFT_BENCHMARK_FEATURE,
+    DRIFT_BENCHMARK_MAGNITUDES,
+    DRIFT_BENCHMARK_SIZES,
+    BenchmarkResult,
+    DriftBenchmarkResult,
+    benchmark_drift_metric,
+)
+from trustyai_tests.tests.metrics import Metric, MetricType
+from trustyai_tests.tests.synthetic_data import (
+    GAUSSIAN_CREDIT_MODEL_TRAINING_DATA_PATH,
+    DriftKind,
+    FeatureDrift,
+    get_gaussian_credit_model_drift_synthesizer,
+)
+from trustyai_tests.tests.utils import (
+    send_data_to_inference_service,
+    upload_data_to_trustyai_service,
+    wait_for_modelmesh_pods_registered,
+)
+
+
+@pytest.mark.openshift
+@pytest.mark.benchmark
+@pytest.mark.pvc
+@pytest.mark.modelmesh
+class TestDriftBenchmark:
+    """
+    Measures how long TrustyAI takes to compute the drift metrics depending on the number of rows and on how much
+    they drift, using PVC storage and the gaussian credit model.
+
+    1. Upload the training data of the model, the reference of the drift metrics.
+    2. For each drift magnitude, send synthesized rows whose first feature is shifted by that many standard deviations.
+    3. Time every drift metric computed over the latest rows, for each size, and record its value next to the drift
+       those rows actually have.
+    """
+
+    def test_upload_reference_data(
+        self, model_namespace: Namespace, trustyai_service_pvc: TrustyAIService, gaussian_credit_model: InferenceService
+    ) -> None:
+        response = upload_data_to_trustyai_service(
+            namespace=model_namespace, data_path=GAUSSIAN_CREDIT_MODEL_TRAINING_DATA_PATH
+        )
+        assert response.status_code == http.HTTPStatus.OK
+
+    @pytest.mark.parametrize("magnitude", DRIFT_BENCHMARK_MAGNITUDES)
+    def test_drift_metrics_benchmark(
+        self,
+        magnitude: float,
+        tmp_path_factory: pytest.TempPathFactory,
+        model_namespace: Namespace,
+        trustyai_service_pvc: TrustyAIService,
+        gaussian_credit_model: InferenceService,
+        benchmark_results: list[BenchmarkResult | DriftBenchmarkResult],
+    ) -> None:
+        synthesizer = get_gaussian_credit_model_drift_synthesizer(seed=BENCHMARK_SEED)
+        data_path = str(tmp_path_factory.mktemp(f"drift-{magnitude}"))
+        data = synthesizer.write_dataset(
+            output_dir=data_path,
+            num_rows=max(DRIFT_BENCHMARK_SIZES),
+            drifts=[FeatureDrift(feature=DRIFT_BENCHMARK_FEATURE, kind=DriftKind.MEAN_SHIFT, magnitude=magnitude)],
+            batch_size=BENCHMARK_BATCH_SIZE,
+        )
+
+        wait_for_modelmesh_pods_registered(
+            namespace=model_namespace, inference_services=[gaussian_credit_model], data_path=data_path
+        )
+        # Sent one batch at a time, so TrustyAI stores the rows in order and the latest rows are data[-num_rows:]
+        send_data_to_inference_service(
+            namespace=model_namespace, inference_service=gaussian_credit_model, data_path=data_path
+        )
+
+        for num_rows in DRIFT_BENCHMARK_SIZES:
+            ground_truth = synthesizer.get_ground_truth(data=data[-num_rows:])
+            for metric in Metric:
+                if metric.metric_type != MetricType.DRIFT:
+                    continue
+                benchmark_results.append(
+                    benchmark_drift_metric(
+                        namespace=model_namespace,
+                        model_name=gaussian_credit_model.name,
+                        metric=metric,
+                        num_rows=num_rows,
+                        magnitude=magnitude,
+                        ground_truth=ground_truth,
+                    )
+                )
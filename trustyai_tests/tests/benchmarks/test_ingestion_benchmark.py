@@ -0,0 +1,152 @@
+from ocp_resources.inference_service import InferenceService
+from ocp_resources.namespace import Namespace
+from ocp_resources.trustyai_service import TrustyAIService
+
+import pytest
+
+from trustyai_tests.tests.benchmarks.utils import (
+    BenchmarkResult,
+    benchmark_data_upload,
+    benchmark_grpc_inference_ingestion,
+    benchmark_inference_ingestion,
+    write_benchmark_workload,
+)
+from trustyai_tests.tests.compression import GZIP, IDENTITY, ZSTD
+from trustyai_tests.tests.synthetic_data import DatasetProfile
+from trustyai_tests.tests.utils import wait_for_inference_service_registered, wait_for_modelmesh_pods_registered
+
+
+@pytest.mark.openshift
+@pytest.mark.benchmark
+@pytest.mark.pvc
+@pytest.mark.modelmesh
+class TestIngestionBenchmarkModelMesh:
+    """
+    Measures how fast TrustyAI ingests a fixed synthetic workload of loan model rows, using PVC storage.
+
+    1. Send the workload as inference requests to a ModelMesh model (onnx_loan_model_alpha).
+    2. Send the workload to the same model as gRPC ModelInfer calls.
+    3. Upload the workload to TrustyAI through /data/upload, uncompressed and with each Content-Encoding.
+    For each path, rows/s, request latency percentiles and the time until /info reflects the data are recorded.
+    """
+
+    def test_modelmesh_ingestion_benchmark(
+        self,
+        tmp_path_factory: pytest.TempPathFactory,
+        model_namespace: Namespace,
+        trustyai_service_pvc: TrustyAIService,
+        onnx_loan_model_alpha: InferenceService,
+        loan_model_profile: DatasetProfile,
+        benchmark_results: list[BenchmarkResult],
+    ) -> None:
+        data_path = write_benchmark_workload(
+            output_dir=str(tmp_path_factory.mktemp("modelmesh")), profile=loan_model_profile
+        )
+        wait_for_modelmesh_pods_registered(
+            namespace=model_namespace, inference_services=[onnx_loan_model_alpha], data_path=data_path
+        )
+
+        result = benchmark_inference_ingestion(
+            name="modelmesh",
+            namespace=model_namespace,
+            inference_service=onnx_loan_model_alpha,
+            data_path=data_path,
+        )
+        benchmark_results.append(result)
+
+        assert result.visible, f"TrustyAI didn't reflect the workload after {result.time_to_visible:.2f}s"
+
+    def test_modelmesh_grpc_ingestion_benchmark(
+        self,
+        tmp_path_factory: pytest.TempPathFactory,
+        model_namespace: Namespace,
+        trustyai_service_pvc: TrustyAIService,
+        onnx_loan_model_alpha: InferenceService,
+        loan_model_profile: DatasetProfile,
+        benchmark_results: list[BenchmarkResult],
+    ) -> None:
+        data_path = write_benchmark_workload(
+            output_dir=str(tmp_path_factory.mktemp("modelmesh-grpc")), profile=loan_model_profile
+        )
+        wait_for_modelmesh_pods_registered(
+            namespace=model_namespace, inference_services=[onnx_loan_model_alpha], data_path=data_path
+        )
+
+        result = benchmark_grpc_inference_ingestion(
+            name="modelmesh-grpc",
+            namespace=model_namespace,
+            inference_service=onnx_loan_model_alpha,
+            data_path=data_path,
+        )
+        benchmark_results.append(result)
+
+        assert result.visible, f"TrustyAI didn't reflect the workload after {result.time_to_visible:.2f}s"
+
+    @pytest.mark.parametrize("compression", [None, GZIP, ZSTD], ids=["identity", GZIP, ZSTD])
+    def test_data_upload_benchmark(
+        self,
+        compression: str,
+        tmp_path_factory: pytest.TempPathFactory,
+        model_namespace: Namespace,
+        trustyai_service_pvc: TrustyAIService,
+        onnx_loan_model_alpha: InferenceService,
+        loan_model_profile: DatasetProfile,
+        benchmark_results: list[BenchmarkResult],
+    ) -> None:
+        data_path = write_benchmark_workload(
+            output_dir=str(tmp_path_factory.mktemp("upload")),
+            profile=loan_model_profile,
+            model_name=onnx_loan_model_alpha.name,
+        )
+
+        result = benchmark_data_upload(
+            name=f"data-upload-{compression or IDENTITY}",
+            namespace=model_namespace,
+            model_name=onnx_loan_model_alpha.name,
+            data_path=data_path,
+            compression=compression,
+        )
+        benchmark_results.append(result)
+
+        assert result.visible, f"TrustyAI didn't reflect the workload after {result.time_to_visible:.2f}s"
+
+
+@pytest.mark.openshift
+@pytest.mark.benchmark
+@pytest.mark.pvc
+@pytest.mark.kserve
+class TestIngestionBenchmarkKserve:
+    """
+    Measures how fast TrustyAI ingests a fixed synthetic workload of loan model rows sent to a KServe model
+    (onnx_loan_model_alpha_kserve), using PVC storage.
+    """
+
+    def test_kserve_ingestion_benchmark(
+        self,
+        tmp_path_factory: pytest.TempPathFactory,
+        model_namespace: Namespace,
+        trustyai_service_pvc: TrustyAIService,
+        onnx_loan_model_alpha_kserve: InferenceService,
+        loan_model_profile: DatasetProfile,
+        benchmark_results: list[BenchmarkResult],
+    ) -> None:
+        data_path = write_benchmark_workload(
+            output_dir=str(tmp_path_factory.mktemp("kserve")), profile=loan_model_profile
+        )
+        wait_for_inference_service_registered(
+            namespace=model_namespace,
+            inference_service=onnx_loan_model_alpha_kserve,
+            data_path=data_path,
+            type="kserve",
+        )
+
+        result = benchmark_inference_ingestion(
+            name="kserve",
+            namespace=model_namespace,
+            inference_service=onnx_loan_model_alpha_kserve,
+            data_path=data_path,
+            type="kserve",
+        )
+        benchmark_results.append(result)
+
+        assert result.visible, f"TrustyAI didn't reflect the workload after {result.time_to_visible:.2f}s"
@@ -0,0 +1,289 @@
+import logging
+from time import perf_counter
+from typing import Any
+
+import numpy as np
+import requests
+from ocp_resources.inference_service import InferenceService
+from ocp_resources.namespace import Namespace
+
+from trustyai_tests.tests.compression import CompressionStats, compression_report
+from trustyai_tests.tests.datasets import BatchFile, get_dataset_manifest
+from trustyai_tests.tests.constants import INGESTION_WINDOW
+from trustyai_tests.tests.metrics import Metric, get_metric_endpoint
+from trustyai_tests.tests.results import append_json_run
+from trustyai_tests.tests.synthetic_data import (
+    TRAINING_DATA_TAG,
+    DatasetProfile,
+    DriftGroundTruth,
+    PayloadGenerator,
+)
+from trustyai_tests.tests.trustyai_client import get_trustyai_client
+from trustyai_tests.tests.utils import (
+    BatchSender,
+    GRPCBatchSender,
+    RestBatchSender,
+    get_num_observations,
+    send_batches_pipelined,
+    wait_for_observations,
+)
+
+logger: logging.Logger = logging.getLogger(__name__)
+
+BENCHMARK_NUM_ROWS: int = 100_000
+BENCHMARK_BATCH_SIZE: int = 1_000
+BENCHMARK_SEED: int = 42
+# Maximum time for TrustyAI to reflect the whole workload in /info once every request was answered
+VISIBILITY_TIMEOUT_SECONDS: float = 300
+# Number of latest rows the drift metrics are computed over, and drift of the benchmarked feature in standard deviations
+DRIFT_BENCHMARK_SIZES: tuple[int, ...] = (1_000, 5_000, 20_000)
+DRIFT_BENCHMARK_MAGNITUDES: tuple[float, ...] = (0.0, 0.5, 2.0)
+DRIFT_BENCHMARK_FEATURE: int = 0
+# Requests timed for each metric and size
+DRIFT_BENCHMARK_REPEATS: int = 3
+
+
+class BenchmarkResult:
+    def __init__(
+        self,
+        name: str,
+        num_rows: int,
+        num_requests: int,
+        requests_elapsed: float,
+        latencies: list[float],
+        time_to_visible: float,
+        visible: bool,
+        compression: list[CompressionStats] = None,
+    ):
+        self.name = name
+        self.num_rows = num_rows
+        self.num_requests = num_requests
+        self.requests_elapsed = requests_elapsed
+        self.latencies = latencies
+        self.time_to_visible = time_to_visible
+        self.visible = visible
+        self.compression = compression or []
+
+    @property
+    def rows_per_second(self) -> float:
+        """Rows per second from the first request until /info reflected the whole workload."""
+        return self.num_rows / (self.requests_elapsed + self.time_to_visible)
+
+    def latency_percentile(self, percentile: float) -> float:
+        return float(np.percentile(self.latencies, percentile))
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "name": self.name,
+            "num_rows": self.num_rows,
+            "num_requests": self.num_requests,
+            "rows_per_second": self.rows_per_second,
+            "requests_elapsed_seconds": self.requests_elapsed,
+            "latency_p50_seconds": self.latency_percentile(percentile=50),
+            "latency_p95_seconds": self.latency_percentile(percentile=95),
+            "latency_p99_seconds": self.latency_percentile(percentile=99),
+            "time_to_visible_seconds": self.time_to_visible,
+            "visible": self.visible,
+            "compression": [stats.to_dict() for stats in self.compression],
+        }
+
+
+class DriftBenchmarkResult:
+    def __init__(
+        self,
+        name: str,
+        metric: Metric,
+        num_rows: int,
+        magnitude: float,
+        latencies: list[float],
+        response: dict[str, Any],
+        ground_truth: list[DriftGroundTruth],
+    ):
+        self.name = name
+        self.metric = metric
+        self.num_rows = num_rows
+        self.magnitude = magnitude
+        self.latencies = latencies
+        self.response = response
+        self.ground_truth = ground_truth
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "name": self.name,
+            "metric": self.metric.value,
+            "num_rows": self.num_rows,
+            "drift_magnitude": self.magnitude,
+            "num_requests": len(self.latencies),
+            "latency_p50_seconds": float(np.percentile(self.latencies, 50)),
+            "latency_max_seconds": max(self.latencies),
+            "value": self.response.get("value"),
+            "named_values": self.response.get("namedValues"),
+            "ground_truth": [feature.to_dict() for feature in self.ground_truth],
+        }
+
+
+def write_benchmark_workload(output_dir: str, profile: DatasetProfile, model_name: str = None) -> str:
+    """
+    Write the fixed synthetic workload, as inference requests or as /data/upload payloads if `model_name` is set.
+    The generator is always seeded the same way, so every run and every path gets the same rows.
+    """
+    generator = PayloadGenerator(profile=profile, seed=BENCHMARK_SEED)
+    generator.write_batches(
+        output_dir=output_dir, num_rows=BENCHMARK_NUM_ROWS, batch_size=BENCHMARK_BATCH_SIZE, model_name=model_name
+    )
+    return output_dir
+
+
+class DataUploadSender(BatchSender):
+    """Posts `/data/upload` payloads to the TrustyAIService of a namespace."""
+
+    errors = (requests.exceptions.RequestException,)
+
+    def __init__(self, namespace: Namespace, compression: str = None):
+        self.compression = compression
+        self.trustyai_client = get_trustyai_client(namespace=namespace)
+
+    def send(self, batch: BatchFile) -> None:
+        with open(batch.path, "rb") as file:
+            self.trustyai_client.post(
+                endpoint="/data/upload", data=file, compression=self.compression
+            ).raise_for_status()
+
+
+def run_benchmark(
+    name: str,
+    namespace: Namespace,
+    model_name: str,
+    data_path: str,
+    sender: BatchSender,
+) -> BenchmarkResult:
+    """
+    Send every batch file of a workload through `send_batches_pipelined`, as the tests ingest data, timing each
+    request, then time how long it takes for TrustyAI's /info to reflect all the rows.
+
+    :param name (str): Name of the benchmark in the results.
+    :param namespace (Namespace): Namespace where the TrustyAIService lives.
+    :param model_name (str): Model the rows are stored under.
+    :param data_path (str): Directory containing the batch files.
+    :param sender (BatchSender): Sends each batch file through the path being benchmarked. Failures aren't retried.
+    """
+    manifest = get_dataset_manifest(data_path=data_path)
+    expected_observations = get_num_observations(namespace=namespace, model_name=model_name)
+
+    compression_report.reset()
+    start_time = perf_counter()
+    latencies = send_batches_pipelined(
+        namespace=namespace,
+        model_name=model_name,
+        sender=sender,
+        batches=manifest.batches(),
+        max_retries=1,
+        window=INGESTION_WINDOW,
+        wait_for_all=False,
+    )
+    requests_elapsed = perf_counter() - start_time
+    expected_observations += manifest.num_observations()
+
+    observation_wait = wait_for_observations(
+        namespace=namespace, model_name=model_name, expected=expected_observations, deadline=VISIBILITY_TIMEOUT_SECONDS
+    )
+
+    result = BenchmarkResult(
+        name=name,
+        num_rows=manifest.num_observations(),
+        num_requests=len(latencies),
+        requests_elapsed=requests_elapsed,
+        latencies=latencies,
+        time_to_visible=observation_wait.elapsed,
+        visible=observation_wait.converged,
+        compression=list(compression_report.totals().values()),
+    )
+    logger.info(f"Benchmark {name}: {result.to_dict()}")
+
+    return result
+
+
+def benchmark_inference_ingestion(
+    name: str, namespace: Namespace, inference_service: InferenceService, data_path: str, type: str = "modelmesh"
+) -> BenchmarkResult:
+    return run_benchmark(
+        name=name,
+        namespace=namespace,
+        model_name=inference_service.name,
+        data_path=data_path,
+        sender=RestBatchSender(namespace=namespace, inference_service=inference_service, type=type),
+    )
+
+
+def benchmark_grpc_inference_ingestion(
+    name: str, namespace: Namespace, inference_service: InferenceService, data_path: str
+) -> BenchmarkResult:
+    """Same as `benchmark_inference_ingestion`, with ModelInfer calls over ModelMesh's gRPC port instead of REST."""
+    return run_benchmark(
+        name=name,
+        namespace=namespace,
+        model_name=inference_service.name,
+        data_path=data_path,
+        sender=GRPCBatchSender(namespace=namespace, inference_service=inference_service),
+    )
+
+
+def benchmark_data_upload(
+    name: str, namespace: Namespace, model_name: str, data_path: str, compression: str = None
+) -> BenchmarkResult:
+    return run_benchmark(
+        name=name,
+        namespace=namespace,
+        model_name=model_name,
+        data_path=data_path,
+        sender=DataUploadSender(namespace=namespace, compression=compression),
+    )
+
+
+def benchmark_drift_metric(
+    namespace: Namespace,
+    model_name: str,
+    metric: Metric,
+    num_rows: int,
+    magnitude: float,
+    ground_truth: list[DriftGroundTruth],
+    repeats: int = DRIFT_BENCHMARK_REPEATS,
+) -> DriftBenchmarkResult:
+    """
+    Time a drift metric computed over the latest rows of a model against its training data.
+
+    :param namespace (Namespace): Namespace where the TrustyAIService lives.
+    :param model_name (str): Model the rows are stored under.
+    :param metric (Metric): Drift metric to compute.
+    :param num_rows (int): Number of latest rows the metric is computed over.
+    :param magnitude (float): Drift the rows were synthesized with, for the results.
+    :param ground_truth (list[DriftGroundTruth]): Drift the rows actually have, to compare the metric with.
+    :param repeats (int): Number of timed requests.
+    """
+    trustyai_client = get_trustyai_client(namespace=namespace)
+    json_data = {"modelId": model_name, "referenceTag": TRAINING_DATA_TAG, "batchSize": num_rows}
+
+    latencies = []
+    for _ in range(repeats):
+        start_time = perf_counter()
+        response = trustyai_client.post(endpoint=get_metric_endpoint(metric=metric), json=json_data)
+        latencies.append(perf_counter() - start_time)
+        response.raise_for_status()
+
+    result = DriftBenchmarkResult(
+        name=f"drift-{metric.value}-{num_rows}-{magnitude}",
+        metric=metric,
+        num_rows=num_rows,
+        magnitude=magnitude,
+        latencies=latencies,
+        response=response.json(),
+        ground_truth=ground_truth,
+    )
+    logger.info(f"Benchmark {result.name}: {result.to_dict()}")
+
+    return result
+
+
+def write_benchmark_results(results: list[BenchmarkResult | DriftBenchmarkResult], results_path: str) -> None:
+    """Append a run with the given results to a JSON results file, keeping the runs already in it."""
+    append_json_run(path=results_path, key="results", payload=[result.to_dict() for result in results])
@@ -0,0 +1,257 @@
+import http
+import io
+import logging
+import threading
+import zlib
+from time import thread_time
+from typing import Any, BinaryIO, Callable, Iterator, Optional, Union
+from urllib.parse import urlparse
+
+import requests
+import zstandard
+
+logger: logging.Logger = logging.getLogger(__name__)
+
+GZIP: str = "gzip"
+ZSTD: str = "zstd"
+IDENTITY: str = "identity"
+# Compression that lets the server pick among the supported encodings, in order of preference
+AUTO: str = "auto"
+CONTENT_ENCODINGS: tuple[str, ...] = (ZSTD, GZIP)
+
+COMPRESSION_CHUNK_SIZE: int = 256 * 1024
+GZIP_LEVEL: int = 6
+ZSTD_LEVEL: int = 3
+
+# Words in the body of a 400 answer showing that the server couldn't decode the compressed request body
+DECODING_ERROR_MARKERS: tuple[str, ...] = ("decod", "compress", "content-encoding", GZIP, ZSTD)
+
+
+class CompressionStats:
+    def __init__(
+        self,
+        encoding: str,
+        raw_bytes: int = 0,
+        compressed_bytes: int = 0,
+        cpu_seconds: float = 0.0,
+        fallbacks: int = 0,
+    ):
+        self.encoding = encoding
+        self.raw_bytes = raw_bytes
+        self.compressed_bytes = compressed_bytes
+        self.cpu_seconds = cpu_seconds
+        # Requests that failed with this encoding and were sent again uncompressed
+        self.fallbacks = fallbacks
+
+    @property
+    def ratio(self) -> float:
+        """Raw size over compressed size, 0 if nothing was compressed."""
+        return self.raw_bytes / self.compressed_bytes if self.compressed_bytes else 0.0
+
+    def add(self, stats: "CompressionStats") -> None:
+        self.raw_bytes += stats.raw_bytes
+        self.compressed_bytes += stats.compressed_bytes
+        self.cpu_seconds += stats.cpu_seconds
+        self.fallbacks += stats.fallbacks
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "encoding": self.encoding,
+            "raw_bytes": self.raw_bytes,
+            "compressed_bytes": self.compressed_bytes,
+            "ratio": self.ratio,
+            "cpu_seconds": self.cpu_seconds,
+            "fallbacks": self.fallbacks,
+        }
+
+
+class CompressionReport:
+    """Thread-safe running totals of the compressed request bodies sent, per Content-Encoding."""
+
+    def __init__(self):
+        self._totals: dict[str, CompressionStats] = {}
+        self._lock = threading.Lock()
+
+    def add(self, stats: CompressionStats) -> None:
+        with self._lock:
+            self._totals.setdefault(stats.encoding, CompressionStats(encoding=stats.encoding)).add(stats)
+
+    def totals(self) -> dict[str, CompressionStats]:
+        with self._lock:
+            return {
+                encoding: CompressionStats(
+                    encoding=encoding,
+                    raw_bytes=stats.raw_bytes,
+                    compressed_bytes=stats.compressed_bytes,
+                    cpu_seconds=stats.cpu_seconds,
+                    fallbacks=stats.fallbacks,
+                )
+                for encoding, stats in self._totals.items()
+            }
+
+    def reset(self) -> None:
+        with self._lock:
+            self._totals.clear()
+
+
+def get_compressor(encoding: str) -> Any:
+    """Streaming compressor for a Content-Encoding, exposing `compress(chunk)` and `flush()`."""
+    if encoding == GZIP:
+        return zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    if encoding == ZSTD:
+        return zstandard.ZstdCompressor(level=ZSTD_LEVEL).compressobj()
+
+    raise ValueError(f"Unsupported content encoding: {encoding}")
+
+
+class CompressedBody:
+    """
+    Request body compressed on the fly from a file or bytes, one chunk at a time, so neither the raw
+    nor the compressed body is ever held in memory in full. It's sent with chunked transfer encoding.
+
+    Each iteration compresses from the start of the source again, so the body can be rewound with `seek(0)`
+    and retried. `stats` holds the sizes and CPU time of the last iteration.
+    """
+
+    def __init__(self, source: Union[BinaryIO, bytes], encoding: str, chunk_size: int = COMPRESSION_CHUNK_SIZE):
+        self.source = io.BytesIO(source) if isinstance(source, bytes) else source
+        self.encoding = encoding
+        self.chunk_size = chunk_size
+        self.stats = CompressionStats(encoding=encoding)
+        self._start = self.source.tell()
+
+    def seek(self, offset: int) -> None:
+        if offset != 0:
+            raise ValueError("Compressed bodies can only be rewound to the start")
+        self.source.seek(self._start)
+
+    def __iter__(self) -> Iterator[bytes]:
+        self.stats = CompressionStats(encoding=self.encoding)
+        compressor = get_compressor(encoding=self.encoding)
+
+        while chunk := self.source.read(self.chunk_size):
+            start_time = thread_time()
+            compressed = compressor.compress(chunk)
+            self.stats.cpu_seconds += thread_time() - start_time
+            self.stats.raw_bytes += len(chunk)
+            self.stats.compressed_bytes += len(compressed)
+            if compressed:
+                yield compressed
+
+        start_time = thread_time()
+        compressed = compressor.flush()
+        self.stats.cpu_seconds += thread_time() - start_time
+        self.stats.compressed_bytes += len(compressed)
+        yield compressed
+
+
+class ContentEncodingNegotiator:
+    """
+    Remembers which request Content-Encodings each server rejected.
+
+    A server that can't decode a body answers 415 Unsupported Media Type, optionally listing the encodings
+    it accepts in an Accept-Encoding header (RFC 7694). The rejected encodings, and the ones it doesn't list,
+    are skipped for that server afterwards, falling back to an uncompressed body when none is left.
+    """
+
+    def __init__(self):
+        self._rejected: dict[str, set[str]] = {}
+        self._lock = threading.Lock()
+
+    def choose(self, server: str, encodings: tuple[str, ...]) -> str:
+        with self._lock:
+            rejected = self._rejected.get(server, set())
+        return next((encoding for encoding in encodings if encoding not in rejected), IDENTITY)
+
+    def reject(self, server: str, encoding: str, accept_encoding: Optional[str] = None) -> None:
+        rejected = {encoding}
+        if accept_encoding is not None:
+            accepted = {value.split(";")[0].strip().lower() for value in accept_encoding.split(",")}
+            rejected.update(value for value in CONTENT_ENCODINGS if value not in accepted)
+
+        with self._lock:
+            self._rejected.setdefault(server, set()).update(rejected)
+        logger.info(f"{server} doesn't accept {encoding} request bodies, falling back")
+
+
+def get_content_encodings(compression: Optional[str]) -> tuple[str, ...]:
+    """Content-Encodings to try, in order, for a `compression` setting: an encoding, `auto` or None."""
+    if compression is None:
+        return ()
+    if compression == AUTO:
+        return CONTENT_ENCODINGS
+    if compression not in CONTENT_ENCODINGS:
+        raise ValueError(f"Unsupported compression: {compression}")
+
+    return (compression,)
+
+
+def is_decoding_error(response: requests.Response) -> bool:
+    """Whether the server answered 400 Bad Request because it couldn't decode the compressed request body."""
+    if response.status_code != http.HTTPStatus.BAD_REQUEST:
+        return False
+    text = response.text.lower()
+
+    return any(marker in text for marker in DECODING_ERROR_MARKERS)
+
+
+def send_compressed(
+    send: Callable[[dict[str, str], Any], requests.Response],
+    url: str,
+    body: Union[BinaryIO, bytes],
+    compression: Optional[str] = None,
+) -> requests.Response:
+    """
+    Send a request body compressed with the first Content-Encoding the server hasn't rejected,
+    retrying with the next one if the server answers 415 Unsupported Media Type.
+
+    With `auto`, a 400 Bad Request whose body shows the server couldn't decode the compressed body is retried
+    once uncompressed, and counted as a fallback in the compression report. If the uncompressed body goes
+    through, the server isn't sent compressed bodies anymore. Any other answer is returned as is, since the
+    request may not be idempotent and the server may already have processed it.
+
+    :param send (Callable): Sends the request, given the extra headers and the body.
+    :param url (str): URL the request is sent to. Rejected encodings are remembered per host.
+    :param body (Union[BinaryIO, bytes]): Uncompressed body.
+    :param compression (str): Encoding to use (gzip or zstd), `auto` to pick the best one the server accepts,
+        or None to send the body uncompressed.
+    """
+    server = urlparse(url).netloc
+    encodings = get_content_encodings(compression=compression)
+
+    while True:
+        encoding = content_encoding_negotiator.choose(server=server, encodings=encodings)
+        if encoding == IDENTITY:
+            return send({}, body)
+
+        compressed_body = CompressedBody(source=body, encoding=encoding)
+        response = send({"Content-Encoding": encoding}, compressed_body)
+        if response.status_code != http.HTTPStatus.UNSUPPORTED_MEDIA_TYPE:
+            break
+
+        content_encoding_negotiator.reject(
+            server=server, encoding=encoding, accept_encoding=response.headers.get("Accept-Encoding")
+        )
+        compressed_body.seek(0)
+
+    stats = compressed_body.stats
+    compression_report.add(stats=stats)
+    logger.debug(
+        f"Compressed {stats.raw_bytes} bytes to {stats.compressed_bytes} with {encoding} "
+        f"(ratio {stats.ratio:.2f}, {stats.cpu_seconds:.3f}s CPU)"
+    )
+
+    if compression == AUTO and is_decoding_error(response=response):
+        logger.warning(f"{server} answered {response.status_code} to a {encoding} request body, retrying uncompressed")
+        compression_report.add(stats=CompressionStats(encoding=encoding, fallbacks=1))
+        compressed_body.seek(0)
+        response = send({}, body)
+        if response.ok:
+            # Only the compressed body failed, e.g. behind a proxy that mishandles it: stop compressing for that server
+            content_encoding_negotiator.reject(server=server, encoding=encoding, accept_encoding=IDENTITY)
+
+    return response
+
+
+content_encoding_negotiator = ContentEncodingNegotiator()
+compression_report = CompressionReport()
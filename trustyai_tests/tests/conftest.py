@@ -1,12 +1,14 @@
+import json
 import os
-from time import sleep
-from typing import Any, Generator, Optional
+from contextlib import contextmanager
+from typing import Any, Generator, Iterator, Optional
 
 import pytest
 import yaml
 from kubernetes.dynamic import DynamicClient
 from kubernetes.dynamic.exceptions import ConflictError
 from ocp_resources.config_map import ConfigMap
+from ocp_resources.inference_service import InferenceService
 from ocp_resources.maria_db import MariaDB
 from ocp_resources.namespace import Namespace
 from ocp_resources.pod import Pod
@@ -15,15 +17,36 @@ from ocp_resources.role_binding import RoleBinding
 from ocp_resources.secret import Secret
 from ocp_resources.service import Service
 from ocp_resources.service_account import ServiceAccount
+from ocp_resources.serving_runtime import ServingRuntime
 from ocp_resources.trustyai_service import TrustyAIService
 
 from trustyai_tests.tests.constants import (
+    KSERVE_API_GROUP,
+    MLSERVER,
+    MLSERVER_QUAY_IMAGE,
+    MLSERVER_RUNTIME_NAME,
+    ONNX,
+    OVMS_RUNTIME_NAME,
+    SKLEARN,
     TRUSTYAI_SERVICE,
     ODH_OPERATOR,
+    XGBOOST,
 )
+from trustyai_tests.tests.tokens import set_token_client
+from trustyai_tests.tests.endpoints import endpoint_resolver
+from trustyai_tests.tests.environment_pool import DATABASE, PVC, EnvironmentPool, get_pooled_namespace_name
+from trustyai_tests.tests.grpc_inference import close_grpc_inference_client
+from trustyai_tests.tests.informers import informer_cache
+from trustyai_tests.tests.prometheus import PublicationLagTracker, publication_lag_tracker, write_publication_lag_report
+from trustyai_tests.tests.trustyai_client import close_trustyai_client
 from trustyai_tests.tests.minio import create_minio_secret, create_minio_pod, create_minio_service
 from trustyai_tests.tests.utils import (
-    wait_for_mariadb_pods,
+    create_kserve_ovms_runtime,
+    create_mariadb,
+    create_ovms_runtime,
+    wait_for_inference_service_ready,
+    reset_trustyai_service,
+    wait_for_mariadb_ready,
     log_namespace_pods,
     log_namespace_events,
     log_namespace_logs,
@@ -31,6 +54,8 @@ from trustyai_tests.tests.utils import (
 )
 from trustyai_tests.tests.utils import logger, is_odh_or_rhoai, wait_for_trustyai_pod_running
 
+MODEL_NAMESPACE: str = "test-namespace"
+
 
 @pytest.fixture(autouse=True)
 def test_log(request):
@@ -51,6 +76,35 @@ def pytest_addoption(parser):
     parser.addoption(
         "--use-modelmesh-image", action="store_true", default=False, help="Include modelMeshImage in the ConfigMap"
     )
+    parser.addoption("--benchmark", action="store_true", default=False, help="Run the benchmark tests")
+    parser.addoption(
+        "--benchmark-results",
+        default="benchmark_results.json",
+        help="JSON file the benchmark results are appended to",
+    )
+    parser.addoption(
+        "--publication-lag-results",
+        default=None,
+        help="JSON file the Prometheus publication lag histograms are appended to. "
+        "Defaults to publication_lag.json in $ARTIFACT_DIR when it is set",
+    )
+    parser.addoption(
+        "--pooled-environments",
+        action="store_true",
+        default=False,
+        help="Provision the namespace, MinIO, MariaDB, the serving runtimes and the TrustyAIService once per "
+        "storage format and share them across test classes, instead of once per class",
+    )
+
+
+def pytest_collection_modifyitems(config, items):
+    if config.getoption("--benchmark"):
+        return
+
+    skip_benchmark = pytest.mark.skip(reason="Benchmarks only run with --benchmark")
+    for item in items:
+        if "benchmark" in item.keywords:
+            item.add_marker(skip_benchmark)
 
 
 @pytest.fixture(scope="session")
@@ -60,14 +114,42 @@ def use_modelmesh_image(request):
 
 @pytest.fixture(scope="session")
 def client() -> DynamicClient:
-    yield get_client()
+    dyn_client = get_client()
+    set_token_client(client=dyn_client)
+    endpoint_resolver.client = dyn_client
+    informer_cache.client = dyn_client
+    yield dyn_client
+
+
+@pytest.fixture(autouse=True, scope="session")
+def publication_lag(request) -> Generator[PublicationLagTracker, Any, None]:
+    yield publication_lag_tracker
+
+    report = publication_lag_tracker.report()
+    if not report:
+        return
+    logger.info(f"Prometheus publication lag: {json.dumps(report, indent=2)}")
+
+    results_path = request.config.getoption("--publication-lag-results")
+    if results_path is None and os.environ.get("ARTIFACT_DIR"):
+        results_path = os.path.join(os.environ["ARTIFACT_DIR"], "publication_lag.json")
+    if results_path is not None:
+        write_publication_lag_report(tracker=publication_lag_tracker, results_path=results_path)
+
+
+@pytest.fixture(scope="session")
+def environment_pool(request, client: DynamicClient) -> Generator[EnvironmentPool, Any, None]:
+    pool = EnvironmentPool(enabled=request.config.getoption("--pooled-environments"))
+    yield pool
+    pool.close()
 
 
 @pytest.fixture(autouse=True)
-def test_logging(request, client):
-    per_test_artifacting_logic(request, client, ["pre-test"])
+def test_logging(request, client, environment_pool):
+    namespace = get_model_namespace_name(request=request, environment_pool=environment_pool)
+    per_test_artifacting_logic(request, client, ["pre-test"], namespace=namespace)
     yield
-    per_test_artifacting_logic(request, client, ["post-test"])
+    per_test_artifacting_logic(request, client, ["post-test"], namespace=namespace)
 
 
 @pytest.fixture(autouse=True, scope="session")
@@ -92,11 +174,27 @@ def modelmesh_configmap(use_modelmesh_image) -> Optional[ConfigMap]:
         yield cm
 
 
-@pytest.fixture(scope="class")
-def model_namespace(client: DynamicClient) -> Namespace:
+def get_storage_format(request) -> Optional[str]:
+    """Storage format of the TrustyAIService a test uses, or None if it doesn't use one."""
+    if "trustyai_service_db" in request.fixturenames:
+        return DATABASE
+    if "trustyai_service_pvc" in request.fixturenames:
+        return PVC
+    return None
+
+
+def get_model_namespace_name(request, environment_pool: EnvironmentPool) -> str:
+    storage_format = get_storage_format(request=request)
+    if environment_pool.enabled and storage_format is not None:
+        return get_pooled_namespace_name(storage_format=storage_format)
+    return MODEL_NAMESPACE
+
+
+@contextmanager
+def create_model_namespace(client: DynamicClient, name: str) -> Iterator[Namespace]:
     with Namespace(
         client=client,
-        name="test-namespace",
+        name=name,
         delete_timeout=600,
         annotations={
             "openshift.io/description": "",
@@ -119,38 +217,75 @@ def model_namespace(client: DynamicClient) -> Namespace:
         )
         role_binding.deploy()
         yield ns
+        close_trustyai_client(namespace=ns)
+        close_grpc_inference_client(namespace=ns)
+        endpoint_resolver.forget_namespace(namespace=ns.name)
+        informer_cache.forget_namespace(namespace=ns.name)
 
 
 @pytest.fixture(scope="class")
-def db_credentials(model_namespace):
-    with Secret(
-        name="db-credentials",
-        namespace=model_namespace.name,
-        string_data={
-            "databaseKind": "mariadb",
-            "databaseName": "trustyai_database",
-            "databaseUsername": "quarkus",
-            "databasePassword": "quarkus",
-            "databaseService": "mariadb",
-            "databasePort": "3306",
-            "databaseGeneration": "update",
-        },
-    ) as db_credentials:
-        yield db_credentials
+def model_namespace(request, client: DynamicClient, environment_pool: EnvironmentPool) -> Namespace:
+    storage_format = get_storage_format(request=request)
+    if not environment_pool.enabled or storage_format is None:
+        with create_model_namespace(client=client, name=MODEL_NAMESPACE) as ns:
+            yield ns
+        return
+
+    name = get_pooled_namespace_name(storage_format=storage_format)
+    # The ModelMesh pod behind the gRPC port-forward can be replaced before the next lease
+    yield from environment_pool.provide_namespace(
+        name=name,
+        factory=lambda: create_model_namespace(client=client, name=name),
+        reset=lambda ns: close_grpc_inference_client(namespace=ns),
+    )
 
 
 @pytest.fixture(scope="class")
-def mariadb(model_namespace, db_credentials) -> MariaDB:
-    with MariaDB(yaml_file="trustyai_tests/manifests/mariadb.yaml") as mariadb:
-        wait_for_mariadb_pods(mariadb=mariadb)
-        sleep(60)
+def db_credentials(model_namespace, environment_pool: EnvironmentPool):
+    yield from environment_pool.provide(
+        namespace=model_namespace.name,
+        key="Secret/db-credentials",
+        factory=lambda: Secret(
+            name="db-credentials",
+            namespace=model_namespace.name,
+            string_data={
+                "databaseKind": "mariadb",
+                "databaseName": "trustyai_database",
+                "databaseUsername": "quarkus",
+                "databasePassword": "quarkus",
+                "databaseService": "mariadb",
+                "databasePort": "3306",
+                "databaseGeneration": "update",
+            },
+        ),
+    )
+
+
+@contextmanager
+def deploy_mariadb(namespace: Namespace, db_credentials: Secret) -> Iterator[MariaDB]:
+    with create_mariadb(namespace=namespace) as mariadb:
+        wait_for_mariadb_ready(mariadb=mariadb, db_credentials=db_credentials)
         yield mariadb
 
 
 @pytest.fixture(scope="class")
-def modelmesh_serviceaccount(client: DynamicClient, model_namespace: Namespace) -> Any:
-    with ServiceAccount(client=client, name="modelmesh-serving-sa", namespace=model_namespace.name):
-        yield
+def mariadb(model_namespace, db_credentials, environment_pool: EnvironmentPool) -> MariaDB:
+    yield from environment_pool.provide(
+        namespace=model_namespace.name,
+        key="MariaDB/mariadb",
+        factory=lambda: deploy_mariadb(namespace=model_namespace, db_credentials=db_credentials),
+    )
+
+
+@pytest.fixture(scope="class")
+def modelmesh_serviceaccount(
+    client: DynamicClient, model_namespace: Namespace, environment_pool: EnvironmentPool
+) -> Any:
+    yield from environment_pool.provide(
+        namespace=model_namespace.name,
+        key="ServiceAccount/modelmesh-serving-sa",
+        factory=lambda: ServiceAccount(client=client, name="modelmesh-serving-sa", namespace=model_namespace.name),
+    )
 
 
 @pytest.fixture(scope="session")
@@ -185,6 +320,13 @@ def user_workload_monitoring_config(client: DynamicClient) -> ConfigMap:
         yield ConfigMap(name=name, namespace=namespace)
 
 
+@contextmanager
+def deploy_trustyai_service(client: DynamicClient, namespace: Namespace, **kwargs: Any) -> Iterator[TrustyAIService]:
+    with TrustyAIService(client=client, name=TRUSTYAI_SERVICE, namespace=namespace.name, **kwargs) as trusty:
+        wait_for_trustyai_pod_running(namespace=namespace)
+        yield trusty
+
+
 @pytest.fixture(scope="class")
 def trustyai_service_pvc(
     client: DynamicClient,
@@ -192,17 +334,20 @@ def trustyai_service_pvc(
     modelmesh_serviceaccount: Any,
     cluster_monitoring_config: ConfigMap,
     user_workload_monitoring_config: ConfigMap,
+    environment_pool: EnvironmentPool,
 ) -> TrustyAIService:
-    with TrustyAIService(
-        client=client,
-        name=TRUSTYAI_SERVICE,
+    yield from environment_pool.provide(
         namespace=model_namespace.name,
-        storage={"format": "PVC", "folder": "/inputs", "size": "1Gi"},
-        data={"filename": "data.csv", "format": "CSV"},
-        metrics={"schedule": "5s"},
-    ) as trusty:
-        wait_for_trustyai_pod_running(namespace=model_namespace)
-        yield trusty
+        key=f"TrustyAIService/{TRUSTYAI_SERVICE}",
+        factory=lambda: deploy_trustyai_service(
+            client=client,
+            namespace=model_namespace,
+            storage={"format": "PVC", "folder": "/inputs", "size": "1Gi"},
+            data={"filename": "data.csv", "format": "CSV"},
+            metrics={"schedule": "5s"},
+        ),
+        reset=lambda trusty: reset_trustyai_service(namespace=model_namespace),
+    )
 
 
 @pytest.fixture(scope="class")
@@ -213,36 +358,208 @@ def trustyai_service_db(
     modelmesh_serviceaccount: Any,
     cluster_monitoring_config: ConfigMap,
     user_workload_monitoring_config: ConfigMap,
+    environment_pool: EnvironmentPool,
 ) -> TrustyAIService:
-    with TrustyAIService(
-        client=client,
-        name=TRUSTYAI_SERVICE,
+    yield from environment_pool.provide(
         namespace=model_namespace.name,
-        storage={"format": "DATABASE", "databaseConfigurations": "db-credentials"},
-        metrics={"schedule": "5s"},
-    ) as trusty:
-        wait_for_trustyai_pod_running(namespace=model_namespace)
-        yield trusty
+        key=f"TrustyAIService/{TRUSTYAI_SERVICE}",
+        factory=lambda: deploy_trustyai_service(
+            client=client,
+            namespace=model_namespace,
+            storage={"format": "DATABASE", "databaseConfigurations": "db-credentials"},
+            metrics={"schedule": "5s"},
+        ),
+        reset=lambda trusty: reset_trustyai_service(namespace=model_namespace),
+    )
 
 
 @pytest.fixture(scope="class")
-def minio_service(client: DynamicClient, model_namespace: Namespace) -> Generator[Service, Any, None]:
-    with create_minio_service(namespace=model_namespace) as minio_service:
-        yield minio_service
+def minio_service(
+    client: DynamicClient, model_namespace: Namespace, environment_pool: EnvironmentPool
+) -> Generator[Service, Any, None]:
+    yield from environment_pool.provide(
+        namespace=model_namespace.name,
+        key="Service/minio",
+        factory=lambda: create_minio_service(namespace=model_namespace),
+    )
 
 
 @pytest.fixture(scope="class")
-def minio_pod(client: DynamicClient, model_namespace: Namespace) -> Generator[Pod, Any, None]:
-    with create_minio_pod(namespace=model_namespace) as minio_pod:
-        yield minio_pod
+def minio_pod(
+    client: DynamicClient, model_namespace: Namespace, environment_pool: EnvironmentPool
+) -> Generator[Pod, Any, None]:
+    yield from environment_pool.provide(
+        namespace=model_namespace.name,
+        key="Pod/minio",
+        factory=lambda: create_minio_pod(namespace=model_namespace),
+    )
 
 
 @pytest.fixture(scope="class")
-def minio_secret(client: DynamicClient, model_namespace: Namespace) -> Generator[Secret, Any, None]:
-    with create_minio_secret(namespace=model_namespace) as minio_secret:
-        yield minio_secret
+def minio_secret(
+    client: DynamicClient, model_namespace: Namespace, environment_pool: EnvironmentPool
+) -> Generator[Secret, Any, None]:
+    yield from environment_pool.provide(
+        namespace=model_namespace.name,
+        key="Secret/minio",
+        factory=lambda: create_minio_secret(namespace=model_namespace),
+    )
 
 
 @pytest.fixture(scope="class")
 def minio_data_connection(minio_service: Service, minio_pod: Pod, minio_secret: Secret) -> Generator[Secret, Any, None]:
     yield minio_secret
+
+
+@pytest.fixture(scope="class")
+def ovms_runtime(
+    minio_data_connection: Secret, model_namespace: Namespace, environment_pool: EnvironmentPool
+) -> ServingRuntime:
+    yield from environment_pool.provide(
+        namespace=model_namespace.name,
+        key=f"ServingRuntime/{OVMS_RUNTIME_NAME}",
+        factory=lambda: create_ovms_runtime(model_namespace),
+        variant="modelmesh",
+    )
+
+
+@pytest.fixture(scope="class")
+def ovms_runtime_kserve(
+    minio_data_connection: Secret, model_namespace: Namespace, environment_pool: EnvironmentPool
+) -> ServingRuntime:
+    # Same name as the ModelMesh runtime, so a pooled one is replaced rather than shared
+    yield from environment_pool.provide(
+        namespace=model_namespace.name,
+        key=f"ServingRuntime/{OVMS_RUNTIME_NAME}",
+        factory=lambda: create_kserve_ovms_runtime(model_namespace),
+        variant="kserve",
+    )
+
+
+@pytest.fixture(scope="class")
+def onnx_loan_model_alpha(
+    client: DynamicClient, model_namespace: Namespace, minio_data_connection: Secret, ovms_runtime: ServingRuntime
+) -> InferenceService:
+    with InferenceService(
+        client=client,
+        name="demo-loan-nn-onnx-alpha",
+        namespace=model_namespace.name,
+        predictor={
+            "model": {
+                "modelFormat": {"name": ONNX},
+                "runtime": ovms_runtime.name,
+                "storage": {"key": minio_data_connection.name, "path": "onnx/loan_model_alpha_august.onnx"},
+            }
+        },
+        annotations={f"{KSERVE_API_GROUP}/deploymentMode": "ModelMesh"},
+    ) as inference_service:
+        wait_for_inference_service_ready(inference_service=inference_service)
+        yield inference_service
+
+
+@pytest.fixture(scope="class")
+def onnx_loan_model_alpha_kserve(
+    client: DynamicClient,
+    model_namespace: Namespace,
+    minio_data_connection: Secret,
+    ovms_runtime_kserve: ServingRuntime,
+) -> InferenceService:
+    with InferenceService(
+        client=client,
+        name="demo-loan-nn-onnx-alpha",
+        namespace=model_namespace.name,
+        predictor={
+            "maxReplicas": 1,
+            "minReplicas": 1,
+            "model": {
+                "modelFormat": {"name": ONNX, "version": "1"},
+                "resources": {"limits": {"cpu": "2", "memory": "8Gi"}, "requests": {"cpu": "1", "memory": "4Gi"}},
+                "runtime": ovms_runtime_kserve.name,
+                "storage": {"key": minio_data_connection.name, "path": "ovms/loan_model_alpha"},
+            },
+        },
+        annotations={
+            "openshift.io/display-name": "demo-loan-nn-onnx-alpha",
+            # "security.opendatahub.io/enable-auth": "true",
+            "serving.knative.openshift.io/enablePassthrough": "true",
+            "sidecar.istio.io/inject": "true",
+            "sidecar.istio.io/rewriteAppHTTPProbers": "true",
+        },
+    ) as inference_service:
+        wait_for_inference_service_ready(inference_service=inference_service)
+        yield inference_service
+
+
+@pytest.fixture(scope="class")
+def mlserver_runtime(
+    client: DynamicClient, minio_data_connection: Secret, model_namespace: Namespace, environment_pool: EnvironmentPool
+) -> ServingRuntime:
+    supported_model_formats = [
+        {"name": SKLEARN, "version": "0", "autoselect": "true"},
+        {"name": XGBOOST, "version": "1", "autoselect": "true"},
+        {"name": "lightgbm", "version": "3", "autoselect": "true"},
+    ]
+    containers = [
+        {
+            "name": MLSERVER,
+            "image": MLSERVER_QUAY_IMAGE,
+            "env": [
+                {"name": "MLSERVER_MODELS_DIR", "value": "/models/_mlserver_models/"},
+                {"name": "MLSERVER_GRPC_PORT", "value": "8001"},
+                {"name": "MLSERVER_HTTP_PORT", "value": "8002"},
+                {"name": "MLSERVER_LOAD_MODELS_AT_STARTUP", "value": "false"},
+                {"name": "MLSERVER_MODEL_NAME", "value": "dummy-model-fixme"},
+                {"name": "MLSERVER_HOST", "value": "127.0.0.1"},
+                {"name": "MLSERVER_GRPC_MAX_MESSAGE_LENGTH", "value": "-1"},
+            ],
+            "resources": {"requests": {"cpu": "500m", "memory": "1Gi"}, "limits": {"cpu": "5", "memory": "1Gi"}},
+        }
+    ]
+
+    yield from environment_pool.provide(
+        namespace=model_namespace.name,
+        key=f"ServingRuntime/{MLSERVER_RUNTIME_NAME}",
+        factory=lambda: ServingRuntime(
+            client=client,
+            name=MLSERVER_RUNTIME_NAME,
+            namespace=model_namespace.name,
+            containers=containers,
+            supported_model_formats=supported_model_formats,
+            multi_model=True,
+            protocol_versions=["grpc-v2"],
+            grpc_endpoint="port:8085",
+            grpc_data_endpoint="port:8001",
+            built_in_adapter={
+                "serverType": MLSERVER,
+                "runtimeManagementPort": 8001,
+                "memBufferBytes": 134217728,
+                "modelLoadingTimeoutMillis": 90000,
+            },
+            annotations={"enable-route": "true"},
+            label={"name": f"modelmesh-serving-{MLSERVER_RUNTIME_NAME}-SR"},
+        ),
+    )
+
+
+@pytest.fixture(scope="class")
+def gaussian_credit_model(
+    client: DynamicClient,
+    model_namespace: Namespace,
+    minio_data_connection: Secret,
+    mlserver_runtime: ServingRuntime,
+) -> InferenceService:
+    with InferenceService(
+        client=client,
+        name="gaussian-credit-model",
+        namespace=model_namespace.name,
+        predictor={
+            "model": {
+                "modelFormat": {"name": XGBOOST},
+                "runtime": mlserver_runtime.name,
+                "storage": {"key": minio_data_connection.name, "path": f"{SKLEARN}/gaussian_credit_model.json"},
+            }
+        },
+        annotations={f"{KSERVE_API_GROUP}/deploymentMode": "ModelMesh"},
+    ) as inference_service:
+        wait_for_inference_service_ready(inference_service=inference_service)
+        yield inference_service
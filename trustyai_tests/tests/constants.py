@@ -24,4 +24,16 @@ OVMS_RUNTIME_NAME: str = f"{OVMS}-1.x"
 OVMS_QUAY_IMAGE: str = (
     "quay.io/opendatahub/openvino_model_server@sha256:564664371d3a21b9e732a5c1b4b40bacad714a5144c0a9aaf675baec4a04b148"
 )
+# Label ModelMesh sets on the pods of every ServingRuntime of a namespace
+MODELMESH_POD_LABEL_SELECTOR: str = "modelmesh-service=modelmesh-serving"
 ONNX_LOAN_MODEL_ALPHA_PATH: str = "onnx/loan_model_alpha_august.onnx"
+SKLEARN: str = "sklearn"
+XGBOOST: str = "xgboost"
+MLSERVER: str = "mlserver"
+MLSERVER_RUNTIME_NAME: str = f"{MLSERVER}-1.x"
+MLSERVER_QUAY_IMAGE: str = (
+    "quay.io/aaguirre/mlserver@sha256:8884d989b3063a47bf0e6c20c1c0ff253662121a977fe5b74b54e682839360d4"
+)
+
+# Maximum number of batches posted to a model before TrustyAI has to acknowledge the oldest one
+INGESTION_WINDOW: int = 4
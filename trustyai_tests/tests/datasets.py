@@ -0,0 +1,320 @@
+import io
+import json
+import logging
+import math
+import os
+import threading
+from contextlib import contextmanager
+from typing import Any, BinaryIO, Iterator, Optional
+
+import ijson
+import numpy as np
+
+logger: logging.Logger = logging.getLogger(__name__)
+
+# Sidecar index written next to the batch files of a dataset
+MANIFEST_FILE_NAME: str = ".dataset-manifest.json"
+MANIFEST_VERSION: int = 2
+
+# ijson prefixes of the input tensors of a KServe v2 payload, at the top level or wrapped in a `request`
+TENSOR_PREFIXES: tuple[str, ...] = ("inputs.item", "request.inputs.item")
+
+# Little-endian NumPy dtypes of the KServe v2 tensor datatypes, as laid out by the binary data extension
+NUMPY_DATATYPES: dict[str, str] = {
+    "BOOL": "?",
+    "UINT8": "<u1",
+    "UINT16": "<u2",
+    "UINT32": "<u4",
+    "UINT64": "<u8",
+    "INT8": "<i1",
+    "INT16": "<i2",
+    "INT32": "<i4",
+    "INT64": "<i8",
+    "FP16": "<f2",
+    "FP32": "<f4",
+    "FP64": "<f8",
+}
+
+
+class TensorInfo:
+    def __init__(self, name: str, shape: list[int], datatype: str):
+        self.name = name
+        self.shape = shape
+        self.datatype = datatype
+
+    @property
+    def num_observations(self) -> int:
+        return self.shape[0]
+
+    @property
+    def num_features(self) -> int:
+        return self.shape[1] if len(self.shape) > 1 else 1
+
+
+class BatchFile:
+    def __init__(self, path: str, size: int, mtime_ns: int, tensor_prefix: str, tensors: list[TensorInfo]):
+        self.path = path
+        self.size = size
+        self.mtime_ns = mtime_ns
+        self.tensor_prefix = tensor_prefix
+        self.tensors = tensors
+        # Decoded input tensors, parsed from the file on first use and shared by every later send
+        self._arrays: Optional[list[np.ndarray]] = None
+        self._arrays_lock = threading.Lock()
+
+    @property
+    def num_observations(self) -> int:
+        return sum(tensor.num_observations for tensor in self.tensors)
+
+    def get_arrays(self) -> list[np.ndarray]:
+        """Input tensors of the batch as read-only NumPy arrays, decoded once per process."""
+        with self._arrays_lock:
+            if self._arrays is None:
+                arrays = parse_batch_arrays(batch=self)
+                for array in arrays:
+                    array.setflags(write=False)
+                self._arrays = arrays
+
+        return self._arrays
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "size": self.size,
+            "mtime_ns": self.mtime_ns,
+            "tensor_prefix": self.tensor_prefix,
+            "tensors": [
+                {"name": tensor.name, "shape": tensor.shape, "datatype": tensor.datatype} for tensor in self.tensors
+            ],
+        }
+
+    @classmethod
+    def from_dict(cls, path: str, data: dict[str, Any]) -> "BatchFile":
+        return cls(
+            path=path,
+            size=data["size"],
+            mtime_ns=data["mtime_ns"],
+            tensor_prefix=data["tensor_prefix"],
+            tensors=[TensorInfo(**tensor) for tensor in data["tensors"]],
+        )
+
+
+def read_tensor_headers(file: BinaryIO) -> tuple[str, list[TensorInfo]]:
+    """
+    Read the name, shape and datatype of the input tensors of a KServe v2 payload without building its data lists.
+    The file is parsed incrementally, so memory stays flat however large the tensors are.
+    Returns the ijson prefix the tensors were found under, along with the tensors.
+    """
+    tensors: dict[str, list[TensorInfo]] = {prefix: [] for prefix in TENSOR_PREFIXES}
+    header: dict[str, Any] = {}
+
+    for prefix, event, value in ijson.parse(file, use_float=True):
+        if prefix in tensors:
+            if event == "start_map":
+                header = {"name": "", "shape": [], "datatype": ""}
+            elif event == "end_map":
+                tensors[prefix].append(TensorInfo(**header))
+            continue
+
+        parent, _, field = prefix.rpartition(".")
+        if parent in tensors and field in ("name", "datatype"):
+            header[field] = value
+        elif parent.endswith(".shape") and parent[: -len(".shape")] in tensors and event == "number":
+            header["shape"].append(value)
+
+    # Top-level inputs take precedence over the ones wrapped in a `request`
+    return next(
+        ((prefix, tensor_list) for prefix, tensor_list in tensors.items() if tensor_list), (TENSOR_PREFIXES[0], [])
+    )
+
+
+def read_batch_file(path: str, stat: os.stat_result) -> BatchFile:
+    with open(path, "rb") as file:
+        tensor_prefix, tensors = read_tensor_headers(file=file)
+
+    return BatchFile(
+        path=path, size=stat.st_size, mtime_ns=stat.st_mtime_ns, tensor_prefix=tensor_prefix, tensors=tensors
+    )
+
+
+def read_batch_arrays(batch: BatchFile) -> list[np.ndarray]:
+    """
+    Read the input tensors of a batch file as NumPy arrays, in the datatype of each tensor.
+    The file is only parsed on the first read; later reads return the same read-only arrays.
+    """
+    return batch.get_arrays()
+
+
+def parse_batch_arrays(batch: BatchFile) -> list[np.ndarray]:
+    """
+    Parse the input tensors of a batch file as NumPy arrays, in the datatype of each tensor.
+    Values are streamed from the parser straight into the arrays, without building intermediate Python lists.
+    """
+    data_prefix = f"{batch.tensor_prefix}.data"
+    with open(batch.path, "rb") as file:
+        values = (
+            value
+            for prefix, event, value in ijson.parse(file, use_float=True)
+            if event in ("number", "boolean") and (prefix == data_prefix or prefix.startswith(f"{data_prefix}."))
+        )
+        # Tensors appear in the file one after the other, so each array takes the next `count` values
+        return [
+            np.fromiter(values, dtype=NUMPY_DATATYPES[tensor.datatype], count=math.prod(tensor.shape)).reshape(
+                tensor.shape
+            )
+            for tensor in batch.tensors
+        ]
+
+
+def get_tensor_buffer(datatype: str, data: np.ndarray) -> memoryview:
+    """Raw little-endian bytes of a tensor, as laid out by the binary data extension and gRPC raw contents."""
+    # Only copies when the array isn't already contiguous and in the little-endian wire dtype
+    return memoryview(np.ascontiguousarray(data, dtype=NUMPY_DATATYPES[datatype])).cast("B")
+
+
+def encode_binary_request(tensors: list[tuple[str, str, np.ndarray]]) -> tuple[bytes, int]:
+    """
+    Encode input tensors with the KServe v2 binary data extension: a JSON header describing the tensors,
+    followed by the raw little-endian buffer of each tensor.
+
+    :param tensors (list[tuple[str, str, np.ndarray]]): Name, datatype and data of each input tensor.
+    :return: The request body, and the length of its JSON header for the Inference-Header-Content-Length header.
+    """
+    inputs, buffers = [], []
+    for name, datatype, data in tensors:
+        buffer = get_tensor_buffer(datatype=datatype, data=data)
+        inputs.append({
+            "name": name,
+            "shape": list(data.shape),
+            "datatype": datatype,
+            "parameters": {"binary_data_size": buffer.nbytes},
+        })
+        buffers.append(buffer)
+
+    header = json.dumps({"inputs": inputs}).encode("utf-8")
+    return b"".join([header, *buffers]), len(header)
+
+
+def get_binary_request_headers(json_length: int) -> dict[str, str]:
+    return {"Inference-Header-Content-Length": str(json_length), "Content-Type": "application/octet-stream"}
+
+
+@contextmanager
+def open_batch_body(batch: BatchFile, binary: bool = False) -> Iterator[tuple[BinaryIO, dict[str, str]]]:
+    """
+    Open the request body of a batch file, along with the extra HTTP headers it needs.
+    The body is either the JSON file itself, streamed from disk, or the batch re-encoded as binary tensors.
+    Either way it's seekable, so it can be rewound before retrying a request.
+
+    :param batch (BatchFile): Batch file to send.
+    :param binary (bool): Encode the batch with the KServe v2 binary data extension.
+    """
+    if not binary:
+        with open(batch.path, "rb") as file:
+            yield file, {}
+        return
+
+    arrays = read_batch_arrays(batch=batch)
+    body, json_length = encode_binary_request(
+        tensors=[(tensor.name, tensor.datatype, data) for tensor, data in zip(batch.tensors, arrays)]
+    )
+    yield io.BytesIO(body), get_binary_request_headers(json_length=json_length)
+
+
+class DatasetManifest:
+    """
+    Per-file tensor names, shapes and datatypes of the JSON batch files under a directory.
+
+    The manifest is persisted in a sidecar index keyed by file path, size and mtime, so a file
+    is only parsed again when it changes.
+    """
+
+    def __init__(self, data_path: str, files: list[BatchFile]):
+        self.data_path = data_path
+        self.files = files
+
+    def batches(self, num_batches: Optional[int] = None) -> list[BatchFile]:
+        """Batch files in the order they are sent to a model, limited to the first `num_batches`."""
+        return self.files if num_batches is None else self.files[:num_batches]
+
+    def num_observations(self, num_batches: Optional[int] = None) -> int:
+        return sum(batch.num_observations for batch in self.batches(num_batches=num_batches))
+
+    @classmethod
+    def load(cls, data_path: str) -> "DatasetManifest":
+        """Build the manifest of a directory, reusing the sidecar entries of unchanged files."""
+        manifest_path = os.path.join(data_path, MANIFEST_FILE_NAME)
+        cached_entries = read_manifest_entries(manifest_path=manifest_path)
+
+        files = []
+        changed = False
+        for path, stat in list_json_files(data_path=data_path):
+            relative_path = os.path.relpath(path, data_path)
+            entry = cached_entries.pop(relative_path, None)
+            if entry is not None and (entry["size"], entry["mtime_ns"]) == (stat.st_size, stat.st_mtime_ns):
+                files.append(BatchFile.from_dict(path=path, data=entry))
+            else:
+                files.append(read_batch_file(path=path, stat=stat))
+                changed = True
+
+        manifest = cls(data_path=data_path, files=files)
+        if changed or cached_entries:
+            manifest.save(manifest_path=manifest_path)
+
+        return manifest
+
+    def save(self, manifest_path: str) -> None:
+        index = {
+            "version": MANIFEST_VERSION,
+            "files": {os.path.relpath(batch.path, self.data_path): batch.to_dict() for batch in self.files},
+        }
+        try:
+            with open(manifest_path, "w") as file:
+                json.dump(index, file)
+        except OSError as e:
+            # The index is only an optimization, e.g. the data directory may be read-only
+            logger.debug(f"Could not write dataset manifest {manifest_path}: {e}")
+
+
+def list_json_files(data_path: str) -> list[tuple[str, os.stat_result]]:
+    json_files = []
+    for root, dirs, files in os.walk(data_path):
+        dirs.sort()
+        for file_name in sorted(files):
+            if file_name.endswith(".json") and file_name != MANIFEST_FILE_NAME:
+                path = os.path.join(root, file_name)
+                json_files.append((path, os.stat(path)))
+
+    return json_files
+
+
+def read_manifest_entries(manifest_path: str) -> dict[str, dict[str, Any]]:
+    try:
+        with open(manifest_path, "r") as file:
+            index = json.load(file)
+    except (OSError, ValueError):
+        return {}
+
+    if index.get("version") != MANIFEST_VERSION:
+        return {}
+    return index.get("files", {})
+
+
+_manifests: dict[str, DatasetManifest] = {}
+_manifests_lock = threading.Lock()
+
+
+def get_dataset_manifest(data_path: str) -> DatasetManifest:
+    """
+    Get the manifest of a dataset directory. It's built once per process, from the sidecar index when
+    it's up to date, and served from memory afterwards.
+
+    :param data_path (str): Directory containing the batch files.
+    """
+    key = os.path.abspath(data_path)
+    with _manifests_lock:
+        manifest = _manifests.get(key)
+        if manifest is None:
+            manifest = DatasetManifest.load(data_path=data_path)
+            _manifests[key] = manifest
+
+    return manifest
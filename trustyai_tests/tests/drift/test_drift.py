@@ -6,10 +6,11 @@ from ocp_resources.namespace import Namespace
 from ocp_resources.trustyai_service import TrustyAIService
 
 from trustyai_tests.tests.metrics import Metric, get_metric_endpoint
+from trustyai_tests.tests.prometheus import ExpectedSeries
 from trustyai_tests.tests.utils import (
     verify_trustyai_model_metadata,
     send_data_to_inference_service,
-    verify_trustyai_metric_prometheus,
+    verify_trustyai_metrics_prometheus,
     verify_metric_request,
     verify_metric_scheduling,
     upload_data_to_trustyai_service,
@@ -17,8 +18,11 @@ from trustyai_tests.tests.utils import (
 )
 from trustyai_tests.tests.constants import (
     MODEL_DATA_PATH,
+    INGESTION_WINDOW,
 )
 
+DRIFT_METRICS: tuple[Metric, ...] = (Metric.MEANSHIFT, Metric.FOURIERMMD, Metric.KSTEST, Metric.APPROXKSTEST)
+
 
 @pytest.mark.openshift
 @pytest.mark.pvc
@@ -33,20 +37,22 @@ class TestDriftMetricsPVC:
     3. For each metric:
         3.1. Send a basic request and verify the response.
         3.2. Send a schedule request and verify the response.
-        3.3. Verify that the metric has reached Prometheus.
+    4. Verify that all the metrics have reached Prometheus.
     """
 
     def test_gaussian_credit_model_metadata_pvc(
         self, model_namespace: Namespace, trustyai_service_pvc: TrustyAIService, gaussian_credit_model: InferenceService
     ) -> None:
-        wait_for_modelmesh_pods_registered(namespace=model_namespace)
-
         path = f"{MODEL_DATA_PATH}/{gaussian_credit_model.name}"
+        wait_for_modelmesh_pods_registered(
+            namespace=model_namespace, inference_services=[gaussian_credit_model], data_path=f"{path}/data_batches"
+        )
 
         send_data_to_inference_service(
             inference_service=gaussian_credit_model,
             namespace=model_namespace,
             data_path=f"{path}/data_batches",
+            window=INGESTION_WINDOW,
         )
 
         response = upload_data_to_trustyai_service(
@@ -76,20 +82,10 @@ class TestDriftMetricsPVC:
     ) -> None:
         verify_metric_scheduling(
             namespace=model_namespace,
-            endpoint=get_metric_endpoint(metric=Metric.MEANSHIFT, schedule=True),
+            metric=Metric.MEANSHIFT,
             json_data={"modelId": gaussian_credit_model.name, "referenceTag": "TRAINING"},
         )
 
-    def test_meanshift_prometheus_query_pvc(
-        self, model_namespace: Namespace, trustyai_service_pvc: TrustyAIService, gaussian_credit_model: InferenceService
-    ) -> None:
-        verify_trustyai_metric_prometheus(
-            namespace=model_namespace,
-            model=gaussian_credit_model,
-            prometheus_query=f'trustyai_{Metric.MEANSHIFT.value}{{namespace="{model_namespace.name}"}}',
-            metric_name=Metric.MEANSHIFT.value,
-        )
-
     def test_request_fouriermmd_pvc(
         self, model_namespace: Namespace, trustyai_service_pvc: TrustyAIService, gaussian_credit_model: InferenceService
     ) -> None:
@@ -105,20 +101,10 @@ class TestDriftMetricsPVC:
     ) -> None:
         verify_metric_scheduling(
             namespace=model_namespace,
-            endpoint=get_metric_endpoint(metric=Metric.FOURIERMMD, schedule=True),
+            metric=Metric.FOURIERMMD,
             json_data={"modelId": gaussian_credit_model.name, "referenceTag": "TRAINING"},
         )
 
-    def test_fouriermmd_prometheus_query_pvc(
-        self, model_namespace: Namespace, trustyai_service_pvc: TrustyAIService, gaussian_credit_model: InferenceService
-    ) -> None:
-        verify_trustyai_metric_prometheus(
-            namespace=model_namespace,
-            model=gaussian_credit_model,
-            prometheus_query=f'trustyai_{Metric.FOURIERMMD.value}{{namespace="{model_namespace.name}"}}',
-            metric_name=Metric.FOURIERMMD.value,
-        )
-
     def test_request_kstest_pvc(
         self, model_namespace: Namespace, trustyai_service_pvc: TrustyAIService, gaussian_credit_model: InferenceService
     ) -> None:
@@ -134,20 +120,10 @@ class TestDriftMetricsPVC:
     ) -> None:
         verify_metric_scheduling(
             namespace=model_namespace,
-            endpoint=get_metric_endpoint(metric=Metric.KSTEST, schedule=True),
+            metric=Metric.KSTEST,
             json_data={"modelId": gaussian_credit_model.name, "referenceTag": "TRAINING"},
         )
 
-    def test_kstest_prometheus_query_pvc(
-        self, model_namespace: Namespace, trustyai_service_pvc: TrustyAIService, gaussian_credit_model: InferenceService
-    ) -> None:
-        verify_trustyai_metric_prometheus(
-            namespace=model_namespace,
-            model=gaussian_credit_model,
-            prometheus_query=f'trustyai_{Metric.KSTEST.value}{{namespace="{model_namespace.name}"}}',
-            metric_name=Metric.KSTEST.value,
-        )
-
     def test_request_approxkstest_pvc(
         self, model_namespace: Namespace, trustyai_service_pvc: TrustyAIService, gaussian_credit_model: InferenceService
     ) -> None:
@@ -163,18 +139,20 @@ class TestDriftMetricsPVC:
     ) -> None:
         verify_metric_scheduling(
             namespace=model_namespace,
-            endpoint=get_metric_endpoint(metric=Metric.APPROXKSTEST, schedule=True),
+            metric=Metric.APPROXKSTEST,
             json_data={"modelId": gaussian_credit_model.name, "referenceTag": "TRAINING"},
         )
 
-    def test_approxkstest_prometheus_query_pvc(
+    def test_drift_metrics_prometheus_query_pvc(
         self, model_namespace: Namespace, trustyai_service_pvc: TrustyAIService, gaussian_credit_model: InferenceService
     ) -> None:
-        verify_trustyai_metric_prometheus(
-            namespace=model_namespace,
-            model=gaussian_credit_model,
-            prometheus_query=f"trustyai_{Metric.APPROXKSTEST.value}" f'{{namespace="{model_namespace.name}"}}',
-            metric_name=Metric.APPROXKSTEST.value,
+        verify_trustyai_metrics_prometheus(
+            expected=[
+                ExpectedSeries(
+                    namespace=model_namespace, model_name=gaussian_credit_model.name, metric_name=metric.value
+                )
+                for metric in DRIFT_METRICS
+            ]
         )
 
 
@@ -191,20 +169,22 @@ class TestDriftMetricsDB:
     3. For each metric:
         3.1. Send a basic request and verify the response.
         3.2. Send a schedule request and verify the response.
-        3.3. Verify that the metric has reached Prometheus.
+    4. Verify that all the metrics have reached Prometheus.
     """
 
     def test_gaussian_credit_model_metadata_db(
         self, model_namespace: Namespace, trustyai_service_db: TrustyAIService, gaussian_credit_model: InferenceService
     ) -> None:
-        wait_for_modelmesh_pods_registered(namespace=model_namespace)
-
         path = f"{MODEL_DATA_PATH}/{gaussian_credit_model.name}"
+        wait_for_modelmesh_pods_registered(
+            namespace=model_namespace, inference_services=[gaussian_credit_model], data_path=f"{path}/data_batches"
+        )
 
         send_data_to_inference_service(
             inference_service=gaussian_credit_model,
             namespace=model_namespace,
             data_path=f"{path}/data_batches",
+            window=INGESTION_WINDOW,
         )
 
         response = upload_data_to_trustyai_service(
@@ -234,20 +214,10 @@ class TestDriftMetricsDB:
     ) -> None:
         verify_metric_scheduling(
             namespace=model_namespace,
-            endpoint=get_metric_endpoint(metric=Metric.MEANSHIFT, schedule=True),
+            metric=Metric.MEANSHIFT,
             json_data={"modelId": gaussian_credit_model.name, "referenceTag": "TRAINING"},
         )
 
-    def test_meanshift_prometheus_query_db(
-        self, model_namespace: Namespace, trustyai_service_db: TrustyAIService, gaussian_credit_model: InferenceService
-    ) -> None:
-        verify_trustyai_metric_prometheus(
-            namespace=model_namespace,
-            model=gaussian_credit_model,
-            prometheus_query=f'trustyai_{Metric.MEANSHIFT.value}{{namespace="{model_namespace.name}"}}',
-            metric_name=Metric.MEANSHIFT.value,
-        )
-
     def test_request_fouriermmd_db(
         self, model_namespace: Namespace, trustyai_service_db: TrustyAIService, gaussian_credit_model: InferenceService
     ) -> None:
@@ -263,20 +233,10 @@ class TestDriftMetricsDB:
     ) -> None:
         verify_metric_scheduling(
             namespace=model_namespace,
-            endpoint=get_metric_endpoint(metric=Metric.FOURIERMMD, schedule=True),
+            metric=Metric.FOURIERMMD,
             json_data={"modelId": gaussian_credit_model.name, "referenceTag": "TRAINING"},
         )
 
-    def test_fouriermmd_prometheus_query_db(
-        self, model_namespace: Namespace, trustyai_service_db: TrustyAIService, gaussian_credit_model: InferenceService
-    ) -> None:
-        verify_trustyai_metric_prometheus(
-            namespace=model_namespace,
-            model=gaussian_credit_model,
-            prometheus_query=f'trustyai_{Metric.FOURIERMMD.value}{{namespace="{model_namespace.name}"}}',
-            metric_name=Metric.FOURIERMMD.value,
-        )
-
     def test_request_kstest_db(
         self, model_namespace: Namespace, trustyai_service_db: TrustyAIService, gaussian_credit_model: InferenceService
     ) -> None:
@@ -292,20 +252,10 @@ class TestDriftMetricsDB:
     ) -> None:
         verify_metric_scheduling(
             namespace=model_namespace,
-            endpoint=get_metric_endpoint(metric=Metric.KSTEST, schedule=True),
+            metric=Metric.KSTEST,
             json_data={"modelId": gaussian_credit_model.name, "referenceTag": "TRAINING"},
         )
 
-    def test_kstest_prometheus_query_db(
-        self, model_namespace: Namespace, trustyai_service_db: TrustyAIService, gaussian_credit_model: InferenceService
-    ) -> None:
-        verify_trustyai_metric_prometheus(
-            namespace=model_namespace,
-            model=gaussian_credit_model,
-            prometheus_query=f'trustyai_{Metric.KSTEST.value}{{namespace="{model_namespace.name}"}}',
-            metric_name=Metric.KSTEST.value,
-        )
-
     def test_request_approxkstest_db(
         self, model_namespace: Namespace, trustyai_service_db: TrustyAIService, gaussian_credit_model: InferenceService
     ) -> None:
@@ -321,16 +271,18 @@ class TestDriftMetricsDB:
     ) -> None:
         verify_metric_scheduling(
             namespace=model_namespace,
-            endpoint=get_metric_endpoint(metric=Metric.APPROXKSTEST, schedule=True),
+            metric=Metric.APPROXKSTEST,
             json_data={"modelId": gaussian_credit_model.name, "referenceTag": "TRAINING"},
         )
 
-    def test_approxkstest_prometheus_query_db(
+    def test_drift_metrics_prometheus_query_db(
         self, model_namespace: Namespace, trustyai_service_db: TrustyAIService, gaussian_credit_model: InferenceService
     ) -> None:
-        verify_trustyai_metric_prometheus(
-            namespace=model_namespace,
-            model=gaussian_credit_model,
-            prometheus_query=f"trustyai_{Metric.APPROXKSTEST.value}" f'{{namespace="{model_namespace.name}"}}',
-            metric_name=Metric.APPROXKSTEST.value,
+        verify_trustyai_metrics_prometheus(
+            expected=[
+                ExpectedSeries(
+                    namespace=model_namespace, model_name=gaussian_credit_model.name, metric_name=metric.value
+                )
+                for metric in DRIFT_METRICS
+            ]
         )
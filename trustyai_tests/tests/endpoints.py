@@ -0,0 +1,136 @@
+import logging
+import threading
+from enum import Enum
+from typing import Any, Optional
+
+from kubernetes.dynamic import DynamicClient
+from ocp_resources.resource import get_client
+
+from trustyai_tests.tests.informers import Informer, InformerCache, informer_cache
+
+logger: logging.Logger = logging.getLogger(__name__)
+
+
+class EndpointKind(Enum):
+    ROUTE = ("route.openshift.io/v1", "Route")
+    KNATIVE_SERVICE = ("serving.knative.dev/v1", "Service")
+
+    def __init__(self, api_version: str, kind: str):
+        self.api_version = api_version
+        self.kind = kind
+
+
+class ResolvedEndpoint:
+    def __init__(self, url: str, resource_version: str):
+        self.url = url
+        self.resource_version = resource_version
+
+
+def get_endpoint_url(kind: EndpointKind, resource: Any) -> Optional[str]:
+    """Build the external URL of a Route or Knative Service from its raw object."""
+    if kind == EndpointKind.ROUTE:
+        return f"https://{resource.spec.host}{resource.spec.path or ''}"
+
+    return resource.status.url if resource.status else None
+
+
+class EndpointResolver:
+    """
+    In-memory cache of the external URLs of Routes and Knative Services, keyed by (namespace, name, kind).
+
+    The first lookup of a (namespace, kind) subscribes to the shared informer of that kind, and entries are
+    replaced or dropped when a watch event carries a newer resourceVersion. Callers that hit a stale URL can
+    also `invalidate` it explicitly.
+    """
+
+    def __init__(self, client: Optional[DynamicClient] = None, informers: InformerCache = informer_cache):
+        self.client = client
+        self.informers = informers
+        self._endpoints: dict[tuple[str, str, EndpointKind], ResolvedEndpoint] = {}
+        self._subscriptions: set[tuple[str, EndpointKind]] = set()
+        self._lock = threading.Lock()
+
+    def get_url(self, namespace: str, name: str, kind: EndpointKind) -> str:
+        """
+        Get the URL of a Route or Knative Service, resolving it from the informer cache on a cache miss,
+        or through the API server if the informer hasn't seen the resource yet.
+
+        :param namespace (str): Namespace of the resource.
+        :param name (str): Name of the resource.
+        :param kind (EndpointKind): Kind of the resource.
+        """
+        key = (namespace, name, kind)
+        with self._lock:
+            endpoint = self._endpoints.get(key)
+        if endpoint is not None:
+            return endpoint.url
+
+        informer = self._subscribe(namespace=namespace, kind=kind)
+        resource = informer.get(name=name)
+        if resource is None:
+            # Not seen by the informer yet, e.g. it was created a moment ago
+            resource = self._get_resource_api(kind=kind).get(name=name, namespace=namespace)
+        url = get_endpoint_url(kind=kind, resource=resource)
+        if not url:
+            raise ValueError(f"{kind.kind} {name} in namespace {namespace} has no URL yet")
+
+        with self._lock:
+            self._endpoints[key] = ResolvedEndpoint(url=url, resource_version=resource.metadata.resourceVersion)
+
+        return url
+
+    def invalidate(self, namespace: str, name: str, kind: EndpointKind) -> None:
+        with self._lock:
+            self._endpoints.pop((namespace, name, kind), None)
+
+    def handle_event(self, kind: EndpointKind, event: dict[str, Any]) -> None:
+        """Update the cache from a watch event on a Route or Knative Service."""
+        resource = event["object"]
+        key = (resource.metadata.namespace, resource.metadata.name, kind)
+
+        with self._lock:
+            endpoint = self._endpoints.get(key)
+            if endpoint is None or endpoint.resource_version == resource.metadata.resourceVersion:
+                return
+
+            url = get_endpoint_url(kind=kind, resource=resource)
+            if event["type"] == "DELETED" or not url:
+                del self._endpoints[key]
+            else:
+                self._endpoints[key] = ResolvedEndpoint(url=url, resource_version=resource.metadata.resourceVersion)
+
+        logger.debug(f"{kind.kind} {key[1]} in namespace {key[0]} changed ({event['type']}), endpoint updated")
+
+    def forget_namespace(self, namespace: str, kind: Optional[EndpointKind] = None) -> None:
+        """
+        Drop the cached endpoints of a namespace, e.g. when it is deleted.
+
+        :param namespace (str): Namespace to forget.
+        :param kind (EndpointKind): Only forget endpoints of this kind. All kinds if not set.
+        """
+        with self._lock:
+            for key in [key for key in self._endpoints if key[0] == namespace and kind in (None, key[2])]:
+                del self._endpoints[key]
+            self._subscriptions = {
+                key for key in self._subscriptions if key[0] != namespace or kind not in (None, key[1])
+            }
+
+    def _get_resource_api(self, kind: EndpointKind) -> Any:
+        if self.client is None:
+            self.client = get_client()
+        return self.client.resources.get(api_version=kind.api_version, kind=kind.kind)
+
+    def _subscribe(self, namespace: str, kind: EndpointKind) -> Informer:
+        informer = self.informers.get_informer(namespace=namespace, api_version=kind.api_version, kind=kind.kind)
+        with self._lock:
+            if (namespace, kind) in self._subscriptions:
+                return informer
+            self._subscriptions.add((namespace, kind))
+
+        informer.subscribe(
+            key=f"{__name__}.{kind.name}", handler=lambda event: self.handle_event(kind=kind, event=event)
+        )
+        return informer
+
+
+endpoint_resolver = EndpointResolver()
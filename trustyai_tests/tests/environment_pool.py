@@ -0,0 +1,142 @@
+import logging
+import threading
+from contextlib import AbstractContextManager, ExitStack
+from typing import Any, Callable, Iterator, Optional
+
+logger: logging.Logger = logging.getLogger(__name__)
+
+# Storage formats of the TrustyAIService, each provisioned in its own pooled namespace
+PVC: str = "PVC"
+DATABASE: str = "DATABASE"
+
+
+def get_pooled_namespace_name(storage_format: str) -> str:
+    return f"test-namespace-{storage_format.lower()}"
+
+
+class PooledResource:
+    """A resource deployed by the pool, kept until it's replaced by another variant or the session ends."""
+
+    def __init__(self, variant: Optional[str], value: Any, exit_stack: ExitStack):
+        self.variant = variant
+        self.value = value
+        self.exit_stack = exit_stack
+
+
+class EnvironmentPool:
+    """
+    Session-wide pool of test environments, one namespace per TrustyAIService storage format.
+
+    Class fixtures lease their resources (the namespace, MinIO, MariaDB, the serving runtimes and the
+    TrustyAIService) from the pool instead of deploying them, so they're provisioned on the first lease and
+    only torn down at the end of the session. At the end of each lease, the fixtures reset what the test class
+    changed, e.g. the metrics it scheduled.
+
+    Only the resources of the namespaces provisioned by the pool are pooled. Elsewhere, or when the pool is
+    disabled, every lease deploys its resource and tears it down at the end of the class, as without a pool.
+    """
+
+    def __init__(self, enabled: bool = False):
+        self.enabled = enabled
+        self._resources: dict[str, PooledResource] = {}
+        self._namespaces: set[str] = set()
+        self._lock = threading.RLock()
+
+    def provide_namespace(
+        self,
+        name: str,
+        factory: Callable[[], AbstractContextManager[Any]],
+        reset: Optional[Callable[[Any], None]] = None,
+    ) -> Iterator[Any]:
+        """
+        Lease a namespace whose resources are pooled too, to be used with `yield from` in a class-scoped fixture.
+
+        :param name (str): Name of the namespace.
+        :param factory (Callable): Returns a context manager that creates the namespace and deletes it.
+        :param reset (Callable): Called with the namespace at the end of each lease, when pooled.
+        """
+        if self.enabled:
+            with self._lock:
+                self._namespaces.add(name)
+
+        yield from self.provide(namespace=name, key="Namespace", factory=factory, reset=reset)
+
+    def provide(
+        self,
+        namespace: str,
+        key: str,
+        factory: Callable[[], AbstractContextManager[Any]],
+        variant: Optional[str] = None,
+        reset: Optional[Callable[[Any], None]] = None,
+    ) -> Iterator[Any]:
+        """
+        Lease a resource of a namespace, to be used with `yield from` in a class-scoped fixture.
+
+        :param namespace (str): Namespace of the resource. It's only pooled in the namespaces of the pool.
+        :param key (str): Identity of the resource in the namespace, e.g. `ServingRuntime/<name>`.
+        :param factory (Callable): Returns a context manager that deploys the resource and tears it down.
+        :param variant (str): Variant of the resource. A pooled resource with the same key but another variant
+            is torn down and replaced, e.g. a ModelMesh and a KServe serving runtime with the same name.
+        :param reset (Callable): Called with the resource at the end of each lease, when pooled.
+        """
+        with self._lock:
+            pooled = namespace in self._namespaces
+
+        if not pooled:
+            with factory() as value:
+                yield value
+            return
+
+        pooled_key = f"{namespace}/{key}"
+        value = self.acquire(key=pooled_key, factory=factory, variant=variant)
+        try:
+            yield value
+        finally:
+            if reset is not None:
+                self.reset(key=pooled_key, value=value, reset=reset)
+
+    def reset(self, key: str, value: Any, reset: Callable[[Any], None]) -> None:
+        """Reset a pooled resource at the end of a lease. If that fails, it's torn down rather than leased dirty."""
+        try:
+            reset(value)
+        except Exception as e:
+            logger.error(f"Failed to reset pooled {key}, tearing it down: {e}")
+            with self._lock:
+                resource = self._resources.pop(key, None)
+            if resource is not None:
+                resource.exit_stack.close()
+            raise
+
+    def acquire(
+        self, key: str, factory: Callable[[], AbstractContextManager[Any]], variant: Optional[str] = None
+    ) -> Any:
+        """Get a pooled resource, deploying it on first use or when another variant of it is pooled."""
+        with self._lock:
+            resource = self._resources.get(key)
+            if resource is not None and resource.variant != variant:
+                logger.info(f"Replacing pooled {key} ({resource.variant}) with {variant}")
+                self._resources.pop(key).exit_stack.close()
+                resource = None
+
+            if resource is None:
+                logger.info(f"Provisioning pooled {key}")
+                exit_stack = ExitStack()
+                resource = PooledResource(
+                    variant=variant, value=exit_stack.enter_context(factory()), exit_stack=exit_stack
+                )
+                self._resources[key] = resource
+
+            return resource.value
+
+    def close(self) -> None:
+        """Tear down every pooled resource, in the reverse order they were provisioned."""
+        with self._lock:
+            resources, self._resources = self._resources, {}
+            self._namespaces.clear()
+
+        for key, resource in reversed(list(resources.items())):
+            logger.info(f"Tearing down pooled {key}")
+            try:
+                resource.exit_stack.close()
+            except Exception as e:
+                logger.error(f"Failed to tear down pooled {key}: {e}")
@@ -0,0 +1,185 @@
+import logging
+from datetime import datetime, timezone
+from typing import Any, List, Optional
+
+import yaml
+from ocp_resources.pod import Pod
+
+logger: logging.Logger = logging.getLogger(__name__)
+
+# Container waiting reasons that don't go away without a change to the pod spec
+TERMINAL_WAITING_REASONS: tuple[str, ...] = ("ImagePullBackOff", "InvalidImageName", "ErrImageNeverPull")
+CRASH_LOOP_BACK_OFF: str = "CrashLoopBackOff"
+OOM_KILLED: str = "OOMKilled"
+# Restarts before a crash loop is considered terminal, so containers racing a dependency at startup get a chance
+CRASH_LOOP_RESTART_THRESHOLD: int = 3
+# How long a pod can stay unschedulable before giving up, e.g. while a volume is provisioned or a node is added
+UNSCHEDULABLE_GRACE_SECONDS: float = 120
+# How long pods can keep failing to be created before giving up, e.g. on a quota or admission rejection.
+# Shorter bursts happen while an operator is still creating the service account or secrets the pods need.
+FAILED_CREATE_GRACE_SECONDS: float = 120
+
+FAILURE_LOG_LINES: int = 50
+FAILURE_EVENTS: int = 20
+
+
+class ResourceFailure:
+    """A resource in a state it won't recover from on its own."""
+
+    def __init__(self, kind: str, name: str, reason: str, message: str = "", container: Optional[str] = None):
+        self.kind = kind
+        self.name = name
+        self.reason = reason
+        self.message = message
+        self.container = container
+
+    def __str__(self) -> str:
+        container = f" (container {self.container})" if self.container else ""
+        message = f": {self.message}" if self.message else ""
+        return f"{self.kind} {self.name}{container} {self.reason}{message}"
+
+
+class UnrecoverableResourceError(Exception):
+    """Raised by waits that gave up early, because what they wait for can't happen anymore."""
+
+    def __init__(self, namespace: str, failures: List[ResourceFailure], diagnostics: str):
+        self.namespace = namespace
+        self.failures = failures
+        self.diagnostics = diagnostics
+        super().__init__(
+            f"Giving up waiting in namespace {namespace}: {'; '.join(str(failure) for failure in failures)}"
+            f"\n\n{diagnostics}"
+        )
+
+
+def get_age_seconds(timestamp: Optional[str]) -> float:
+    """Seconds since a Kubernetes timestamp, e.g. 2024-05-01T12:00:00Z. 0 if it's missing."""
+    if not timestamp:
+        return 0
+    return (datetime.now(timezone.utc) - datetime.fromisoformat(timestamp.replace("Z", "+00:00"))).total_seconds()
+
+
+def classify_pod(pod: Any) -> List[ResourceFailure]:
+    """Terminal failures of a raw Pod object: bad image, crash loop, OOM kill, or unschedulable for too long."""
+    if not pod.status or pod.metadata.deletionTimestamp is not None:
+        return []
+
+    failures = []
+    container_statuses = (pod.status.initContainerStatuses or []) + (pod.status.containerStatuses or [])
+    for container in container_statuses:
+        waiting = container.state and container.state.waiting
+        terminated = container.state and container.state.terminated
+        last_terminated = container.lastState and container.lastState.terminated
+        running = container.state and container.state.running
+
+        if waiting and waiting.reason in TERMINAL_WAITING_REASONS:
+            reason, message = waiting.reason, waiting.message
+        elif (terminated and terminated.reason == OOM_KILLED) or (
+            # A container running again after an OOM kill may recover, unless it keeps getting killed
+            last_terminated
+            and last_terminated.reason == OOM_KILLED
+            and (not running or container.restartCount >= CRASH_LOOP_RESTART_THRESHOLD)
+        ):
+            reason, message = OOM_KILLED, f"{container.restartCount} restarts"
+        elif (
+            waiting and waiting.reason == CRASH_LOOP_BACK_OFF and container.restartCount >= CRASH_LOOP_RESTART_THRESHOLD
+        ):
+            reason, message = CRASH_LOOP_BACK_OFF, f"{container.restartCount} restarts"
+        else:
+            continue
+
+        failures.append(
+            ResourceFailure(
+                kind="Pod", name=pod.metadata.name, reason=reason, message=message or "", container=container.name
+            )
+        )
+
+    for condition in pod.status.conditions or []:
+        if (
+            condition.type == "PodScheduled"
+            and condition.status == "False"
+            and condition.reason == "Unschedulable"
+            and get_age_seconds(timestamp=condition.lastTransitionTime) >= UNSCHEDULABLE_GRACE_SECONDS
+        ):
+            failures.append(
+                ResourceFailure(kind="Pod", name=pod.metadata.name, reason="Unschedulable", message=condition.message)
+            )
+
+    return failures
+
+
+def classify_event(event: Any) -> Optional[ResourceFailure]:
+    """
+    Terminal failure reported by a raw Event object, for what pod states can't show,
+    e.g. a ReplicaSet that kept failing to create its pods for a while, and still does.
+    """
+    if event.type != "Warning" or event.reason != "FailedCreate":
+        return None
+
+    last_seen = get_age_seconds(timestamp=event.lastTimestamp)
+    if (
+        get_age_seconds(timestamp=event.firstTimestamp) - last_seen < FAILED_CREATE_GRACE_SECONDS
+        or last_seen > FAILED_CREATE_GRACE_SECONDS
+    ):
+        return None
+
+    return ResourceFailure(
+        kind=event.involvedObject.kind, name=event.involvedObject.name, reason=event.reason, message=event.message
+    )
+
+
+def get_pod_summary(pod: Any) -> dict[str, Any]:
+    return {
+        "name": pod.metadata.name,
+        "phase": pod.status and pod.status.phase,
+        "conditions": [condition.to_dict() for condition in (pod.status and pod.status.conditions) or []],
+        "containerStatuses": [
+            container.to_dict()
+            for container in ((pod.status and pod.status.initContainerStatuses) or [])
+            + ((pod.status and pod.status.containerStatuses) or [])
+        ],
+    }
+
+
+def get_diagnostics(
+    namespace: str, failures: List[ResourceFailure], pods: List[Any], events: List[Any], client: Any
+) -> str:
+    """
+    Diagnostic bundle of a failed wait: the state of the failing pods, the logs of the previous run of their
+    crashed containers, and the latest Warning events of the failing objects.
+    """
+    failing = {(failure.kind, failure.name) for failure in failures}
+    sections = []
+
+    for pod in pods:
+        if ("Pod", pod.metadata.name) not in failing:
+            continue
+        sections.append(f"--- Pod {pod.metadata.name} ---\n{yaml.dump(get_pod_summary(pod=pod))}")
+
+    for failure in failures:
+        if failure.kind != "Pod" or failure.reason not in (CRASH_LOOP_BACK_OFF, OOM_KILLED):
+            continue
+        try:
+            log = Pod(name=failure.name, namespace=namespace, client=client).log(
+                container=failure.container, previous=True, tail_lines=FAILURE_LOG_LINES
+            )
+        except Exception as e:
+            log = f"Could not get the logs: {e}"
+        sections.append(f"--- Previous logs of {failure.name}/{failure.container} ---\n{log}")
+
+    warnings = [
+        event
+        for event in events
+        if event.type == "Warning" and (event.involvedObject.kind, event.involvedObject.name) in failing
+    ]
+    warnings.sort(key=lambda event: event.lastTimestamp or event.eventTime or "")
+    sections.append(
+        "--- Warning events ---\n"
+        + "\n".join(
+            f"{event.lastTimestamp or event.eventTime} {event.involvedObject.kind}/{event.involvedObject.name} "
+            f"{event.reason}: {event.message}"
+            for event in warnings[-FAILURE_EVENTS:]
+        )
+    )
+
+    return "\n".join(sections)
@@ -6,15 +6,17 @@ from ocp_resources.inference_service import InferenceService
 from ocp_resources.namespace import Namespace
 from ocp_resources.trustyai_service import TrustyAIService
 
-from trustyai_tests.tests.constants import MODEL_DATA_PATH
+from trustyai_tests.tests.async_clients import IngestionJob, run_ingestion_jobs
+from trustyai_tests.tests.constants import INGESTION_WINDOW, MODEL_DATA_PATH
 from trustyai_tests.tests.metrics import get_metric_endpoint, Metric
+from trustyai_tests.tests.prometheus import ExpectedSeries
 from trustyai_tests.tests.utils import (
     send_data_to_inference_service,
     verify_trustyai_model_metadata,
     verify_metric_request,
     verify_metric_scheduling,
     apply_trustyai_name_mappings,
-    verify_trustyai_metric_prometheus,
+    verify_trustyai_metrics_prometheus,
     wait_for_modelmesh_pods_registered,
 )
 
@@ -74,15 +76,20 @@ class TestFairnessMetricsPVC:
         onnx_loan_model_alpha: InferenceService,
         onnx_loan_model_beta: InferenceService,
     ) -> None:
-        wait_for_modelmesh_pods_registered(namespace=model_namespace)
-
-        for model in [onnx_loan_model_alpha, onnx_loan_model_beta]:
-            send_data_to_inference_service(
-                inference_service=model,
-                namespace=model_namespace,
-                data_path=INPUT_DATA_PATH,
-            )
+        models = [onnx_loan_model_alpha, onnx_loan_model_beta]
+        wait_for_modelmesh_pods_registered(
+            namespace=model_namespace, inference_services=models, data_path=INPUT_DATA_PATH
+        )
+        results = run_ingestion_jobs(
+            jobs=[
+                IngestionJob(namespace=model_namespace, inference_service=model, data_path=INPUT_DATA_PATH)
+                for model in models
+            ],
+            window=INGESTION_WINDOW,
+        )
+        assert all(result.ok for result in results), [str(result.error) for result in results if not result.ok]
 
+        for model in models:
             apply_trustyai_name_mappings(
                 namespace=model_namespace,
                 inference_service=model,
@@ -121,7 +128,7 @@ class TestFairnessMetricsPVC:
         for model in [onnx_loan_model_alpha, onnx_loan_model_beta]:
             verify_metric_scheduling(
                 namespace=model_namespace,
-                endpoint=get_metric_endpoint(metric=Metric.SPD, schedule=True),
+                metric=Metric.SPD,
                 json_data=get_json_data(model),
             )
 
@@ -132,13 +139,12 @@ class TestFairnessMetricsPVC:
         onnx_loan_model_alpha: InferenceService,
         onnx_loan_model_beta: InferenceService,
     ) -> None:
-        for model in [onnx_loan_model_alpha, onnx_loan_model_beta]:
-            verify_trustyai_metric_prometheus(
-                namespace=model_namespace,
-                model=model,
-                prometheus_query=f"trustyai_{Metric.SPD.value}" f'{{namespace="{model_namespace.name}"}}',
-                metric_name=Metric.SPD.value,
-            )
+        verify_trustyai_metrics_prometheus(
+            expected=[
+                ExpectedSeries(namespace=model_namespace, model_name=model.name, metric_name=Metric.SPD.value)
+                for model in [onnx_loan_model_alpha, onnx_loan_model_beta]
+            ]
+        )
 
     def test_request_dir_pvc(
         self,
@@ -165,7 +171,7 @@ class TestFairnessMetricsPVC:
         for model in [onnx_loan_model_alpha, onnx_loan_model_beta]:
             verify_metric_scheduling(
                 namespace=model_namespace,
-                endpoint=get_metric_endpoint(metric=Metric.DIR, schedule=True),
+                metric=Metric.DIR,
                 json_data=get_json_data(model),
             )
 
@@ -176,13 +182,12 @@ class TestFairnessMetricsPVC:
         onnx_loan_model_alpha: InferenceService,
         onnx_loan_model_beta: InferenceService,
     ) -> None:
-        for inference_service in [onnx_loan_model_alpha, onnx_loan_model_beta]:
-            verify_trustyai_metric_prometheus(
-                namespace=model_namespace,
-                model=inference_service,
-                prometheus_query=f"trustyai_{Metric.DIR.value}" f'{{namespace="{model_namespace.name}"}}',
-                metric_name=Metric.DIR.value,
-            )
+        verify_trustyai_metrics_prometheus(
+            expected=[
+                ExpectedSeries(namespace=model_namespace, model_name=model.name, metric_name=Metric.DIR.value)
+                for model in [onnx_loan_model_alpha, onnx_loan_model_beta]
+            ]
+        )
 
 
 @pytest.mark.openshift
@@ -209,15 +214,20 @@ class TestFairnessMetricsDB:
         onnx_loan_model_alpha: InferenceService,
         onnx_loan_model_beta: InferenceService,
     ) -> None:
-        wait_for_modelmesh_pods_registered(namespace=model_namespace)
-
-        for model in [onnx_loan_model_alpha, onnx_loan_model_beta]:
-            send_data_to_inference_service(
-                inference_service=model,
-                namespace=model_namespace,
-                data_path=INPUT_DATA_PATH,
-            )
+        models = [onnx_loan_model_alpha, onnx_loan_model_beta]
+        wait_for_modelmesh_pods_registered(
+            namespace=model_namespace, inference_services=models, data_path=INPUT_DATA_PATH
+        )
+        results = run_ingestion_jobs(
+            jobs=[
+                IngestionJob(namespace=model_namespace, inference_service=model, data_path=INPUT_DATA_PATH)
+                for model in models
+            ],
+            window=INGESTION_WINDOW,
+        )
+        assert all(result.ok for result in results), [str(result.error) for result in results if not result.ok]
 
+        for model in models:
             apply_trustyai_name_mappings(
                 namespace=model_namespace,
                 inference_service=model,
@@ -256,7 +266,7 @@ class TestFairnessMetricsDB:
         for model in [onnx_loan_model_alpha, onnx_loan_model_beta]:
             verify_metric_scheduling(
                 namespace=model_namespace,
-                endpoint=get_metric_endpoint(metric=Metric.SPD, schedule=True),
+                metric=Metric.SPD,
                 json_data=get_json_data(model),
             )
 
@@ -267,13 +277,12 @@ class TestFairnessMetricsDB:
         onnx_loan_model_alpha: InferenceService,
         onnx_loan_model_beta: InferenceService,
     ) -> None:
-        for model in [onnx_loan_model_alpha, onnx_loan_model_beta]:
-            verify_trustyai_metric_prometheus(
-                namespace=model_namespace,
-                model=model,
-                prometheus_query=f"trustyai_{Metric.SPD.value}" f'{{namespace="{model_namespace.name}"}}',
-                metric_name=Metric.SPD.value,
-            )
+        verify_trustyai_metrics_prometheus(
+            expected=[
+                ExpectedSeries(namespace=model_namespace, model_name=model.name, metric_name=Metric.SPD.value)
+                for model in [onnx_loan_model_alpha, onnx_loan_model_beta]
+            ]
+        )
 
     def test_request_dir_db(
         self,
@@ -300,7 +309,7 @@ class TestFairnessMetricsDB:
         for model in [onnx_loan_model_alpha, onnx_loan_model_beta]:
             verify_metric_scheduling(
                 namespace=model_namespace,
-                endpoint=get_metric_endpoint(metric=Metric.DIR, schedule=True),
+                metric=Metric.DIR,
                 json_data=get_json_data(model),
             )
 
@@ -311,13 +320,12 @@ class TestFairnessMetricsDB:
         onnx_loan_model_alpha: InferenceService,
         onnx_loan_model_beta: InferenceService,
     ) -> None:
-        for inference_service in [onnx_loan_model_alpha, onnx_loan_model_beta]:
-            verify_trustyai_metric_prometheus(
-                namespace=model_namespace,
-                model=inference_service,
-                prometheus_query=f"trustyai_{Metric.DIR.value}" f'{{namespace="{model_namespace.name}"}}',
-                metric_name=Metric.DIR.value,
-            )
+        verify_trustyai_metrics_prometheus(
+            expected=[
+                ExpectedSeries(namespace=model_namespace, model_name=model.name, metric_name=Metric.DIR.value)
+                for model in [onnx_loan_model_alpha, onnx_loan_model_beta]
+            ]
+        )
 
 
 @pytest.mark.openshift
@@ -349,6 +357,7 @@ class TestFairnessMetricsKserve:
             namespace=model_namespace,
             data_path=INPUT_DATA_PATH,
             type="kserve",
+            window=INGESTION_WINDOW,
         )
 
         apply_trustyai_name_mappings(
@@ -385,6 +394,6 @@ class TestFairnessMetricsKserve:
     ) -> None:
         verify_metric_scheduling(
             namespace=model_namespace,
-            endpoint=get_metric_endpoint(metric=Metric.SPD, schedule=True),
+            metric=Metric.SPD,
             json_data=get_json_data(onnx_loan_model_alpha_kserve),
         )
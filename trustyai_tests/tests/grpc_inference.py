@@ -0,0 +1,154 @@
+import logging
+import threading
+
+import grpc
+import numpy as np
+from ocp_resources.namespace import Namespace
+from ocp_resources.pod import Pod
+
+from trustyai_tests.tests.constants import MODELMESH_POD_LABEL_SELECTOR
+from trustyai_tests.tests.datasets import BatchFile, get_tensor_buffer, read_batch_arrays
+from trustyai_tests.tests.informers import informer_cache
+from trustyai_tests.tests.port_forward import PortForward
+
+logger: logging.Logger = logging.getLogger(__name__)
+
+# ModelMesh serves the KServe v2 gRPC API of every model of the namespace on this port of its pods
+MODELMESH_GRPC_PORT: int = 8033
+# Metadata ModelMesh routes a request with, to the model of an InferenceService
+MODELMESH_MODEL_ID_HEADER: str = "mm-vmodel-id"
+# ModelMesh only proxies the unary KServe v2 RPCs, not Triton's ModelStreamInfer extension
+MODEL_INFER_METHOD: str = "/inference.GRPCInferenceService/ModelInfer"
+GRPC_TIMEOUT_SECONDS: float = 60
+
+# Protobuf wire types
+LENGTH_DELIMITED: int = 2
+
+
+def encode_varint(value: int) -> bytes:
+    # Negative int64 values are encoded as their 64-bit two's complement
+    value &= (1 << 64) - 1
+    encoded = bytearray()
+    while value > 0x7F:
+        encoded.append((value & 0x7F) | 0x80)
+        value >>= 7
+    encoded.append(value)
+
+    return bytes(encoded)
+
+
+def encode_length_delimited(field_number: int, payload: bytes) -> bytes:
+    return encode_varint((field_number << 3) | LENGTH_DELIMITED) + encode_varint(len(payload)) + payload
+
+
+def encode_model_infer_request(model_name: str, tensors: list[tuple[str, str, np.ndarray]]) -> bytes:
+    """
+    Encode a KServe v2 ModelInferRequest, with the tensor data in `raw_input_contents`.
+    Only the fields used here are encoded, so the suite doesn't need the generated protobuf classes.
+
+    :param model_name (str): Name of the model.
+    :param tensors (list[tuple[str, str, np.ndarray]]): Name, datatype and data of each input tensor.
+    """
+    # ModelInferRequest: model_name = 1, inputs = 5, raw_input_contents = 7
+    # InferInputTensor: name = 1, datatype = 2, shape = 3 (packed int64)
+    inputs, raw_input_contents = [], []
+    for name, datatype, data in tensors:
+        shape = b"".join(encode_varint(dimension) for dimension in data.shape)
+        tensor = (
+            encode_length_delimited(field_number=1, payload=name.encode("utf-8"))
+            + encode_length_delimited(field_number=2, payload=datatype.encode("utf-8"))
+            + encode_length_delimited(field_number=3, payload=shape)
+        )
+        inputs.append(encode_length_delimited(field_number=5, payload=tensor))
+        raw_input_contents.append(
+            encode_length_delimited(field_number=7, payload=get_tensor_buffer(datatype=datatype, data=data))
+        )
+
+    return b"".join([
+        encode_length_delimited(field_number=1, payload=model_name.encode("utf-8")),
+        *inputs,
+        *raw_input_contents,
+    ])
+
+
+def read_model_infer_request(batch: BatchFile, model_name: str) -> bytes:
+    """Read a batch file as an encoded ModelInferRequest for a model."""
+    arrays = read_batch_arrays(batch=batch)
+    return encode_model_infer_request(
+        model_name=model_name,
+        tensors=[(tensor.name, tensor.datatype, data) for tensor, data in zip(batch.tensors, arrays)],
+    )
+
+
+def get_modelmesh_pod(namespace: Namespace) -> Pod:
+    pods = informer_cache.list(
+        namespace=namespace.name, api_version="v1", kind="Pod", label_selector=MODELMESH_POD_LABEL_SELECTOR
+    )
+    for pod in pods:
+        if pod.status.phase == Pod.Status.RUNNING:
+            return Pod(name=pod.metadata.name, namespace=namespace.name, client=informer_cache.client)
+
+    raise ValueError(f"No running ModelMesh pod in namespace {namespace.name}")
+
+
+class GRPCInferenceClient:
+    """
+    KServe v2 ModelInfer client for the ModelMesh models of a namespace.
+
+    ModelMesh's gRPC port isn't exposed by a Route, so the channel goes through a port-forward to one of
+    the ModelMesh pods, which routes each request to the model named in its metadata. The channel is
+    opened once and reused for every request.
+    """
+
+    def __init__(self, namespace: Namespace):
+        self.namespace = namespace
+        pod = get_modelmesh_pod(namespace=namespace)
+        self.port_forward = PortForward(namespace=namespace.name, pod_name=pod.name, port=MODELMESH_GRPC_PORT).start()
+        self.channel = grpc.insecure_channel(target=self.port_forward.address)
+        # Requests and responses are passed as already serialized bytes
+        self._model_infer = self.channel.unary_unary(MODEL_INFER_METHOD)
+
+    def infer(self, model_name: str, request: bytes, timeout: float = GRPC_TIMEOUT_SECONDS) -> bytes:
+        """
+        Send an encoded ModelInferRequest to a model and return the encoded ModelInferResponse.
+
+        :param model_name (str): Name of the InferenceService.
+        :param request (bytes): Encoded ModelInferRequest, e.g. from `read_model_infer_request`.
+        :param timeout (float): Deadline of the call in seconds.
+        """
+        return self._model_infer(request, timeout=timeout, metadata=((MODELMESH_MODEL_ID_HEADER, model_name),))
+
+    def close(self) -> None:
+        self.channel.close()
+        self.port_forward.stop()
+
+
+_grpc_clients: dict[str, GRPCInferenceClient] = {}
+_grpc_clients_lock = threading.Lock()
+
+
+def get_grpc_inference_client(namespace: Namespace, refresh: bool = False) -> GRPCInferenceClient:
+    """
+    Get the gRPC inference client of a namespace, created on first use and shared afterwards.
+
+    :param namespace (Namespace): Namespace where the ModelMesh models live.
+    :param refresh (bool): Replace the client, e.g. when the pod behind its port-forward went away.
+    """
+    with _grpc_clients_lock:
+        client = _grpc_clients.get(namespace.name)
+        if client is not None and refresh:
+            client.close()
+            client = None
+        if client is None:
+            client = GRPCInferenceClient(namespace=namespace)
+            _grpc_clients[namespace.name] = client
+
+    return client
+
+
+def close_grpc_inference_client(namespace: Namespace) -> None:
+    """Close and forget the gRPC inference client of a namespace, e.g. when the namespace is deleted."""
+    with _grpc_clients_lock:
+        client = _grpc_clients.pop(namespace.name, None)
+    if client is not None:
+        client.close()
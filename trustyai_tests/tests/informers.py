@@ -0,0 +1,275 @@
+import http
+import logging
+import threading
+from concurrent.futures import Future
+from time import sleep
+from typing import Any, Callable, List, Optional
+
+from kubernetes.client.exceptions import ApiException
+from kubernetes import watch
+from kubernetes.dynamic import DynamicClient
+from ocp_resources.resource import get_client
+
+logger: logging.Logger = logging.getLogger(__name__)
+
+# Kept short so the connection of a stopped informer is released soon even if no event comes.
+# Each watch resumes from the last resourceVersion, so this doesn't list the resources again.
+WATCH_TIMEOUT_SECONDS: int = 60
+# Delay before listing again after a watch failed for another reason than an expired resourceVersion
+WATCH_RETRY_SECONDS: float = 1
+
+
+def matches_label_selector(labels: Optional[dict[str, str]], label_selector: Optional[str]) -> bool:
+    """
+    Whether labels match an equality-based label selector, e.g. `app=trustyai-service,tier!=db`.
+    Requirements can also be a bare key (the label exists) or `!key` (the label doesn't exist).
+    """
+    if not label_selector:
+        return True
+
+    labels = labels or {}
+    for requirement in label_selector.split(","):
+        requirement = requirement.strip()
+        if "!=" in requirement:
+            key, value = requirement.split("!=", 1)
+            if labels.get(key.strip()) == value.strip():
+                return False
+        elif "=" in requirement:
+            key, value = requirement.replace("==", "=").split("=", 1)
+            if labels.get(key.strip()) != value.strip():
+                return False
+        elif requirement.startswith("!"):
+            if requirement[1:] in labels:
+                return False
+        elif requirement not in labels:
+            return False
+
+    return True
+
+
+class Informer:
+    """
+    Watch-backed local cache of the resources of one kind in one namespace.
+
+    The resources are listed once, then kept up to date by a background watch resumed from the last
+    resourceVersion seen. When that is too old (410 Gone), or the watch fails, the resources are listed again
+    and the differences are replayed to the event handlers. Readers get the cached objects without calling
+    the API server.
+
+    Every change notifies the conditions added with `add_listener`, so a waiter is only woken up by the
+    informers it reads from.
+    """
+
+    def __init__(self, resource_api: Any, namespace: str, kind: str):
+        self.resource_api = resource_api
+        self.namespace = namespace
+        self.kind = kind
+        self._resources: dict[str, Any] = {}
+        self._handlers: dict[str, Callable[[dict[str, Any]], None]] = {}
+        self._listeners: set[threading.Condition] = set()
+        # Only guards the state above, and is never held while calling out, so readers don't wait on each other
+        self._lock = threading.Lock()
+        self._stopped = threading.Event()
+        self._watcher = watch.Watch()
+
+    def start(self) -> "Informer":
+        # The first list is synchronous, so the cache is populated, and API errors raised, before it's read
+        resource_version = self._list()
+        threading.Thread(target=self._watch, args=(resource_version,), daemon=True).start()
+        return self
+
+    def stop(self) -> None:
+        """Stop the watch. Its stream is closed on the next event, or when the server ends it."""
+        self._stopped.set()
+        self._watcher.stop()
+
+    def subscribe(self, key: str, handler: Callable[[dict[str, Any]], None]) -> None:
+        """Call `handler` with every watch event, replacing any handler previously subscribed with the same key."""
+        with self._lock:
+            self._handlers[key] = handler
+
+    def add_listener(self, listener: threading.Condition) -> None:
+        """Notify `listener` on every change, until it's removed."""
+        with self._lock:
+            self._listeners.add(listener)
+
+    def remove_listener(self, listener: threading.Condition) -> None:
+        with self._lock:
+            self._listeners.discard(listener)
+
+    def list(self, label_selector: Optional[str] = None) -> List[Any]:
+        with self._lock:
+            return self._select(label_selector=label_selector)
+
+    def get(self, name: str) -> Optional[Any]:
+        with self._lock:
+            return self._resources.get(name)
+
+    def _select(self, label_selector: Optional[str]) -> List[Any]:
+        return [
+            resource
+            for resource in self._resources.values()
+            if matches_label_selector(labels=resource.metadata.labels, label_selector=label_selector)
+        ]
+
+    def _list(self) -> str:
+        resource_list = self.resource_api.get(namespace=self.namespace)
+        resources = {resource.metadata.name: resource for resource in resource_list.items}
+
+        with self._lock:
+            previous, self._resources = self._resources, resources
+        self._notify()
+
+        # Replay what changed since the last list, so handlers don't miss updates
+        events = [
+            {"type": "MODIFIED" if name in previous else "ADDED", "object": resource}
+            for name, resource in resources.items()
+            if name not in previous or previous[name].metadata.resourceVersion != resource.metadata.resourceVersion
+        ] + [{"type": "DELETED", "object": resource} for name, resource in previous.items() if name not in resources]
+        if previous:
+            for event in events:
+                self._dispatch(event=event)
+
+        return resource_list.metadata.resourceVersion
+
+    def _watch(self, resource_version: Optional[str]) -> None:
+        while not self._stopped.is_set():
+            try:
+                if resource_version is None:
+                    resource_version = self._list()
+
+                for event in self.resource_api.watch(
+                    namespace=self.namespace,
+                    resource_version=resource_version,
+                    timeout=WATCH_TIMEOUT_SECONDS,
+                    watcher=self._watcher,
+                ):
+                    if self._stopped.is_set():
+                        return
+                    if event["type"] == "ERROR":
+                        # Most likely 410 Gone: the resourceVersion is too old to resume from
+                        logger.debug(f"Watch on {self.kind} in {self.namespace} ended: {event['raw_object']}")
+                        resource_version = None
+                        break
+
+                    resource = event["object"]
+                    resource_version = resource.metadata.resourceVersion
+                    with self._lock:
+                        if event["type"] == "DELETED":
+                            self._resources.pop(resource.metadata.name, None)
+                        else:
+                            self._resources[resource.metadata.name] = resource
+                    self._notify()
+                    self._dispatch(event=event)
+            except Exception as e:
+                if not (isinstance(e, ApiException) and e.status == http.HTTPStatus.GONE):
+                    logger.debug(f"Watch on {self.kind} in {self.namespace} failed: {e}")
+                    sleep(WATCH_RETRY_SECONDS)
+                resource_version = None
+
+    def _notify(self) -> None:
+        with self._lock:
+            listeners = list(self._listeners)
+
+        for listener in listeners:
+            with listener:
+                listener.notify_all()
+
+    def _dispatch(self, event: dict[str, Any]) -> None:
+        with self._lock:
+            handlers = list(self._handlers.values())
+
+        for handler in handlers:
+            try:
+                handler(event)
+            except Exception as e:
+                logger.error(f"Handler of {self.kind} events in {self.namespace} failed: {e}")
+
+
+class InformerCache:
+    """
+    Session-wide informers, one per (namespace, kind), started on first use.
+
+    Every lookup and waiter reads from them, so the API server sees a single watch per kind and namespace
+    instead of repeated full lists. The DynamicClient can be injected (e.g. the `client` session fixture);
+    otherwise one is created from the current kubeconfig on first use.
+    """
+
+    def __init__(self, client: Optional[DynamicClient] = None):
+        self.client = client
+        self._informers: dict[tuple[str, str, str], Informer] = {}
+        # Informers being started, so concurrent lookups of the same key wait for the same one
+        self._starting: dict[tuple[str, str, str], Future] = {}
+        self._lock = threading.Lock()
+        self._client_lock = threading.Lock()
+
+    def get_client(self) -> DynamicClient:
+        with self._client_lock:
+            if self.client is None:
+                self.client = get_client()
+            return self.client
+
+    def get_informer(self, namespace: str, api_version: str, kind: str) -> Informer:
+        """
+        Get the informer of a kind in a namespace, starting it on first use.
+
+        The initial list runs without holding the cache lock, so lookups of other informers aren't blocked by it.
+        Concurrent lookups of an informer being started wait for it, and get the error if it fails to start.
+        """
+        key = (namespace, api_version, kind)
+        with self._lock:
+            informer = self._informers.get(key)
+            if informer is not None:
+                return informer
+            future = self._starting.get(key)
+            starting = future is None
+            if starting:
+                future = self._starting[key] = Future()
+
+        if not starting:
+            return future.result()
+
+        try:
+            resource_api = self.get_client().resources.get(api_version=api_version, kind=kind)
+            informer = Informer(resource_api=resource_api, namespace=namespace, kind=kind).start()
+        except Exception as e:
+            with self._lock:
+                self._starting.pop(key, None)
+            future.set_exception(e)
+            raise
+
+        with self._lock:
+            # The namespace may have been forgotten while the informer was starting
+            forgotten = self._starting.pop(key, None) is not future
+            if not forgotten:
+                self._informers[key] = informer
+        if forgotten:
+            informer.stop()
+
+        future.set_result(informer)
+        return informer
+
+    def list(self, namespace: str, api_version: str, kind: str, label_selector: Optional[str] = None) -> List[Any]:
+        """
+        Cached raw objects of a kind in a namespace.
+
+        :param namespace (str): Namespace of the resources.
+        :param api_version (str): API version of the resources, e.g. v1.
+        :param kind (str): Kind of the resources, e.g. Pod.
+        :param label_selector (str): Only return the resources matching this label selector.
+        """
+        informer = self.get_informer(namespace=namespace, api_version=api_version, kind=kind)
+        return informer.list(label_selector=label_selector)
+
+    def forget_namespace(self, namespace: str) -> None:
+        """Stop the informers of a namespace and drop their caches, e.g. when it is deleted."""
+        with self._lock:
+            informers = [self._informers.pop(key) for key in list(self._informers) if key[0] == namespace]
+            for key in [key for key in self._starting if key[0] == namespace]:
+                del self._starting[key]
+
+        for informer in informers:
+            informer.stop()
+
+
+informer_cache = InformerCache()
@@ -9,10 +9,15 @@ from ocp_resources.trustyai_service import TrustyAIService
 from trustyai_tests.tests.constants import (
     KSERVE_API_GROUP,
     MINIO_DATA_CONNECTION_NAME,
+    MODEL_DATA_PATH,
     TRUSTYAI_SERVICE,
     ONNX,
     ONNX_LOAN_MODEL_ALPHA_PATH,
 )
+from trustyai_tests.tests.endpoints import endpoint_resolver
+from trustyai_tests.tests.grpc_inference import close_grpc_inference_client
+from trustyai_tests.tests.informers import informer_cache
+from trustyai_tests.tests.trustyai_client import close_trustyai_client
 from trustyai_tests.tests.multiple_namespaces.utils import deploy_namespace_with_minio
 from trustyai_tests.tests.utils import wait_for_modelmesh_pods_registered, create_ovms_runtime
 
@@ -27,6 +32,10 @@ def model_namespaces_with_minio() -> Generator[list[Namespace], Any, None]:
 
     yield namespaces
     for namespace in namespaces:
+        close_trustyai_client(namespace=namespace)
+        close_grpc_inference_client(namespace=namespace)
+        endpoint_resolver.forget_namespace(namespace=namespace.name)
+        informer_cache.forget_namespace(namespace=namespace.name)
         namespace.delete(wait=True)
 
 
@@ -96,7 +105,11 @@ def onnx_loan_models_in_namespaces(
             annotations={f"{KSERVE_API_GROUP}/deploymentMode": "ModelMesh"},
         )
         inference_service.deploy()
-        wait_for_modelmesh_pods_registered(namespace=namespace)
+        wait_for_modelmesh_pods_registered(
+            namespace=namespace,
+            inference_services=[inference_service],
+            data_path=f"{MODEL_DATA_PATH}/loan-nn-onnx",
+        )
         inference_services.append(inference_service)
     yield inference_services
     for inference_service in inference_services:
@@ -2,13 +2,15 @@ from typing import Any
 
 import pytest
 
+from trustyai_tests.tests.async_clients import IngestionJob, run_ingestion_jobs
 from trustyai_tests.tests.fairness.test_fairness import get_json_data, INPUT_DATA_PATH, INPUT_MAPPINGS, OUTPUT_MAPPINGS
-from trustyai_tests.tests.metrics import get_metric_endpoint, Metric
+from trustyai_tests.tests.constants import INGESTION_WINDOW
+from trustyai_tests.tests.metrics import Metric
+from trustyai_tests.tests.prometheus import ExpectedSeries
 from trustyai_tests.tests.utils import (
     verify_trustyai_model_metadata,
     verify_metric_scheduling,
-    verify_trustyai_metric_prometheus,
-    send_data_to_inference_service,
+    verify_trustyai_metrics_prometheus,
     apply_trustyai_name_mappings,
 )
 
@@ -39,14 +41,22 @@ class TestMultipleNamespaces:
         onnx_loan_models_in_namespaces: Any,
     ):
         num_batches = 3
-        for namespace, inference_service in zip(model_namespaces_with_minio, onnx_loan_models_in_namespaces):
-            send_data_to_inference_service(
-                inference_service=inference_service,
-                namespace=namespace,
-                data_path=INPUT_DATA_PATH,
-                num_batches=num_batches,
-            )
+        results = run_ingestion_jobs(
+            jobs=[
+                IngestionJob(
+                    namespace=namespace,
+                    inference_service=inference_service,
+                    data_path=INPUT_DATA_PATH,
+                    num_batches=num_batches,
+                )
+                for namespace, inference_service in zip(model_namespaces_with_minio, onnx_loan_models_in_namespaces)
+            ],
+            window=INGESTION_WINDOW,
+        )
+        assert all(result.ok for result in results), [str(result.error) for result in results if not result.ok]
 
+        expected_series = []
+        for namespace, inference_service in zip(model_namespaces_with_minio, onnx_loan_models_in_namespaces):
             apply_trustyai_name_mappings(
                 namespace=namespace,
                 inference_service=inference_service,
@@ -64,13 +74,11 @@ class TestMultipleNamespaces:
             for metric in (Metric.SPD, Metric.DIR):
                 verify_metric_scheduling(
                     namespace=namespace,
-                    endpoint=get_metric_endpoint(metric=metric, schedule=True),
+                    metric=metric,
                     json_data=get_json_data(inference_service),
                 )
-
-                verify_trustyai_metric_prometheus(
-                    namespace=namespace,
-                    model=inference_service,
-                    prometheus_query=f"trustyai_{metric.value}" f'{{namespace="{namespace.name}"}}',
-                    metric_name=metric.value,
+                expected_series.append(
+                    ExpectedSeries(namespace=namespace, model_name=inference_service.name, metric_name=metric.value)
                 )
+
+        verify_trustyai_metrics_prometheus(expected=expected_series)
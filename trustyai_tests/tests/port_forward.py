@@ -0,0 +1,108 @@
+import logging
+import select
+import socket
+import threading
+from typing import Any, Optional
+
+from kubernetes.client import ApiClient, CoreV1Api
+from kubernetes.dynamic import DynamicClient
+from kubernetes.stream import portforward
+from ocp_resources.resource import get_client
+
+logger: logging.Logger = logging.getLogger(__name__)
+
+RELAY_BUFFER_SIZE: int = 64 * 1024
+# How often relays check whether the port-forward was stopped
+RELAY_POLL_SECONDS: float = 1
+
+
+class PortForward:
+    """
+    Local TCP listener relaying every accepted connection to a port of a pod through the API server,
+    so in-cluster ports without a Route can be reached without an `oc port-forward` subprocess.
+
+    Each local connection gets its own port-forward stream to the pod.
+    """
+
+    def __init__(self, namespace: str, pod_name: str, port: int, client: Optional[DynamicClient] = None):
+        self.namespace = namespace
+        self.pod_name = pod_name
+        self.port = port
+        self.client = client
+        self.local_port: Optional[int] = None
+        self._core_api: Optional[CoreV1Api] = None
+        self._listener: Optional[socket.socket] = None
+        self._stopped = threading.Event()
+        # The stream helpers patch the ApiClient while opening the websocket, so streams are opened one at a time
+        self._connect_lock = threading.Lock()
+
+    @property
+    def address(self) -> str:
+        return f"127.0.0.1:{self.local_port}"
+
+    def start(self) -> "PortForward":
+        if self.client is None:
+            self.client = get_client()
+        # Dedicated ApiClient, so opening streams doesn't interfere with the requests of the rest of the suite
+        self._core_api = CoreV1Api(api_client=ApiClient(configuration=self.client.client.configuration))
+
+        self._listener = socket.create_server(("127.0.0.1", 0))
+        self.local_port = self._listener.getsockname()[1]
+        threading.Thread(target=self._accept, daemon=True).start()
+        logger.info(f"Forwarding {self.address} to port {self.port} of pod {self.pod_name} in {self.namespace}")
+
+        return self
+
+    def stop(self) -> None:
+        self._stopped.set()
+        if self._listener is not None:
+            self._listener.close()
+
+    def __enter__(self) -> "PortForward":
+        return self.start()
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.stop()
+
+    def _accept(self) -> None:
+        while not self._stopped.is_set():
+            try:
+                connection, _ = self._listener.accept()
+            except OSError:
+                # The listener was closed by `stop`
+                return
+            threading.Thread(target=self._relay, args=(connection,), daemon=True).start()
+
+    def _relay(self, connection: socket.socket) -> None:
+        try:
+            with self._connect_lock:
+                forward = portforward(
+                    self._core_api.connect_get_namespaced_pod_portforward,
+                    self.pod_name,
+                    self.namespace,
+                    ports=str(self.port),
+                )
+        except Exception as e:
+            logger.error(f"Could not forward to port {self.port} of pod {self.pod_name}: {e}")
+            connection.close()
+            return
+
+        remote = forward.socket(self.port)
+        remote.setblocking(True)
+        peers = {connection: remote, remote: connection}
+        try:
+            while not self._stopped.is_set():
+                readable, _, _ = select.select(list(peers), [], [], RELAY_POLL_SECONDS)
+                for source in readable:
+                    data = source.recv(RELAY_BUFFER_SIZE)
+                    if not data:
+                        return
+                    peers[source].sendall(data)
+        except OSError as e:
+            logger.debug(f"Port-forward connection to pod {self.pod_name} closed: {e}")
+        finally:
+            connection.close()
+            remote.close()
+            error = forward.error(self.port)
+            if error:
+                logger.error(f"Port-forward to pod {self.pod_name} failed: {error}")
@@ -0,0 +1,241 @@
+import logging
+import threading
+from time import sleep, time
+from typing import Any, Optional
+from urllib.parse import quote
+
+from ocp_resources.namespace import Namespace
+from ocp_utilities.monitoring import Prometheus
+
+from trustyai_tests.tests.results import append_json_run
+from trustyai_tests.tests.tokens import get_prometheus_token
+
+logger: logging.Logger = logging.getLogger(__name__)
+
+PROMETHEUS_MAX_RETRIES: int = 20
+PROMETHEUS_RETRY_DELAY_SECONDS: float = 5
+
+# Polls for newly scheduled metrics are spaced by this fraction of the time since they were scheduled, within the
+# bounds below, so the publication lag is measured with a resolution of about 10% without flooding Prometheus
+LAG_POLL_FRACTION: float = 0.1
+LAG_POLL_MIN_SECONDS: float = 0.1
+LAG_POLL_MAX_SECONDS: float = 2.0
+# Scheduled metrics not in Prometheus after this long are counted as unpublished
+LAG_TIMEOUT_SECONDS: float = 300
+# Upper bounds of the publication lag histogram buckets, in seconds
+LAG_BUCKETS_SECONDS: tuple[float, ...] = (1, 2, 5, 10, 15, 20, 30, 45, 60, 90, 120, 180, 300)
+
+
+class ExpectedSeries:
+    """A TrustyAI metric series expected in Prometheus, for a model in a namespace."""
+
+    def __init__(self, namespace: Namespace, model_name: str, metric_name: str):
+        self.namespace = namespace
+        self.model_name = model_name
+        self.metric_name = metric_name
+
+    @property
+    def series_name(self) -> str:
+        return f"trustyai_{self.metric_name.lower()}"
+
+    @property
+    def key(self) -> tuple[str, str, str]:
+        return self.series_name, self.model_name, self.namespace.name
+
+    def __str__(self) -> str:
+        return f"{self.series_name} of model {self.model_name} in namespace {self.namespace.name}"
+
+
+def get_series_query(expected: list[ExpectedSeries]) -> str:
+    """Single PromQL selector matching every expected series, e.g. {__name__=~"trustyai_(spd|dir)",namespace=~"a|b"}."""
+    metric_names = sorted({series.metric_name.lower() for series in expected})
+    namespaces = sorted({series.namespace.name for series in expected})
+    return f'{{__name__=~"trustyai_({"|".join(metric_names)})",namespace=~"{"|".join(namespaces)}"}}'
+
+
+class PrometheusClient:
+    """
+    Prometheus client shared by the whole session.
+
+    The Prometheus route is looked up once, and the bearer token is taken from the token cache on every query,
+    so it is refreshed before it expires without building a new client.
+    """
+
+    def __init__(self):
+        self._prometheus: Optional[Prometheus] = None
+        self._lock = threading.Lock()
+
+    def query(self, query: str) -> dict[str, Any]:
+        token = get_prometheus_token()
+        with self._lock:
+            if self._prometheus is None:
+                self._prometheus = Prometheus(verify_ssl=False, bearer_token=token)
+            self._prometheus.headers = {"Authorization": f"Bearer {token}"}
+            prometheus = self._prometheus
+
+        return prometheus.query(query=quote(query, safe=""))
+
+    def wait_for_series(
+        self,
+        expected: list[ExpectedSeries],
+        max_retries: int = PROMETHEUS_MAX_RETRIES,
+        retry_delay: float = PROMETHEUS_RETRY_DELAY_SECONDS,
+    ) -> dict[tuple[str, str, str], dict[str, Any]]:
+        """
+        Poll Prometheus with a single query until every expected series is present, and return them by key.
+
+        :param expected (list[ExpectedSeries]): Series to wait for.
+        :param max_retries (int): Maximum number of queries.
+        :param retry_delay (float): Delay between queries in seconds.
+        """
+        query = get_series_query(expected=expected)
+        logger.info(f"Sending Prometheus query: {query}")
+
+        for retry_count in range(1, max_retries + 1):
+            result = self.query(query=query)
+            assert result["status"] == "success", f"Prometheus query failed: {result}"
+
+            found: dict[tuple[str, str, str], dict[str, Any]] = {}
+            for series in result["data"]["result"]:
+                labels = series["metric"]
+                found.setdefault((labels.get("__name__"), labels.get("model"), labels.get("namespace")), series)
+
+            missing = [series for series in expected if series.key not in found]
+            if not missing:
+                return {series.key: found[series.key] for series in expected}
+
+            if retry_count < max_retries:
+                logger.info(
+                    f"No Prometheus data yet for {len(missing)} of {len(expected)} series, e.g. {missing[0]}. "
+                    f"Retrying in {retry_delay} second(s)..."
+                )
+                sleep(retry_delay)
+
+        missing_series = "; ".join(str(series) for series in missing)
+        assert False, f"No Prometheus data after {max_retries} retries for: {missing_series}"
+
+
+prometheus_client = PrometheusClient()
+
+
+class LagHistogram:
+    """Cumulative histogram of publication lags, with Prometheus-style `le` buckets."""
+
+    def __init__(self, buckets: tuple[float, ...] = LAG_BUCKETS_SECONDS):
+        self.buckets = buckets
+        self.lags: list[float] = []
+        self.unpublished = 0
+
+    def observe(self, lag: float) -> None:
+        self.lags.append(lag)
+
+    def to_dict(self) -> dict[str, Any]:
+        lags = sorted(self.lags)
+        return {
+            "count": len(lags),
+            "sum_seconds": sum(lags),
+            "max_seconds": lags[-1] if lags else None,
+            "p50_seconds": lags[(len(lags) - 1) // 2] if lags else None,
+            "unpublished": self.unpublished,
+            "buckets": {
+                **{str(bound): sum(1 for lag in lags if lag <= bound) for bound in self.buckets},
+                "+Inf": len(lags),
+            },
+        }
+
+
+class PublicationLagTracker:
+    """
+    Measures how long TrustyAI takes to publish scheduled metrics to Prometheus.
+
+    Each scheduled metric is timed from its /request call until its series first shows up in Prometheus, matched
+    by the `request` label TrustyAI sets to the request ID, so rescheduling a metric is timed again.
+    A background thread polls for all the pending series with a single query, more often while they are young,
+    and the lags are aggregated in one histogram per TrustyAI image, metric and model.
+    """
+
+    def __init__(self, client: PrometheusClient = prometheus_client):
+        self.client = client
+        self.histograms: dict[tuple[str, str, str], LagHistogram] = {}
+        # Scheduled metrics not in Prometheus yet, by request ID, with their series, scheduling time and TrustyAI image
+        self._pending: dict[str, tuple[ExpectedSeries, float, str]] = {}
+        self._changed = threading.Condition()
+        self._poller: Optional[threading.Thread] = None
+
+    def track(self, series: ExpectedSeries, request_id: str, trustyai_image: str, scheduled_at: float = None) -> None:
+        """
+        Start timing a metric that was just scheduled.
+
+        :param series (ExpectedSeries): Series the scheduled metric is published as.
+        :param request_id (str): ID of the scheduled metric, returned by its /request call.
+        :param trustyai_image (str): Image of the TrustyAI service computing the metric, to compare versions.
+        :param scheduled_at (float): When the metric was scheduled, as returned by `time.time()`. Defaults to now.
+        """
+        with self._changed:
+            self._pending.setdefault(request_id, (series, scheduled_at or time(), trustyai_image))
+            if self._poller is None or not self._poller.is_alive():
+                self._poller = threading.Thread(target=self._poll, daemon=True)
+                self._poller.start()
+            self._changed.notify_all()
+
+    def report(self) -> list[dict[str, Any]]:
+        with self._changed:
+            return [
+                {"trustyai_image": image, "metric": metric, "model": model, **histogram.to_dict()}
+                for (image, metric, model), histogram in sorted(self.histograms.items())
+            ]
+
+    def _histogram(self, trustyai_image: str, series_name: str, model: str) -> LagHistogram:
+        return self.histograms.setdefault((trustyai_image, series_name, model), LagHistogram())
+
+    def _poll(self) -> None:
+        while True:
+            with self._changed:
+                now = time()
+                for request_id, (series, scheduled_at, image) in list(self._pending.items()):
+                    if now - scheduled_at > LAG_TIMEOUT_SECONDS:
+                        logger.warning(
+                            f"{series} (request {request_id}) not in Prometheus after {LAG_TIMEOUT_SECONDS}s"
+                        )
+                        self._histogram(
+                            trustyai_image=image, series_name=series.series_name, model=series.model_name
+                        ).unpublished += 1
+                        del self._pending[request_id]
+                if not self._pending:
+                    self._poller = None
+                    return
+                pending = dict(self._pending)
+
+            query = get_series_query(expected=[series for series, _, _ in pending.values()])
+            try:
+                result = self.client.query(query=query)
+                seen_at = time()
+                found = {series["metric"].get("request") for series in result["data"]["result"]}
+            except Exception as e:
+                logger.debug(f"Publication lag query failed: {e}")
+                seen_at, found = time(), set()
+
+            with self._changed:
+                for request_id in found & pending.keys():
+                    series, scheduled_at, image = self._pending.pop(request_id, pending[request_id])
+                    lag = seen_at - scheduled_at
+                    self._histogram(
+                        trustyai_image=image, series_name=series.series_name, model=series.model_name
+                    ).observe(lag)
+                    logger.info(f"{series} published after {lag:.2f}s")
+
+                if self._pending:
+                    youngest = max(scheduled_at for _, scheduled_at, _ in self._pending.values())
+                    delay = min(
+                        max((time() - youngest) * LAG_POLL_FRACTION, LAG_POLL_MIN_SECONDS), LAG_POLL_MAX_SECONDS
+                    )
+                    # Woken up early when another metric is scheduled
+                    self._changed.wait(timeout=delay)
+
+
+def write_publication_lag_report(tracker: PublicationLagTracker, results_path: str) -> None:
+    """Append a run with the publication lag histograms to a JSON results file, keeping the runs already in it."""
+    append_json_run(path=results_path, key="publication_lag", payload=tracker.report())
+
+
+publication_lag_tracker = PublicationLagTracker()
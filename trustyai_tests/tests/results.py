@@ -0,0 +1,27 @@
+import json
+import logging
+import os
+from time import time
+from typing import Any
+
+logger: logging.Logger = logging.getLogger(__name__)
+
+
+def append_json_run(path: str, key: str, payload: Any) -> None:
+    """
+    Append a timestamped run to a JSON results file, keeping the runs already in it.
+
+    :param path (str): Path of the JSON results file, created if it doesn't exist.
+    :param key (str): Key the payload is stored under in the run, next to its timestamp.
+    :param payload (Any): JSON-serializable results of the run.
+    """
+    runs = []
+    if os.path.exists(path):
+        with open(path, "r") as file:
+            runs = json.load(file)
+
+    runs.append({"timestamp": time(), key: payload})
+    with open(path, "w") as file:
+        json.dump(runs, file, indent=2)
+
+    logger.info(f"Run with {key} written to {path}")
@@ -0,0 +1,422 @@
+import json
+import logging
+import os
+from enum import Enum
+from typing import Any, Iterator, Optional
+
+import numpy as np
+
+from trustyai_tests.tests.constants import MODEL_DATA_PATH
+from trustyai_tests.tests.datasets import NUMPY_DATATYPES, encode_binary_request
+
+logger: logging.Logger = logging.getLogger(__name__)
+
+GAUSSIAN_CREDIT_MODEL_TRAINING_DATA_PATH: str = f"{MODEL_DATA_PATH}/gaussian-credit-model/training_data.json"
+LOAN_MODEL_DATA_PATH: str = f"{MODEL_DATA_PATH}/loan-nn-onnx"
+
+# Features with at most this many distinct values are sampled as categorical
+MAX_CATEGORICAL_VALUES: int = 20
+DEFAULT_BATCH_SIZE: int = 10_000
+OUTPUT_NAME: str = "predict"
+TRAINING_DATA_TAG: str = "TRAINING"
+
+
+class CategoricalFeature:
+    def __init__(self, index: int, values: np.ndarray, probabilities: np.ndarray):
+        self.index = index
+        self.values = values
+        self.probabilities = probabilities
+
+
+class DatasetProfile:
+    """
+    Schema and value distributions of an input tensor, learnt from existing KServe v2 payloads.
+
+    Continuous features are modelled jointly as a multivariate normal, so correlations between them are kept.
+    Features with few distinct values are sampled from their empirical frequencies. Samples are clipped to the
+    range seen in the source data, and rounded for features whose source values are all whole numbers.
+    """
+
+    def __init__(self, name: str, datatype: str, data: np.ndarray):
+        self.name = name
+        self.datatype = datatype
+        self.num_features = data.shape[1]
+        self.minimum = data.min(axis=0)
+        self.maximum = data.max(axis=0)
+        # Features whose source values are all whole numbers, e.g. amounts or counts stored as FP64
+        self.integral = np.all(data == np.round(data), axis=0)
+
+        self.categorical_features = []
+        continuous_indices = []
+        for index in range(self.num_features):
+            values, counts = np.unique(data[:, index], return_counts=True)
+            if len(values) <= MAX_CATEGORICAL_VALUES:
+                self.categorical_features.append(
+                    CategoricalFeature(index=index, values=values, probabilities=counts / counts.sum())
+                )
+            else:
+                continuous_indices.append(index)
+
+        self.continuous_indices = np.array(continuous_indices, dtype=int)
+        continuous_data = data[:, self.continuous_indices]
+        self.mean = continuous_data.mean(axis=0)
+        self.covariance = (
+            np.atleast_2d(np.cov(continuous_data, rowvar=False))
+            if len(continuous_indices)
+            else np.empty((0, 0), dtype=np.float64)
+        )
+
+    @classmethod
+    def from_files(cls, paths: list[str]) -> "DatasetProfile":
+        """
+        Build a profile from the input tensors of one or more payload files.
+
+        :param paths (list[str]): JSON payload files, or directories containing them.
+        """
+        name, datatype, data = read_input_tensor(paths=paths)
+        return cls(name=name, datatype=datatype, data=data)
+
+
+def read_input_tensor(paths: list[str]) -> tuple[str, str, np.ndarray]:
+    """Read the name, datatype and rows of the input tensor of one or more payload files."""
+    name, datatype, arrays = "", "", []
+    for file_path in list_payload_files(paths=paths):
+        with open(file_path, "r") as file:
+            payload = json.load(file)
+
+        for tensor in payload.get("inputs", payload.get("request", {}).get("inputs")) or []:
+            name = name or tensor["name"]
+            datatype = datatype or tensor["datatype"]
+            arrays.append(np.asarray(tensor["data"], dtype=np.float64).reshape(tensor["shape"]))
+
+    if not arrays:
+        raise ValueError(f"No input tensors found in {paths}")
+
+    return name, datatype, np.concatenate(arrays)
+
+
+def to_payload(name: str, datatype: str, data: np.ndarray) -> dict[str, Any]:
+    return {
+        "inputs": [
+            {
+                "name": name,
+                "shape": list(data.shape),
+                "datatype": datatype,
+                "data": data.astype(NUMPY_DATATYPES[datatype]).tolist(),
+            }
+        ]
+    }
+
+
+def write_payload(output_dir: str, index: int, num_rows: int, batch_size: int, payload: dict[str, Any]) -> str:
+    """Write a payload as a batch file named after its first row, zero padded so files sort in generation order."""
+    width = len(str(max(num_rows - 1, 0)))
+    file_path = os.path.join(output_dir, f"{index * batch_size:0{width}d}.json")
+    with open(file_path, "w") as file:
+        json.dump(payload, file)
+
+    return file_path
+
+
+def list_payload_files(paths: list[str]) -> list[str]:
+    file_paths = []
+    for path in paths:
+        if os.path.isdir(path):
+            file_paths.extend(
+                os.path.join(path, file_name) for file_name in sorted(os.listdir(path)) if file_name.endswith(".json")
+            )
+        else:
+            file_paths.append(path)
+
+    return file_paths
+
+
+def get_gaussian_credit_model_profile() -> DatasetProfile:
+    return DatasetProfile.from_files(paths=[GAUSSIAN_CREDIT_MODEL_TRAINING_DATA_PATH])
+
+
+def get_loan_model_profile() -> DatasetProfile:
+    return DatasetProfile.from_files(paths=[LOAN_MODEL_DATA_PATH])
+
+
+class PayloadGenerator:
+    """
+    Generates KServe v2 payloads of any size that follow a DatasetProfile, using vectorized NumPy sampling.
+    The same seed always produces the same rows.
+    """
+
+    def __init__(self, profile: DatasetProfile, seed: Optional[int] = None):
+        self.profile = profile
+        self.rng = np.random.default_rng(seed)
+
+    def sample(self, num_rows: int) -> np.ndarray:
+        profile = self.profile
+        data = np.empty((num_rows, profile.num_features), dtype=np.float64)
+
+        if len(profile.continuous_indices):
+            data[:, profile.continuous_indices] = self.rng.multivariate_normal(
+                mean=profile.mean, cov=profile.covariance, size=num_rows, method="cholesky"
+            )
+        for feature in profile.categorical_features:
+            data[:, feature.index] = self.rng.choice(feature.values, size=num_rows, p=feature.probabilities)
+
+        data[:, profile.integral] = np.round(data[:, profile.integral])
+        return np.clip(data, profile.minimum, profile.maximum)
+
+    def to_payload(self, data: np.ndarray) -> dict[str, Any]:
+        return to_payload(name=self.profile.name, datatype=self.profile.datatype, data=data)
+
+    def to_binary_payload(self, data: np.ndarray) -> tuple[bytes, int]:
+        """Encode rows with the KServe v2 binary data extension. Returns the body and the length of its JSON header."""
+        return encode_binary_request(tensors=[(self.profile.name, self.profile.datatype, data)])
+
+    def to_upload_payload(self, data: np.ndarray, model_name: str, data_tag: str) -> dict[str, Any]:
+        """Wrap rows in the format of TrustyAI's /data/upload, with random predictions as the model response."""
+        predictions = self.rng.random((len(data), 1))
+        return {
+            "model_name": model_name,
+            "data_tag": data_tag,
+            "request": self.to_payload(data=data),
+            "response": {
+                "model_name": model_name,
+                "outputs": to_payload(name=OUTPUT_NAME, datatype="FP32", data=predictions)["inputs"],
+            },
+        }
+
+    def generate_batches(
+        self,
+        num_rows: int,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        model_name: Optional[str] = None,
+        data_tag: str = TRAINING_DATA_TAG,
+    ) -> Iterator[dict[str, Any]]:
+        """
+        Yield payloads of at most `batch_size` rows until `num_rows` rows have been generated.
+
+        :param num_rows (int): Total number of rows.
+        :param batch_size (int): Number of rows in each payload.
+        :param model_name (str): If set, generate /data/upload payloads for this model instead of inference requests.
+        :param data_tag (str): Tag of the uploaded data.
+        """
+        for offset in range(0, num_rows, batch_size):
+            data = self.sample(num_rows=min(batch_size, num_rows - offset))
+            if model_name is None:
+                yield self.to_payload(data=data)
+            else:
+                yield self.to_upload_payload(data=data, model_name=model_name, data_tag=data_tag)
+
+    def write_batches(
+        self,
+        output_dir: str,
+        num_rows: int,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        model_name: Optional[str] = None,
+        data_tag: str = TRAINING_DATA_TAG,
+    ) -> list[str]:
+        """
+        Write generated payloads as batch files named after their first row, like the files in `model_data/`,
+        so they can be passed to `send_data_to_inference_service` as a data path.
+
+        :param output_dir (str): Directory to write the batch files to.
+        :param num_rows (int): Total number of rows.
+        :param batch_size (int): Number of rows in each batch file.
+        :param model_name (str): If set, write /data/upload payloads for this model instead of inference requests.
+        :param data_tag (str): Tag of the uploaded data.
+        :return: Paths of the written files.
+        """
+        os.makedirs(output_dir, exist_ok=True)
+
+        payloads = self.generate_batches(
+            num_rows=num_rows, batch_size=batch_size, model_name=model_name, data_tag=data_tag
+        )
+        file_paths = [
+            write_payload(output_dir=output_dir, index=index, num_rows=num_rows, batch_size=batch_size, payload=payload)
+            for index, payload in enumerate(payloads)
+        ]
+
+        logger.info(f"Generated {num_rows} rows of {self.profile.name} in {len(file_paths)} files under {output_dir}")
+        return file_paths
+
+
+class DriftKind(Enum):
+    # Shift of the feature mean, in standard deviations of the reference data
+    MEAN_SHIFT = "mean_shift"
+    # Factor applied to the feature standard deviation
+    VARIANCE_CHANGE = "variance_change"
+    # Fraction of rows replaced by a bimodal distribution with the same mean and standard deviation
+    SHAPE_CHANGE = "shape_change"
+
+
+class FeatureDrift:
+    def __init__(self, feature: int, kind: DriftKind, magnitude: float):
+        self.feature = feature
+        self.kind = kind
+        self.magnitude = magnitude
+
+
+class DriftGroundTruth:
+    """Drift of one feature of a generated batch, measured against the reference data."""
+
+    def __init__(self, feature: int, mean_shift: float, std_ratio: float, ks_statistic: float):
+        self.feature = feature
+        self.mean_shift = mean_shift
+        self.std_ratio = std_ratio
+        self.ks_statistic = ks_statistic
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "feature": self.feature,
+            "mean_shift": self.mean_shift,
+            "std_ratio": self.std_ratio,
+            "ks_statistic": self.ks_statistic,
+        }
+
+
+class DriftBatch:
+    def __init__(self, payload: dict[str, Any], drifts: list[FeatureDrift], ground_truth: list[DriftGroundTruth]):
+        self.payload = payload
+        self.drifts = drifts
+        self.ground_truth = ground_truth
+
+
+def get_ks_statistics(reference: np.ndarray, data: np.ndarray) -> np.ndarray:
+    """Two-sample Kolmogorov-Smirnov statistic of each column, vectorized over the pooled sorted values."""
+    statistics = np.empty(reference.shape[1])
+    for feature in range(reference.shape[1]):
+        reference_values = np.sort(reference[:, feature])
+        values = np.sort(data[:, feature])
+        pooled = np.concatenate([reference_values, values])
+        reference_cdf = np.searchsorted(reference_values, pooled, side="right") / len(reference_values)
+        cdf = np.searchsorted(values, pooled, side="right") / len(values)
+        statistics[feature] = np.abs(reference_cdf - cdf).max()
+
+    return statistics
+
+
+class DriftSynthesizer:
+    """
+    Generates inference batches that drift from reference (training) data by a controlled amount.
+
+    Rows are resampled from the reference data, then each drifted feature is transformed according to its
+    FeatureDrift, so undrifted features keep exactly the reference distribution. Every batch comes with the
+    drift it actually has against the reference, to compare the metrics TrustyAI reports with.
+    """
+
+    def __init__(self, name: str, datatype: str, reference: np.ndarray, seed: Optional[int] = None):
+        self.name = name
+        self.datatype = datatype
+        self.reference = reference
+        self.mean = reference.mean(axis=0)
+        self.std = reference.std(axis=0)
+        self.rng = np.random.default_rng(seed)
+
+    @classmethod
+    def from_files(cls, paths: list[str], seed: Optional[int] = None) -> "DriftSynthesizer":
+        name, datatype, reference = read_input_tensor(paths=paths)
+        return cls(name=name, datatype=datatype, reference=reference, seed=seed)
+
+    def sample(self, num_rows: int, drifts: list[FeatureDrift]) -> np.ndarray:
+        data = self.reference[self.rng.integers(0, len(self.reference), size=num_rows)]
+
+        for drift in drifts:
+            column = data[:, drift.feature]
+            mean, std = self.mean[drift.feature], self.std[drift.feature]
+            if drift.kind == DriftKind.MEAN_SHIFT:
+                column += drift.magnitude * std
+            elif drift.kind == DriftKind.VARIANCE_CHANGE:
+                data[:, drift.feature] = mean + (column - mean) * drift.magnitude
+            elif drift.kind == DriftKind.SHAPE_CHANGE:
+                replaced = self.rng.random(num_rows) < drift.magnitude
+                signs = self.rng.choice([-1.0, 1.0], size=replaced.sum())
+                column[replaced] = mean + signs * std
+
+        return data
+
+    def get_ground_truth(self, data: np.ndarray) -> list[DriftGroundTruth]:
+        mean_shifts = (data.mean(axis=0) - self.mean) / self.std
+        std_ratios = data.std(axis=0) / self.std
+        ks_statistics = get_ks_statistics(reference=self.reference, data=data)
+
+        return [
+            DriftGroundTruth(
+                feature=feature,
+                mean_shift=float(mean_shifts[feature]),
+                std_ratio=float(std_ratios[feature]),
+                ks_statistic=float(ks_statistics[feature]),
+            )
+            for feature in range(self.reference.shape[1])
+        ]
+
+    def generate_batches(
+        self, num_rows: int, drifts: list[FeatureDrift], batch_size: int = DEFAULT_BATCH_SIZE
+    ) -> Iterator[DriftBatch]:
+        """
+        Yield drifted batches of at most `batch_size` rows until `num_rows` rows have been generated.
+
+        :param num_rows (int): Total number of rows.
+        :param drifts (list[FeatureDrift]): Drift applied to each feature. Features not listed don't drift.
+        :param batch_size (int): Number of rows in each batch.
+        """
+        for offset in range(0, num_rows, batch_size):
+            data = self.sample(num_rows=min(batch_size, num_rows - offset), drifts=drifts)
+            yield DriftBatch(
+                payload=to_payload(name=self.name, datatype=self.datatype, data=data),
+                drifts=drifts,
+                ground_truth=self.get_ground_truth(data=data),
+            )
+
+    def write_batches(
+        self, output_dir: str, num_rows: int, drifts: list[FeatureDrift], batch_size: int = DEFAULT_BATCH_SIZE
+    ) -> list[list[DriftGroundTruth]]:
+        """
+        Write drifted batches as batch files, so they can be passed to `send_data_to_inference_service`.
+        Only the ground truth is kept in memory, not the payloads.
+
+        :param output_dir (str): Directory to write the batch files to.
+        :param num_rows (int): Total number of rows.
+        :param drifts (list[FeatureDrift]): Drift applied to each feature. Features not listed don't drift.
+        :param batch_size (int): Number of rows in each batch file.
+        :return: Ground truth of each written batch, in file order.
+        """
+        os.makedirs(output_dir, exist_ok=True)
+
+        ground_truth = []
+        for index, batch in enumerate(self.generate_batches(num_rows=num_rows, drifts=drifts, batch_size=batch_size)):
+            write_payload(
+                output_dir=output_dir, index=index, num_rows=num_rows, batch_size=batch_size, payload=batch.payload
+            )
+            ground_truth.append(batch.ground_truth)
+
+        return ground_truth
+
+    def write_dataset(
+        self, output_dir: str, num_rows: int, drifts: list[FeatureDrift], batch_size: int = DEFAULT_BATCH_SIZE
+    ) -> np.ndarray:
+        """
+        Write one drifted dataset as batch files, and return its rows, to get the ground truth of any subset of
+        them, e.g. the latest rows a metric is computed over.
+
+        :param output_dir (str): Directory to write the batch files to.
+        :param num_rows (int): Total number of rows.
+        :param drifts (list[FeatureDrift]): Drift applied to each feature. Features not listed don't drift.
+        :param batch_size (int): Number of rows in each batch file.
+        """
+        os.makedirs(output_dir, exist_ok=True)
+
+        data = self.sample(num_rows=num_rows, drifts=drifts)
+        for index, offset in enumerate(range(0, num_rows, batch_size)):
+            batch = data[offset:][:batch_size]
+            write_payload(
+                output_dir=output_dir,
+                index=index,
+                num_rows=num_rows,
+                batch_size=batch_size,
+                payload=to_payload(name=self.name, datatype=self.datatype, data=batch),
+            )
+
+        logger.info(f"Generated {num_rows} drifted rows of {self.name} under {output_dir}")
+        return data
+
+
+def get_gaussian_credit_model_drift_synthesizer(seed: Optional[int] = None) -> DriftSynthesizer:
+    return DriftSynthesizer.from_files(paths=[GAUSSIAN_CREDIT_MODEL_TRAINING_DATA_PATH], seed=seed)
@@ -0,0 +1,164 @@
+import base64
+import json
+import logging
+import threading
+from time import time
+from typing import Callable, Optional
+
+from kubernetes.dynamic import DynamicClient
+from ocp_resources.namespace import Namespace
+from ocp_resources.resource import get_client
+
+logger: logging.Logger = logging.getLogger(__name__)
+
+TEST_USER: str = "test-user"
+PROMETHEUS_SERVICE_ACCOUNT: str = "prometheus-k8s"
+PROMETHEUS_NAMESPACE: str = "openshift-monitoring"
+
+DEFAULT_EXPIRATION_SECONDS: int = 3600
+# Tokens are minted again once they are this close to their expiry
+REFRESH_MARGIN_SECONDS: int = 60
+# Lifetime assumed for tokens whose expiry can't be read from the JWT
+FALLBACK_TOKEN_TTL_SECONDS: int = 300
+
+
+def get_token_expiry(token: str) -> Optional[float]:
+    """Read the `exp` claim (seconds since epoch) from a JWT, without verifying its signature."""
+    try:
+        payload = token.split(".")[1]
+        payload += "=" * (-len(payload) % 4)
+        exp = json.loads(base64.urlsafe_b64decode(payload)).get("exp")
+    except (IndexError, ValueError):
+        return None
+
+    return float(exp) if exp is not None else None
+
+
+class TokenRequestMinter:
+    """
+    Mints service account tokens by posting a TokenRequest to the Kubernetes API,
+    so no `oc` binary or subprocess is needed.
+
+    The DynamicClient can be injected (e.g. the `client` session fixture, or one pointing to a fake
+    API server); otherwise one is created from the current kubeconfig on first use.
+    """
+
+    def __init__(self, client: Optional[DynamicClient] = None, expiration_seconds: int = DEFAULT_EXPIRATION_SECONDS):
+        self.client = client
+        self.expiration_seconds = expiration_seconds
+
+    def __call__(self, service_account: str, namespace: str, expiration_seconds: Optional[int] = None) -> str:
+        if self.client is None:
+            self.client = get_client()
+
+        token_request = self.client.request(
+            "post",
+            f"/api/v1/namespaces/{namespace}/serviceaccounts/{service_account}/token",
+            body={
+                "apiVersion": "authentication.k8s.io/v1",
+                "kind": "TokenRequest",
+                "spec": {"expirationSeconds": expiration_seconds or self.expiration_seconds},
+            },
+        )
+
+        return token_request.status.token
+
+
+class CachedToken:
+    def __init__(self, token: str, expires_at: float):
+        self.token = token
+        self.expires_at = expires_at
+
+
+class ServiceAccountTokenProvider:
+    """
+    Thread-safe cache of service account tokens, keyed by (service account, namespace).
+
+    Tokens are reused until they get within `refresh_margin` seconds of the expiry found in the JWT.
+    Minting is single-flight: concurrent callers asking for the same key wait for one refresh
+    instead of minting a token each.
+    """
+
+    def __init__(
+        self,
+        mint_func: Callable[..., str],
+        refresh_margin: int = REFRESH_MARGIN_SECONDS,
+    ):
+        self.mint_func = mint_func
+        self.refresh_margin = refresh_margin
+        self._tokens: dict[tuple[str, str], CachedToken] = {}
+        self._key_locks: dict[tuple[str, str], threading.Lock] = {}
+        self._lock = threading.Lock()
+
+    def get_token(self, service_account: str, namespace: str, expiration_seconds: Optional[int] = None) -> str:
+        """
+        Get a valid token for a service account, minting a new one if needed.
+
+        :param service_account (str): Name of the service account.
+        :param namespace (str): Namespace of the service account.
+        :param expiration_seconds (int): Requested token lifetime, only used when a new token is minted.
+        """
+        key = (service_account, namespace)
+
+        cached_token = self._get_fresh(key=key)
+        if cached_token is not None:
+            return cached_token.token
+
+        with self._get_key_lock(key=key):
+            # Another caller may have refreshed the token while we waited for the lock
+            cached_token = self._get_fresh(key=key)
+            if cached_token is not None:
+                return cached_token.token
+
+            logger.debug(f"Minting token for service account {service_account} in namespace {namespace}")
+            token = self.mint_func(
+                service_account=service_account, namespace=namespace, expiration_seconds=expiration_seconds
+            )
+            expires_at = get_token_expiry(token=token) or time() + FALLBACK_TOKEN_TTL_SECONDS
+
+            with self._lock:
+                self._tokens[key] = CachedToken(token=token, expires_at=expires_at)
+
+            return token
+
+    def invalidate(self, service_account: str, namespace: str) -> None:
+        """Drop the cached token, e.g. after it has been rejected or its namespace was deleted."""
+        with self._lock:
+            self._tokens.pop((service_account, namespace), None)
+
+    def _get_fresh(self, key: tuple[str, str]) -> Optional[CachedToken]:
+        with self._lock:
+            cached_token = self._tokens.get(key)
+
+        if cached_token is not None and time() < cached_token.expires_at - self.refresh_margin:
+            return cached_token
+        return None
+
+    def _get_key_lock(self, key: tuple[str, str]) -> threading.Lock:
+        with self._lock:
+            return self._key_locks.setdefault(key, threading.Lock())
+
+
+token_minter = TokenRequestMinter()
+token_provider = ServiceAccountTokenProvider(mint_func=token_minter)
+
+
+def set_token_client(client: DynamicClient) -> None:
+    """Mint tokens through the given DynamicClient from now on."""
+    token_minter.client = client
+
+
+def get_ocp_token(namespace: Namespace) -> str:
+    return token_provider.get_token(service_account=TEST_USER, namespace=namespace.name)
+
+
+def invalidate_ocp_token(namespace: Namespace) -> None:
+    token_provider.invalidate(service_account=TEST_USER, namespace=namespace.name)
+
+
+def get_prometheus_token(expiration_seconds: int = 1800) -> str:
+    return token_provider.get_token(
+        service_account=PROMETHEUS_SERVICE_ACCOUNT,
+        namespace=PROMETHEUS_NAMESPACE,
+        expiration_seconds=expiration_seconds,
+    )
@@ -0,0 +1,150 @@
+import http
+import logging
+import threading
+from typing import Any, Optional
+
+import requests
+import urllib3
+from ocp_resources.namespace import Namespace
+from requests.adapters import HTTPAdapter
+
+from trustyai_tests.tests.compression import send_compressed
+from trustyai_tests.tests.constants import TRUSTYAI_SERVICE
+from trustyai_tests.tests.endpoints import EndpointKind, endpoint_resolver
+from trustyai_tests.tests.tokens import get_ocp_token, invalidate_ocp_token
+
+logger: logging.Logger = logging.getLogger(__name__)
+
+POOL_CONNECTIONS: int = 1
+POOL_MAXSIZE: int = 16
+
+# Methods that are safe to send again after the connection dropped, even if the server already got them
+IDEMPOTENT_METHODS: tuple[str, ...] = ("GET", "DELETE")
+
+_trustyai_clients: dict[str, "TrustyAIClient"] = {}
+_trustyai_clients_lock = threading.Lock()
+
+
+def is_connect_failure(error: requests.exceptions.ConnectionError) -> bool:
+    """Whether the connection couldn't be established, so the server can't have received the request."""
+    if isinstance(error, requests.exceptions.ConnectTimeout):
+        return True
+    reason = getattr(error.args[0], "reason", None) if error.args else None
+    return isinstance(reason, urllib3.exceptions.NewConnectionError)
+
+
+class TrustyAIClient:
+    """
+    HTTP client bound to the TrustyAIService of a namespace.
+
+    The Route URL comes from the endpoint cache and the bearer token from the shared token cache. Every request
+    goes through a pooled requests.Session, so consecutive calls reuse the same keep-alive TLS connection.
+    """
+
+    def __init__(self, namespace: Namespace, pool_maxsize: int = POOL_MAXSIZE):
+        self.namespace = namespace
+        self.session = requests.Session()
+        self.session.verify = False
+        self.session.mount("https://", HTTPAdapter(pool_connections=POOL_CONNECTIONS, pool_maxsize=pool_maxsize))
+        self.base_url = ""
+        self.resolve()
+
+    @property
+    def headers(self) -> dict[str, str]:
+        return {
+            "Authorization": f"Bearer {get_ocp_token(namespace=self.namespace)}",
+            "Content-Type": "application/json",
+        }
+
+    def resolve(self, refresh: bool = False) -> None:
+        """Resolve the TrustyAIService Route of the namespace, bypassing the endpoint cache if `refresh` is set."""
+        if refresh:
+            endpoint_resolver.invalidate(namespace=self.namespace.name, name=TRUSTYAI_SERVICE, kind=EndpointKind.ROUTE)
+        self.base_url = endpoint_resolver.get_url(
+            namespace=self.namespace.name, name=TRUSTYAI_SERVICE, kind=EndpointKind.ROUTE
+        )
+
+    def request(
+        self, method: str, endpoint: str, data: Any = None, json: Any = None, compression: Optional[str] = None
+    ) -> requests.Response:
+        """
+        Send a request to the TrustyAIService.
+        If the token was rejected a new one is minted, and if the connection failed the Route is resolved
+        again. In both cases the request is retried once. A POST is only retried if the connection couldn't be
+        established, since a connection dropped later may have delivered it, e.g. ingesting data twice.
+
+        :param method (str): HTTP method, either GET, POST or DELETE.
+        :param endpoint (str): TrustyAI endpoint, e.g. /info.
+        :param data (Any): Raw request body.
+        :param json (Any): JSON-serializable request body.
+        :param compression (str): Content-Encoding of the raw body (gzip, zstd or auto). Uncompressed if not set.
+        """
+        if method not in ("GET", "POST", "DELETE"):
+            raise ValueError(f"Unsupported HTTP method: {method}")
+
+        try:
+            response = self._send(method=method, endpoint=endpoint, data=data, json=json, compression=compression)
+            if response.status_code != http.HTTPStatus.UNAUTHORIZED:
+                return response
+            logger.info(f"TrustyAI request to {endpoint} was unauthorized. Refreshing token.")
+            invalidate_ocp_token(namespace=self.namespace)
+        except requests.exceptions.ConnectionError as e:
+            if method not in IDEMPOTENT_METHODS and not is_connect_failure(error=e):
+                raise
+            logger.info(f"Connection to TrustyAI service failed: {e}. Resolving route again.")
+            self.resolve(refresh=True)
+
+        if hasattr(data, "seek"):
+            # Streamed bodies were consumed by the first attempt
+            data.seek(0)
+        return self._send(method=method, endpoint=endpoint, data=data, json=json, compression=compression)
+
+    def get(self, endpoint: str) -> requests.Response:
+        return self.request(method="GET", endpoint=endpoint)
+
+    def post(
+        self, endpoint: str, data: Any = None, json: Any = None, compression: Optional[str] = None
+    ) -> requests.Response:
+        return self.request(method="POST", endpoint=endpoint, data=data, json=json, compression=compression)
+
+    def delete(self, endpoint: str, json: Any = None) -> requests.Response:
+        return self.request(method="DELETE", endpoint=endpoint, json=json)
+
+    def close(self) -> None:
+        self.session.close()
+
+    def _send(
+        self, method: str, endpoint: str, data: Any = None, json: Any = None, compression: Optional[str] = None
+    ) -> requests.Response:
+        url = f"{self.base_url}{endpoint}"
+        if compression is None or data is None:
+            return self.session.request(method=method, url=url, headers=self.headers, data=data, json=json)
+
+        return send_compressed(
+            send=lambda headers, body: self.session.request(
+                method=method, url=url, headers={**self.headers, **headers}, data=body
+            ),
+            url=url,
+            body=data,
+            compression=compression,
+        )
+
+
+def get_trustyai_client(namespace: Namespace) -> TrustyAIClient:
+    """Get the cached TrustyAIClient for a namespace, creating it on first use."""
+    with _trustyai_clients_lock:
+        trustyai_client = _trustyai_clients.get(namespace.name)
+        if trustyai_client is None:
+            trustyai_client = TrustyAIClient(namespace=namespace)
+            _trustyai_clients[namespace.name] = trustyai_client
+
+    return trustyai_client
+
+
+def close_trustyai_client(namespace: Namespace) -> None:
+    """Close and forget the TrustyAIClient of a namespace, e.g. when the namespace is deleted."""
+    with _trustyai_clients_lock:
+        trustyai_client = _trustyai_clients.pop(namespace.name, None)
+    if trustyai_client is not None:
+        trustyai_client.close()
+    invalidate_ocp_token(namespace=namespace)
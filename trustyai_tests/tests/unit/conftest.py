@@ -0,0 +1,15 @@
+from typing import Any, Generator, Optional
+
+import pytest
+
+
+@pytest.fixture(autouse=True)
+def test_logging() -> Generator[None, Any, None]:
+    # Unit tests run against local stand-ins, so there are no cluster logs to collect around them
+    yield
+
+
+@pytest.fixture(autouse=True, scope="session")
+def modelmesh_configmap() -> Optional[Any]:
+    # Unit tests don't deploy models, so the ModelMesh ConfigMap isn't needed
+    return None
@@ -0,0 +1,162 @@
+import socket
+import struct
+import threading
+from typing import Any, Generator, Optional
+
+import pymysql
+import pytest
+
+from trustyai_tests.tests.utils import check_mysql_connection
+
+# Capabilities of the stand-in: long password, connect with database, protocol 4.1, secure connection, plugin auth
+SERVER_CAPABILITIES: int = 0x0000_0001 | 0x0000_0008 | 0x0000_0200 | 0x0000_8000 | 0x0008_0000
+ACCESS_DENIED_ERROR: int = 1045
+OK_PACKET: bytes = b"\x00\x00\x00\x02\x00\x00\x00"
+EOF_PACKET: bytes = b"\xfe\x00\x00\x02\x00"
+
+DATABASE_CONFIGURATION: dict[str, str] = {
+    "databaseUsername": "trustyai",
+    "databasePassword": "trustyai-password",
+    "databaseName": "trustyai_database",
+}
+
+
+def length_encoded(value: bytes) -> bytes:
+    return bytes([len(value)]) + value
+
+
+class FakeMySQLServer:
+    """
+    MySQL-protocol stand-in: sends a v10 handshake, accepts or denies the login, and answers SELECT queries
+    with a single row and any other query with OK. Passwords aren't checked; the users, databases and queries
+    it got are recorded.
+    """
+
+    def __init__(self, deny_logins: bool = False):
+        self.deny_logins = deny_logins
+        self.logins: list[tuple[str, str]] = []
+        self.queries: list[str] = []
+        self.socket = socket.create_server(("127.0.0.1", 0))
+        self.port = self.socket.getsockname()[1]
+
+    def start(self) -> "FakeMySQLServer":
+        threading.Thread(target=self._accept, daemon=True).start()
+        return self
+
+    def stop(self) -> None:
+        self.socket.close()
+
+    def _accept(self) -> None:
+        while True:
+            try:
+                connection, _ = self.socket.accept()
+            except OSError:
+                return
+            threading.Thread(target=self._serve, args=(connection,), daemon=True).start()
+
+    def _serve(self, connection: socket.socket) -> None:
+        with connection:
+            salt = b"12345678abcdefghijkl"
+            self._send(
+                connection=connection,
+                sequence=0,
+                payload=b"".join([
+                    b"\x0a5.5.5-fake\x00",
+                    struct.pack("<I", 1),
+                    salt[:8],
+                    b"\x00",
+                    struct.pack("<HBHH", SERVER_CAPABILITIES & 0xFFFF, 0x21, 2, SERVER_CAPABILITIES >> 16),
+                    bytes([len(salt) + 1]),
+                    b"\x00" * 10,
+                    salt[8:],
+                    b"\x00mysql_native_password\x00",
+                ]),
+            )
+
+            sequence, payload = self._receive(connection=connection)
+            # HandshakeResponse41: capabilities, max packet size, charset and 23 reserved bytes, then the user,
+            # the length-prefixed auth response and the database
+            user_end = payload.index(b"\x00", 32)
+            database_start = user_end + 2 + payload[user_end + 1]
+            database = payload[database_start:].split(b"\x00")[0]
+            self.logins.append((payload[32:user_end].decode("utf-8"), database.decode("utf-8")))
+            if self.deny_logins:
+                self._send(
+                    connection=connection,
+                    sequence=sequence + 1,
+                    payload=b"\xff" + struct.pack("<H", ACCESS_DENIED_ERROR) + b"#28000Access denied",
+                )
+                return
+            self._send(connection=connection, sequence=sequence + 1, payload=OK_PACKET)
+
+            while True:
+                _, payload = self._receive(connection=connection)
+                if payload is None or payload[:1] == b"\x01":
+                    return
+                query = payload[1:].decode("utf-8")
+                self.queries.append(query)
+                if not query.upper().startswith("SELECT"):
+                    # e.g. the SET AUTOCOMMIT pymysql sends after logging in
+                    self._send(connection=connection, sequence=1, payload=OK_PACKET)
+                    continue
+
+                column = b"".join([
+                    length_encoded(b"def"),
+                    *(length_encoded(b"") for _ in range(3)),
+                    length_encoded(b"1"),
+                    length_encoded(b""),
+                    b"\x0c",
+                    struct.pack("<HIBHB", 63, 1, 8, 0x81, 0),
+                    b"\x00\x00",
+                ])
+                for sequence, packet in enumerate([b"\x01", column, EOF_PACKET, length_encoded(b"1"), EOF_PACKET]):
+                    self._send(connection=connection, sequence=sequence + 1, payload=packet)
+
+    @staticmethod
+    def _send(connection: socket.socket, sequence: int, payload: bytes) -> None:
+        connection.sendall(struct.pack("<I", len(payload))[:3] + bytes([sequence]) + payload)
+
+    @staticmethod
+    def _receive(connection: socket.socket) -> tuple[int, Optional[bytes]]:
+        header = connection.recv(4, socket.MSG_WAITALL)
+        if len(header) < 4:
+            return 0, None
+        length = int.from_bytes(header[:3], "little")
+
+        return header[3], connection.recv(length, socket.MSG_WAITALL)
+
+
+@pytest.fixture
+def mysql_server(request: pytest.FixtureRequest) -> Generator[FakeMySQLServer, Any, None]:
+    server = FakeMySQLServer(deny_logins=getattr(request, "param", False)).start()
+    yield server
+    server.stop()
+
+
+class TestCheckMySQLConnection:
+    """Checks MariaDB readiness probes with `check_mysql_connection` against a local MySQL-protocol stand-in."""
+
+    def test_check_mysql_connection(self, mysql_server: FakeMySQLServer) -> None:
+        check_mysql_connection(
+            host="127.0.0.1", port=mysql_server.port, database_configuration=DATABASE_CONFIGURATION, timeout=5
+        )
+
+        assert mysql_server.logins == [("trustyai", "trustyai_database")]
+        assert "SELECT 1" in mysql_server.queries
+
+    @pytest.mark.parametrize("mysql_server", [True], indirect=True)
+    def test_check_mysql_connection_denied(self, mysql_server: FakeMySQLServer) -> None:
+        with pytest.raises(pymysql.MySQLError):
+            check_mysql_connection(
+                host="127.0.0.1", port=mysql_server.port, database_configuration=DATABASE_CONFIGURATION, timeout=5
+            )
+
+    def test_check_mysql_connection_refused(self) -> None:
+        server = FakeMySQLServer()
+        port = server.port
+        server.stop()
+
+        with pytest.raises(pymysql.MySQLError):
+            check_mysql_connection(
+                host="127.0.0.1", port=port, database_configuration=DATABASE_CONFIGURATION, timeout=5
+            )
@@ -0,0 +1,78 @@
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Generator
+
+import pytest
+from kubernetes.client import ApiClient, Configuration
+from kubernetes.dynamic import DynamicClient
+
+from trustyai_tests.tests.tokens import TokenRequestMinter
+
+
+class FakeAPIServer(BaseHTTPRequestHandler):
+    """Kubernetes API stand-in answering discovery and TokenRequests, recording the TokenRequests it gets."""
+
+    token_requests: list[tuple[str, Any]] = []
+
+    def log_message(self, *args: Any) -> None:
+        pass
+
+    def do_GET(self) -> None:
+        if self.path == "/version":
+            self._send(body={"major": "1", "minor": "30"})
+        elif self.path == "/apis":
+            self._send(body={"kind": "APIGroupList", "apiVersion": "v1", "groups": []})
+        else:
+            self._send(body={"kind": "Status", "code": 404}, status=404)
+
+    def do_POST(self) -> None:
+        token_request = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        self.token_requests.append((self.path, token_request))
+        self._send(body={**token_request, "status": {"token": "minted-token"}}, status=201)
+
+    def _send(self, body: Any, status: int = 200) -> None:
+        content = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(content)))
+        self.end_headers()
+        self.wfile.write(content)
+
+
+@pytest.fixture(scope="class")
+def fake_api_client() -> Generator[DynamicClient, Any, None]:
+    server = ThreadingHTTPServer(("127.0.0.1", 0), FakeAPIServer)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    host, port = server.server_address
+    yield DynamicClient(client=ApiClient(configuration=Configuration(host=f"http://{host}:{port}")))
+    server.shutdown()
+    server.server_close()
+
+
+class TestTokenRequestMinter:
+    """Mints tokens with a TokenRequestMinter against a fake Kubernetes API server instead of a cluster."""
+
+    def test_mint_token(self, fake_api_client: DynamicClient) -> None:
+        FakeAPIServer.token_requests.clear()
+        minter = TokenRequestMinter(client=fake_api_client, expiration_seconds=600)
+
+        assert minter(service_account="test-user", namespace="test-namespace") == "minted-token"
+        assert FakeAPIServer.token_requests == [
+            (
+                "/api/v1/namespaces/test-namespace/serviceaccounts/test-user/token",
+                {
+                    "apiVersion": "authentication.k8s.io/v1",
+                    "kind": "TokenRequest",
+                    "spec": {"expirationSeconds": 600},
+                },
+            )
+        ]
+
+    def test_mint_token_expiration(self, fake_api_client: DynamicClient) -> None:
+        FakeAPIServer.token_requests.clear()
+        minter = TokenRequestMinter(client=fake_api_client)
+
+        minter(service_account="test-user", namespace="test-namespace", expiration_seconds=1800)
+        _, token_request = FakeAPIServer.token_requests[-1]
+        assert token_request["spec"]["expirationSeconds"] == 1800
@@ -1,24 +1,28 @@
+import abc
+import base64
 import http
 import json
 import logging
 import os
-import subprocess
-from time import time, sleep
-from typing import Any, List
+import random
+import threading
+from time import perf_counter, time, sleep
+from typing import Any, Iterator, List, Optional
 import yaml
 
+import grpc
 import kubernetes
+import pymysql
 import requests
 from ocp_resources.cluster_service_version import ClusterServiceVersion
 from ocp_resources.inference_service import InferenceService
+from ocp_resources.maria_db import MariaDB
 from ocp_resources.mariadb_operator import MariadbOperator
 from ocp_resources.namespace import Namespace
 from ocp_resources.pod import Pod
 from ocp_resources.route import Route
-from ocp_resources.event import Event
-from ocp_resources.service_serving_knative_dev import Service
+from ocp_resources.secret import Secret
 from ocp_resources.serving_runtime import ServingRuntime
-from ocp_utilities.monitoring import Prometheus
 
 from trustyai_tests.tests.constants import (
     TRUSTYAI_SERVICE,
@@ -31,6 +35,28 @@ from trustyai_tests.tests.constants import (
     OVMS,
     OPENVINO_MODEL_FORMAT,
     ONNX,
+    INGESTION_WINDOW,
+    KSERVE_API_GROUP,
+    MODELMESH_POD_LABEL_SELECTOR,
+)
+from trustyai_tests.tests.compression import send_compressed
+from trustyai_tests.tests.datasets import BatchFile, get_dataset_manifest, open_batch_body
+from trustyai_tests.tests.endpoints import EndpointKind, endpoint_resolver
+from trustyai_tests.tests.grpc_inference import get_grpc_inference_client, read_model_infer_request
+from trustyai_tests.tests.informers import informer_cache
+from trustyai_tests.tests.metrics import Metric, get_metric_endpoint
+from trustyai_tests.tests.port_forward import PortForward
+from trustyai_tests.tests.prometheus import ExpectedSeries, prometheus_client, publication_lag_tracker
+from trustyai_tests.tests.tokens import get_ocp_token, invalidate_ocp_token
+from trustyai_tests.tests.trustyai_client import get_trustyai_client
+from trustyai_tests.tests.waiters import (
+    WAIT_TIMEOUT_SECONDS,
+    WaitCondition,
+    get_num_started_containers,
+    is_pod_ready,
+    is_pod_running,
+    is_resource_ready,
+    resource_waiter,
 )
 
 logger: logging.Logger = logging.getLogger(__name__)
@@ -38,6 +64,28 @@ logger: logging.Logger = logging.getLogger(__name__)
 
 TENSORFLOW = "tensorflow"
 
+# Environment variable the TrustyAIService adds to the ModelMesh containers to receive their payloads
+MODELMESH_PAYLOAD_PROCESSORS_ENV: str = "MM_PAYLOAD_PROCESSORS"
+
+# Label the TrustyAI operator sets on the pods of a TrustyAIService
+TRUSTYAI_POD_LABEL_SELECTOR: str = f"app={TRUSTYAI_SERVICE}"
+
+# Backoff between /info polls while waiting for TrustyAI to store observations
+OBSERVATION_BACKOFF_INITIAL_SECONDS: float = 0.02
+OBSERVATION_BACKOFF_MAX_SECONDS: float = 2.0
+OBSERVATION_TIMEOUT_SECONDS: float = 60
+# Time TrustyAI gets to store each probe inference sent while waiting for a model to be registered
+REGISTRATION_PROBE_INTERVAL_SECONDS: float = 10
+
+MARIADB_API_VERSION: str = f"{MariaDB.api_group}/v1alpha1"
+MARIADB_POD_LABEL_SELECTOR: str = "app.kubernetes.io/instance=mariadb"
+MARIADB_CONNECT_TIMEOUT_SECONDS: float = 5
+MARIADB_MANIFEST: str = "trustyai_tests/manifests/mariadb.yaml"
+
+# Keep-alive session for inference requests, so consecutive batches reuse the same connection
+inference_session = requests.Session()
+inference_session.verify = False
+
 
 class TrustyAIPodNotFoundError(Exception):
     pass
@@ -76,67 +124,43 @@ def is_odh_or_rhoai():
     raise RuntimeError("Neither ODH nor RHOAI operators are installed.")
 
 
-def get_ocp_token(namespace: Namespace) -> str:
-    return subprocess.check_output(["oc", "create", "token", "test-user", "-n", namespace.name]).decode().strip()
-
-
 def get_trustyai_pod(namespace: Namespace) -> Pod:
-    for pod in Pod.get(namespace=namespace.name):
-        if TRUSTYAI_SERVICE in pod.name:
-            return pod
+    pods = informer_cache.list(
+        namespace=namespace.name, api_version="v1", kind="Pod", label_selector=TRUSTYAI_POD_LABEL_SELECTOR
+    )
+    for pod in pods:
+        if TRUSTYAI_SERVICE in pod.metadata.name:
+            return Pod(name=pod.metadata.name, namespace=namespace.name, client=informer_cache.client)
 
     raise TrustyAIPodNotFoundError(f"No TrustyAI pod found in namespace {namespace.name}")
 
 
-def wait_for_trustyai_pod_running(namespace: Namespace) -> None:
-    """Wait for a TrustyAI service pod to be running in the given namespace"""
-
-    timeout = 60 * 20  # 20 minutes timeout
-    start_time = time()
-
-    while True:
-        if time() - start_time > timeout:
-            raise TimeoutError("TrustyAI service pod is not ready in time")
-
-        try:
-            trustyai_pod = get_trustyai_pod(namespace=namespace)
-
-            trustyai_pod.wait_for_status(status=trustyai_pod.Status.RUNNING)
-            return
-        except TrustyAIPodNotFoundError:
-            pass
-        except kubernetes.dynamic.exceptions.NotFoundError:
-            pass
+def get_trustyai_image(namespace: Namespace) -> str:
+    """Image of the TrustyAI service container in a namespace, or "unknown" if there is no TrustyAI pod."""
+    pods = informer_cache.list(
+        namespace=namespace.name, api_version="v1", kind="Pod", label_selector=TRUSTYAI_POD_LABEL_SELECTOR
+    )
+    for pod in pods:
+        for container in pod.spec.containers or []:
+            if container.name == TRUSTYAI_SERVICE:
+                return container.image
 
-        sleep(30)
+    return "unknown"
 
 
-def get_trustyai_service_route(namespace: Namespace) -> Route:
-    return Route(namespace=namespace.name, name=TRUSTYAI_SERVICE, ensure_exists=True)
+def wait_for_trustyai_pod_running(namespace: Namespace) -> None:
+    """Wait for a TrustyAI service pod to be running and ready in the given namespace"""
+    resource_waiter.wait_for_ready_pod(namespace=namespace.name, label_selector=TRUSTYAI_POD_LABEL_SELECTOR)
 
 
 def get_trustyai_model_metadata(namespace: Namespace) -> Any:
-    return send_trustyai_service_request(
-        namespace=namespace,
-        endpoint="/info",
-        method="GET",
-    )
+    return get_trustyai_client(namespace=namespace).get(endpoint="/info")
 
 
 def send_trustyai_service_request(
     namespace: Namespace, endpoint: str, method: str, data: Any = None, json: Any = None
 ) -> Any:
-    trustyai_service_route = get_trustyai_service_route(namespace=namespace)
-    token = get_ocp_token(namespace=namespace)
-
-    url = f"https://{trustyai_service_route.host}{endpoint}"
-    headers = {"Authorization": f"Bearer {token}", "Content-Type": "application/json"}
-
-    if method == "GET":
-        return requests.get(url=url, headers=headers, verify=False)
-    elif method == "POST":
-        return requests.post(url=url, headers=headers, data=data, json=json, verify=False)
-    raise ValueError(f"Unsupported HTTP method: {method}")
+    return get_trustyai_client(namespace=namespace).request(method=method, endpoint=endpoint, data=data, json=json)
 
 
 def verify_trustyai_model_metadata(
@@ -223,82 +247,417 @@ def parse_trustyai_model_metadata(model_metadata: Any) -> list[TrustyAIModelMeta
 
 
 def parse_input_data(data_path: str, num_batches: int = None) -> ModelInputData:
-    total_observations = 0
-    name = ""
-    num_features = 0
-    data_type = ""
-    processed_files = 0
-
-    for root, dirs, files in os.walk(data_path):
-        for filename in files:
-            if filename.endswith(".json"):
-                if num_batches is not None and processed_files >= num_batches:
-                    break
+    batches = get_dataset_manifest(data_path=data_path).batches(num_batches=num_batches)
+    tensors = [tensor for batch in batches for tensor in batch.tensors]
+
+    return ModelInputData(
+        name=tensors[0].name if tensors else "",
+        num_features=tensors[0].num_features if tensors else 0,
+        num_observations=sum(tensor.num_observations for tensor in tensors),
+        data_type=tensors[0].datatype if tensors else "",
+    )
 
-                file_path = os.path.join(root, filename)
 
-                with open(file_path, "r") as file:
-                    data = json.load(file)
+def is_modelmesh_pod_registered(pod: Any) -> bool:
+    """Whether a raw ModelMesh pod has the payload processors set by the TrustyAIService, and is ready."""
+    has_payload_processors = any(
+        env.name == MODELMESH_PAYLOAD_PROCESSORS_ENV for container in pod.spec.containers for env in container.env or []
+    )
+    return has_payload_processors and is_pod_ready(pod=pod)
 
-                inputs = data.get("inputs", data.get("request", {}).get("inputs"))
 
-                if inputs:
-                    for input_data in inputs:
-                        name = name or input_data["name"]
-                        num_features = num_features or input_data["shape"][1]
-                        data_type = data_type or input_data["datatype"]
+def wait_for_modelmesh_pods_registered(
+    namespace: Namespace,
+    inference_services: list[InferenceService],
+    data_path: str,
+    timeout: float = WAIT_TIMEOUT_SECONDS,
+) -> None:
+    """
+    Wait for TrustyAI to receive the inferences of ModelMesh models.
 
-                        num_observations = input_data["shape"][0]
-                        total_observations += num_observations
+    The TrustyAIService adds its payload processor to the ModelMesh deployment, which rolls out new pods.
+    Every ModelMesh pod having it and being ready, and every InferenceService reporting Ready, are only
+    preconditions: registration is confirmed once a probe inference sent to each model shows up in /info.
 
-                processed_files += 1
+    :param namespace (Namespace): Namespace where the InferenceServices and TrustyAIService live.
+    :param inference_services (list[InferenceService]): Models whose inferences TrustyAI has to receive.
+    :param data_path (str): Directory containing the batch files. The first one is sent as the probe inference.
+    :param timeout (float): Maximum time in seconds to wait for every model.
+    """
+    deadline = time() + timeout
+    resource_waiter.wait_for_all(
+        api_version="v1",
+        kind="Pod",
+        namespace=namespace.name,
+        predicate=is_modelmesh_pod_registered,
+        label_selector=MODELMESH_POD_LABEL_SELECTOR,
+        timeout=deadline - time(),
+        description="registered by TrustyAIService",
+    )
+    for inference_service in inference_services:
+        wait_for_inference_service_ready(inference_service=inference_service, timeout=deadline - time())
+    for inference_service in inference_services:
+        wait_for_inference_service_registered(
+            namespace=namespace, inference_service=inference_service, data_path=data_path, timeout=deadline - time()
+        )
 
-        if num_batches is not None and processed_files >= num_batches:
-            break
 
-    return ModelInputData(
-        name=name,
-        num_features=num_features,
-        num_observations=total_observations,
-        data_type=data_type,
+def wait_for_inference_service_registered(
+    namespace: Namespace,
+    inference_service: InferenceService,
+    data_path: str,
+    type: str = "modelmesh",
+    timeout: float = WAIT_TIMEOUT_SECONDS,
+) -> None:
+    """
+    Send the first batch of a dataset to a model until TrustyAI stores its inferences.
+
+    :param namespace (Namespace): Namespace where the InferenceService and TrustyAIService live.
+    :param inference_service (InferenceService): Model to probe.
+    :param data_path (str): Directory containing the batch files.
+    :param type (str): Serving platform of the model, either modelmesh or kserve.
+    :param timeout (float): Maximum time in seconds to wait.
+    """
+    batch = get_dataset_manifest(data_path=data_path).batches(num_batches=1)[0]
+    initial_observations = get_num_observations(namespace=namespace, model_name=inference_service.name)
+    deadline = time() + timeout
+
+    refresh = False
+    while time() < deadline:
+        url = get_inference_url(namespace=namespace, inference_service=inference_service, type=type, refresh=refresh)
+        headers = {"Authorization": f"Bearer {get_ocp_token(namespace=namespace)}"}
+        with open(batch.path, "rb") as file:
+            try:
+                inference_session.post(url=url, headers=headers, data=file).raise_for_status()
+                refresh = False
+            except requests.exceptions.RequestException as e:
+                logger.info(f"Inference service {inference_service.name} not ready yet: {e}")
+                refresh = True
+
+        observation_wait = wait_for_observations(
+            namespace=namespace,
+            model_name=inference_service.name,
+            expected=initial_observations + 1,
+            deadline=min(REGISTRATION_PROBE_INTERVAL_SECONDS, max(deadline - time(), 0)),
+        )
+        if observation_wait.converged:
+            return
+
+    raise TimeoutError(f"TrustyAI didn't receive inferences of {inference_service.name} in {timeout:.0f}s")
+
+
+def get_inference_service_pod_selector(inference_service: InferenceService) -> str:
+    """Label selector of the pods serving an InferenceService: its own with KServe, its runtime's with ModelMesh."""
+    resource = inference_service.instance
+    annotations = resource.metadata.annotations or {}
+    if annotations.get(f"{KSERVE_API_GROUP}/deploymentMode") == "ModelMesh":
+        return f"name=modelmesh-serving-{resource.spec.predictor.model.runtime}"
+
+    return f"{KSERVE_API_GROUP}/inferenceservice={inference_service.name}"
+
+
+def wait_for_inference_service_ready(inference_service: InferenceService, timeout: float = 10 * 60) -> None:
+    """Wait for an InferenceService to report Ready, giving up early if its pods can't start."""
+    resource_waiter.wait(
+        api_version=f"{KSERVE_API_GROUP}/v1beta1",
+        kind="InferenceService",
+        namespace=inference_service.namespace,
+        condition=lambda inference_services: any(
+            resource.metadata.name == inference_service.name and is_resource_ready(resource=resource)
+            for resource in inference_services
+        ),
+        timeout=timeout,
+        description=f"ready ({inference_service.name})",
+        pod_selector=get_inference_service_pod_selector(inference_service=inference_service),
     )
 
 
-def wait_for_modelmesh_pods_registered(namespace: Namespace) -> None:
-    """Wait for modelmesh pods to be registered by TrustyAIService"""
-    pods_with_env_var = False
-    all_pods_running = False
-    timeout = 60 * 20
+def get_inference_url(
+    namespace: Namespace, inference_service: InferenceService, type: str = "modelmesh", refresh: bool = False
+) -> str:
+    """
+    Gets the inference URL of a model from the endpoint cache.
+
+    :param namespace (Namespace): Namespace where the InferenceService lives.
+    :param inference_service (InferenceService): Model to send inference requests to.
+    :param type (str): Serving platform of the model, either modelmesh or kserve.
+    :param refresh (bool): Resolve the URL through the API server even if it is cached.
+    """
+    if type == "modelmesh":
+        name, kind = inference_service.name, EndpointKind.ROUTE
+    elif type == "kserve":
+        name, kind = f"{inference_service.name}-predictor", EndpointKind.KNATIVE_SERVICE
+    else:
+        raise ValueError(f"Unsupported inference service type: {type}")
+
+    if refresh:
+        endpoint_resolver.invalidate(namespace=namespace.name, name=name, kind=kind)
+    url = endpoint_resolver.get_url(namespace=namespace.name, name=name, kind=kind)
+
+    return f"{url}/infer" if type == "modelmesh" else f"{url}/v2/models/{inference_service.name}/infer"
+
+
+def get_num_observations(namespace: Namespace, model_name: str) -> int:
+    """Gets the number of observations TrustyAI has stored for a model, 0 if it doesn't know the model yet."""
+    response = get_trustyai_model_metadata(namespace=namespace)
+    if response.status_code != http.HTTPStatus.OK:
+        return 0
+
+    model_metadata_list = parse_trustyai_model_metadata(model_metadata=response.content)
+    model_metadata = next((m for m in model_metadata_list if m.model_name == model_name), None)
+
+    return model_metadata.num_observations if model_metadata else 0
+
+
+def get_backoff_delays(
+    initial: float = OBSERVATION_BACKOFF_INITIAL_SECONDS, maximum: float = OBSERVATION_BACKOFF_MAX_SECONDS
+) -> Iterator[float]:
+    """Yields exponentially growing delays capped at `maximum`, with equal jitter so concurrent pollers spread out."""
+    delay = initial
+    while True:
+        yield random.uniform(delay / 2, delay)
+        delay = min(delay * 2, maximum)
+
+
+class ObservationWait:
+    """Outcome of a wait for TrustyAI to store the observations of a model."""
+
+    def __init__(self, model_name: str, expected: int, observations: int, elapsed: float):
+        self.model_name = model_name
+        self.expected = expected
+        self.observations = observations
+        self.elapsed = elapsed
+
+    @property
+    def converged(self) -> bool:
+        return self.observations >= self.expected
+
+
+def wait_for_observations(
+    namespace: Namespace, model_name: str, expected: int, deadline: float = OBSERVATION_TIMEOUT_SECONDS
+) -> ObservationWait:
+    """
+    Polls TrustyAI's /info with exponential backoff until it reports at least `expected` observations of a model.
+
+    :param namespace (Namespace): Namespace where the TrustyAIService lives.
+    :param model_name (str): Name of the model.
+    :param expected (int): Number of observations to wait for.
+    :param deadline (float): Maximum time in seconds to wait.
+    :return: ObservationWait with the last observed count and how long it took to converge.
+    """
     start_time = time()
-    while not pods_with_env_var or not all_pods_running:  # TODO: Consider using TimeoutSampler in the future
-        if time() - start_time > timeout:
-            raise TimeoutError("Not all model pods are ready in time")
+    delays = get_backoff_delays()
 
-        model_pods = [pod for pod in Pod.get(namespace=namespace.name) if "modelmesh-serving" in pod.name]
+    while True:
+        observations = get_num_observations(namespace=namespace, model_name=model_name)
+        elapsed = time() - start_time
+        if observations >= expected:
+            logger.info(f"TrustyAI stored {observations} observations of {model_name} after {elapsed:.2f}s")
+            return ObservationWait(model_name=model_name, expected=expected, observations=observations, elapsed=elapsed)
+
+        remaining = deadline - elapsed
+        if remaining <= 0:
+            logger.warning(
+                f"TrustyAI stored {observations} of {expected} observations of {model_name} after {elapsed:.2f}s"
+            )
+            return ObservationWait(model_name=model_name, expected=expected, observations=observations, elapsed=elapsed)
 
-        pods_with_env_var = False
-        all_pods_running = True
-        for pod in model_pods:
+        sleep(min(next(delays), remaining))
+
+
+class ObservationVerifier(threading.Thread):
+    """
+    Background poller of TrustyAI's /info, tracking how many observations of a model have been stored.
+    Callers block on `wait_for` until the count reaches the value they expect.
+    """
+
+    def __init__(self, namespace: Namespace, model_name: str, poll_interval: float = 0.5):
+        super().__init__(daemon=True)
+        self.namespace = namespace
+        self.model_name = model_name
+        self.poll_interval = poll_interval
+        self.observations = 0
+        # Error of the last poll, if it failed
+        self.error: Optional[Exception] = None
+        self._condition = threading.Condition()
+        self._stop_event = threading.Event()
+
+    def run(self) -> None:
+        while not self._stop_event.is_set():
             try:
-                has_env_var = False
-                for container in pod.instance.spec.containers:
-                    if container.env is not None and any(env.name == "MM_PAYLOAD_PROCESSORS" for env in container.env):
-                        has_env_var = True
-                        break
+                observations = get_num_observations(namespace=self.namespace, model_name=self.model_name)
+                with self._condition:
+                    self.observations = observations
+                    self.error = None
+                    self._condition.notify_all()
+            except Exception as e:
+                # Keep polling, failures are often transient, e.g. while the Route or the token is refreshed
+                logger.debug(f"Failed to get observations of {self.model_name} from TrustyAI: {e}")
+                with self._condition:
+                    self.error = e
+
+            self._stop_event.wait(self.poll_interval)
+
+    def wait_for(self, expected: int, timeout: float) -> bool:
+        """Block until TrustyAI reports at least `expected` observations. Returns False on timeout."""
+        with self._condition:
+            return self._condition.wait_for(lambda: self.observations >= expected, timeout=timeout)
+
+    def timeout_error(self, expected: int) -> TimeoutError:
+        """TimeoutError for a `wait_for` that timed out, with the error of the last poll if it failed."""
+        with self._condition:
+            last_error = f". Last poll failed: {self.error}" if self.error is not None else ""
+            return TimeoutError(
+                f"TrustyAI stored {self.observations} observations of {self.model_name}, "
+                f"expected {expected}{last_error}"
+            )
+
+    def stop(self) -> None:
+        self._stop_event.set()
+
+
+class BatchSender(abc.ABC):
+    """Sends the batch files of a dataset to a model, one attempt at a time."""
+
+    # Errors of a failed attempt, retried by `send_batches_pipelined`
+    errors: tuple[type[Exception], ...] = ()
+
+    @abc.abstractmethod
+    def send(self, batch: BatchFile) -> None:
+        """Send a batch file once, raising one of `errors` if the attempt fails."""
+
+    def refresh(self) -> None:
+        """Resolve the model's endpoint again after a failed attempt, e.g. when its pod was replaced."""
+
+
+class RestBatchSender(BatchSender):
+    """Posts batch files to the REST endpoint of an InferenceService, through the shared inference session."""
+
+    errors = (requests.exceptions.RequestException,)
+
+    def __init__(
+        self,
+        namespace: Namespace,
+        inference_service: InferenceService,
+        type: str = "modelmesh",
+        binary: bool = False,
+        compression: str = None,
+    ):
+        self.namespace = namespace
+        self.inference_service = inference_service
+        self.type = type
+        self.binary = binary
+        self.compression = compression
+        self.url = get_inference_url(namespace=namespace, inference_service=inference_service, type=type)
+
+    def send(self, batch: BatchFile) -> None:
+        # Read on every send, so a token refreshed by the cache during a long ingestion is picked up
+        headers = {"Authorization": f"Bearer {get_ocp_token(namespace=self.namespace)}"}
+        with open_batch_body(batch=batch, binary=self.binary) as (body, body_headers):
+            response = send_compressed(
+                send=lambda encoding_headers, data: inference_session.post(
+                    url=self.url, headers={**headers, **body_headers, **encoding_headers}, data=data
+                ),
+                url=self.url,
+                body=body,
+                compression=self.compression,
+            )
+            if response.status_code == http.HTTPStatus.UNAUTHORIZED:
+                # Mint a new token for the retry
+                invalidate_ocp_token(namespace=self.namespace)
+            response.raise_for_status()
+
+    def refresh(self) -> None:
+        self.url = get_inference_url(
+            namespace=self.namespace, inference_service=self.inference_service, type=self.type, refresh=True
+        )
+
+
+class GRPCBatchSender(BatchSender):
+    """Sends batch files to a ModelMesh InferenceService as KServe v2 ModelInfer calls, over the namespace's channel."""
+
+    errors = (grpc.RpcError,)
+
+    def __init__(self, namespace: Namespace, inference_service: InferenceService):
+        self.namespace = namespace
+        self.inference_service = inference_service
+        self.client = get_grpc_inference_client(namespace=namespace)
 
-                if has_env_var:
-                    pods_with_env_var = True
-                    if pod.status != Pod.Status.RUNNING:
-                        all_pods_running = False
-                        break
-            except kubernetes.dynamic.exceptions.NotFoundError:
-                # Ignore the error if the pod is not found (deleted during the process)
-                continue
+    def send(self, batch: BatchFile) -> None:
+        self.client.infer(
+            model_name=self.inference_service.name,
+            request=read_model_infer_request(batch=batch, model_name=self.inference_service.name),
+        )
+
+    def refresh(self) -> None:
+        # The pod behind the port-forward may have been replaced
+        self.client = get_grpc_inference_client(namespace=self.namespace, refresh=True)
+
+
+def send_batches_pipelined(
+    namespace: Namespace,
+    model_name: str,
+    sender: BatchSender,
+    batches: list[BatchFile],
+    max_retries: int = 5,
+    retry_delay: int = 1,
+    window: int = INGESTION_WINDOW,
+    observation_timeout: float = OBSERVATION_TIMEOUT_SECONDS,
+    wait_for_all: bool = True,
+) -> list[float]:
+    """
+    Sends batches to a model without waiting for TrustyAI to acknowledge each one.
+
+    A background ObservationVerifier tracks the cumulative number of observations expected against /info.
+    Sending only blocks when `window` batches are in flight (sent but not yet stored by TrustyAI),
+    and once at the end until every batch has been stored.
+
+    :param namespace (Namespace): Namespace where the model and TrustyAIService live.
+    :param model_name (str): Model the observations are stored under.
+    :param sender (BatchSender): Sends each batch through REST or gRPC.
+    :param batches (list[BatchFile]): Batch files to send, in order.
+    :param max_retries (int): Maximum number of attempts to send each batch.
+    :param retry_delay (int): Delay between attempts in seconds.
+    :param window (int): Maximum number of batches in flight.
+    :param observation_timeout (float): Maximum time in seconds to wait for TrustyAI to store a batch.
+    :param wait_for_all (bool): Wait at the end until TrustyAI stored every batch.
+    :return: Time in seconds it took to send each batch, retries included.
+    """
+    expected_observations = [get_num_observations(namespace=namespace, model_name=model_name)]
+    verifier = ObservationVerifier(namespace=namespace, model_name=model_name)
+    verifier.start()
+
+    latencies = []
+    try:
+        for batch in batches:
+            # Block until the batch sent `window` batches ago has been stored
+            if len(expected_observations) > window and not verifier.wait_for(
+                expected=expected_observations[-window], timeout=observation_timeout
+            ):
+                raise verifier.timeout_error(expected=expected_observations[-window])
+
+            start_time = perf_counter()
+            for retry_count in range(1, max_retries + 1):
+                try:
+                    sender.send(batch)
+                    break
+                except sender.errors as e:
+                    logger.error(f"Error sending data for file: {batch.path}. Error: {str(e)}")
+                    if retry_count == max_retries:
+                        raise
+                    sender.refresh()
+                    sleep(retry_delay)
+            latencies.append(perf_counter() - start_time)
+
+            expected_observations.append(expected_observations[-1] + batch.num_observations)
 
-        if not pods_with_env_var or not all_pods_running:
-            sleep(5)
+        if wait_for_all and not verifier.wait_for(expected=expected_observations[-1], timeout=observation_timeout):
+            raise verifier.timeout_error(expected=expected_observations[-1])
+        logger.info(f"Successfully sent {len(latencies)} batches to {model_name}")
+    finally:
+        verifier.stop()
 
-    sleep(30)
+    return latencies
 
 
 def send_data_to_inference_service(
@@ -309,84 +668,94 @@ def send_data_to_inference_service(
     max_retries: int = 5,
     retry_delay: int = 1,
     num_batches: int = None,
+    window: int = None,
+    observation_timeout: float = OBSERVATION_TIMEOUT_SECONDS,
+    binary: bool = False,
+    compression: str = None,
+    protocol: str = "rest",
 ) -> None:
-    initial_observations = 0
-
-    token = get_ocp_token(namespace=namespace)
-
-    files_processed = 0
-    for root, _, files in os.walk(data_path):
-        for file_name in files:
-            if num_batches is not None and files_processed >= num_batches:
-                logger.info(f"Reached the specified number of batches ({num_batches}). Stopping processing.")
-                return
-
-            file_path = os.path.join(root, file_name)
-
-            with open(file_path, "r") as file:
-                data = file.read()
-
-            json_data = json.loads(data)
-            inputs = json_data.get("inputs", json_data.get("request", {}).get("inputs"))
-            file_observations = sum(input_data["shape"][0] for input_data in inputs) if inputs else 0
+    if protocol not in ("rest", "grpc"):
+        raise ValueError(f"Unsupported inference protocol: {protocol}")
+    if protocol == "grpc" and type != "modelmesh":
+        raise ValueError(f"gRPC inference is only supported for modelmesh models, not {type}")
+
+    if protocol == "grpc" or window is not None:
+        if protocol == "grpc":
+            sender = GRPCBatchSender(namespace=namespace, inference_service=inference_service)
+        else:
+            sender = RestBatchSender(
+                namespace=namespace,
+                inference_service=inference_service,
+                type=type,
+                binary=binary,
+                compression=compression,
+            )
+        send_batches_pipelined(
+            namespace=namespace,
+            model_name=inference_service.name,
+            sender=sender,
+            batches=get_dataset_manifest(data_path=data_path).batches(num_batches=num_batches),
+            max_retries=max_retries,
+            retry_delay=retry_delay,
+            window=window or INGESTION_WINDOW,
+            observation_timeout=observation_timeout,
+        )
+        return
 
-            if type == "modelmesh":
-                inference_route = Route(namespace=namespace.name, name=inference_service.name)
-                url = f"https://{inference_route.host}{inference_route.instance.spec.path}/infer"
-            elif type == "kserve":
-                inference_route = Service(namespace=namespace.name, name=f"{inference_service.name}-predictor")
-                temp_url = inference_route.instance.status["url"]
-                url = f"{temp_url}/v2/models/{inference_service.name}/infer"
+    # TrustyAI may already hold observations of the model, e.g. from a previous test class
+    initial_observations = get_num_observations(namespace=namespace, model_name=inference_service.name)
 
-            headers = {"Authorization": f"Bearer {token}"}
+    url = get_inference_url(namespace=namespace, inference_service=inference_service, type=type)
 
-            retry_count = 0
-            while retry_count < max_retries:
+    for batch in get_dataset_manifest(data_path=data_path).batches(num_batches=num_batches):
+        file_name = os.path.basename(batch.path)
+        with open_batch_body(batch=batch, binary=binary) as (body, body_headers):
+            for retry_count in range(1, max_retries + 1):
+                # The body is streamed, so rewind it before every attempt
+                body.seek(0)
+                headers = {"Authorization": f"Bearer {get_ocp_token(namespace=namespace)}"}
                 try:
-                    response = requests.post(url=url, headers=headers, data=data, verify=False)
-                    response.raise_for_status()
-
-                    # Wait for TrustyAI to update
-                    sleep(5)
-
-                    # Check if TrustyAI has updated
-                    updated_model_metadata_list = parse_trustyai_model_metadata(
-                        model_metadata=get_trustyai_model_metadata(namespace=namespace).content
-                    )
-                    updated_model_metadata = next(
-                        (m for m in updated_model_metadata_list if m.model_name == inference_service.name), None
+                    response = send_compressed(
+                        send=lambda encoding_headers, data: requests.post(
+                            url=url, headers={**headers, **body_headers, **encoding_headers}, data=data, verify=False
+                        ),
+                        url=url,
+                        body=body,
+                        compression=compression,
                     )
-
-                    if (
-                        updated_model_metadata
-                        and updated_model_metadata.num_observations == initial_observations + file_observations
-                    ):
-                        logger.info(f"Successfully sent data for file: {file_name}")
-                        initial_observations = updated_model_metadata.num_observations
-                        break
-                    else:
-                        logger.info(f"New observations not updated in TrustyAI. Resending data for file: {file_name}")
-                        retry_count += 1
-                        if retry_count < max_retries:
-                            sleep(retry_delay)
+                    response.raise_for_status()
                 except requests.exceptions.RequestException as e:
                     logger.error(f"Error sending data for file: {file_name}. Error: {str(e)}")
-                    retry_count += 1
+                    url = get_inference_url(
+                        namespace=namespace, inference_service=inference_service, type=type, refresh=True
+                    )
                     if retry_count < max_retries:
                         sleep(retry_delay)
+                    continue
+
+                observation_wait = wait_for_observations(
+                    namespace=namespace,
+                    model_name=inference_service.name,
+                    expected=initial_observations + batch.num_observations,
+                    deadline=observation_timeout,
+                )
+                if observation_wait.converged:
+                    logger.info(f"Successfully sent data for file: {file_name}")
+                    initial_observations = observation_wait.observations
+                    break
+
+                logger.info(f"New observations not updated in TrustyAI. Resending data for file: {file_name}")
             else:
                 logger.error(f"Maximum retries reached for file: {file_name}")
 
-            files_processed += 1
-            sleep(10)
-
-
-def upload_data_to_trustyai_service(namespace: Namespace, data_path: str) -> Any:
-    with open(f"{data_path}", "r") as file:
-        data = file.read()
 
+def upload_data_to_trustyai_service(namespace: Namespace, data_path: str, compression: str = None) -> Any:
     logger.info(msg="Uploading data to TrustyAI Service.")
-    response = send_trustyai_service_request(namespace=namespace, endpoint="/data/upload", method="POST", data=data)
+    # Stream the body from the file rather than loading the whole dataset into memory
+    with open(f"{data_path}", "rb") as file:
+        response = get_trustyai_client(namespace=namespace).post(
+            endpoint="/data/upload", data=file, compression=compression
+        )
 
     return response
 
@@ -402,12 +771,7 @@ def verify_metric_request(namespace: Namespace, endpoint: str, expected_metric_n
     """
 
     logger.info(f"Sending TrustyAI metric request: {endpoint}")
-    response = send_trustyai_service_request(
-        namespace=namespace,
-        endpoint=endpoint,
-        method="POST",
-        json=json_data,
-    )
+    response = get_trustyai_client(namespace=namespace).post(endpoint=endpoint, json=json_data)
     response_data = json.loads(response.text)
     logger.info(msg=f"Response: {json.dumps(json.loads(response.text), indent=2)}")
 
@@ -424,23 +788,20 @@ def verify_metric_request(namespace: Namespace, endpoint: str, expected_metric_n
     assert response_data["thresholds"] != "", "Thresholds are empty"
 
 
-def verify_metric_scheduling(namespace: Namespace, endpoint: str, json_data: Any) -> None:
+def verify_metric_scheduling(namespace: Namespace, metric: Metric, json_data: Any) -> None:
     """
     Send a request to schedule a metric to TrustyAI and validates the response.
+    The time until the metric reaches Prometheus is then measured in the background by the publication lag tracker.
 
     :param namespace (Namespace): Namespace where TrustyAIService and the corresponding InferenceService live.
-    :param model (InferenceService): InferenceService for which the metric has been calculated.
-    :param endpoint (str): TrustyAI endpoint to request the metric.
-    :param expected_metric_name (str): Metric name used to validate the response
+    :param metric (Metric): Metric to schedule.
+    :param json_data (Any): Body of the request, with the modelId of the InferenceService.
     """
+    endpoint = get_metric_endpoint(metric=metric, schedule=True)
 
     logger.info(f"Sending TrustyAI metric request: {endpoint}")
-    response = send_trustyai_service_request(
-        namespace=namespace,
-        endpoint=endpoint,
-        method="POST",
-        json=json_data,
-    )
+    scheduled_at = time()
+    response = get_trustyai_client(namespace=namespace).post(endpoint=endpoint, json=json_data)
     response_data = json.loads(response.text)
 
     logger.info(msg=f"Response: {json.dumps(json.loads(response.text), indent=2)}")
@@ -449,97 +810,47 @@ def verify_metric_scheduling(namespace: Namespace, endpoint: str, json_data: Any
     assert response_data["requestId"] != "", "Request ID is empty"
     assert response_data["timestamp"] != "", "Timestamp is empty"
 
-
-def verify_trustyai_metric_prometheus(
-    namespace: Namespace,
-    model: InferenceService,
-    prometheus_query: str,
-    metric_name: str,
-    max_retries: int = 20,
-    retry_delay: int = 5,
-) -> None:
-    """
-    Sends a query to Prometheus for a specific TrustyAI metric and verifies the result for a specific model.
-
-    :param namespace (Namespace): Namespace where TrustyAIService and InferenceService live
-    :param model (InferenceService): InferenceService for which the metric has been calculated
-    :param prometheus_query (str): Prometheus query
-    :param metric_name (str): Name of the metric
-    :param max_retries (int): Maximum number of retries
-    :param retry_delay (int): Delay between retries in seconds
-    """
-
-    prom_token = get_prometheus_token()
-    prom = Prometheus(verify_ssl=False, bearer_token=prom_token)
-
-    logger.info(f"Sending Prometheus query: {prometheus_query}")
-
-    retry_count = 0
-    while retry_count < max_retries:
-        result = prom.query(query=prometheus_query)
-
-        if result["status"] == "success" and len(result["data"]["result"]) > 0:
-            break
-
-        retry_count += 1
-        if retry_count < max_retries:
-            logger.info(f"No Prometheus data for the metric {metric_name}. Retrying in {retry_delay} second(s)...")
-            sleep(retry_delay)
-        else:
-            assert False, f"No Prometheus data for the metric {metric_name} after {max_retries} retries."
-
-    logger.info(msg=json.dumps(result, indent=4))
-
-    assert (
-        result["status"] == "success"
-    ), f"Unexpected status in result. Expected: 'success', Actual: {result['status']}"
-
-    # Find the item corresponding to the specified model
-    model_data = next((item for item in result["data"]["result"] if item["metric"]["model"] == model.name), None)
-
-    assert model_data is not None, f"No data found for model: {model.name}"
-
-    expected_metric_name = f"trustyai_{metric_name.lower()}"
-    assert (
-        model_data["metric"]["__name__"] == expected_metric_name
-    ), f"Incorrect metric name. Expected: {expected_metric_name}, Actual: {model_data['metric']['__name__']}"
-    assert model_data["metric"]["batch_size"] != "", "Batch size is empty"
-    assert (
-        model_data["metric"]["job"] == TRUSTYAI_SERVICE
-    ), f"Incorrect job name. Expected: {TRUSTYAI_SERVICE}, Actual: {model_data['metric']['job']}"
-
-    expected_metric_name_upper = metric_name.upper()
-    assert model_data["metric"]["metricName"] == expected_metric_name_upper, (
-        f"Incorrect metric name capitalization. "
-        f"Expected: {expected_metric_name_upper}, Actual: {model_data['metric']['metricName']}"
-    )
-    assert (
-        model_data["metric"]["model"] == model.name
-    ), f"Incorrect model name. Expected: {model.name}, Actual: {model_data['metric']['model']}"
-    assert model_data["metric"]["namespace"] == namespace.name, (
-        f"Incorrect namespace. " f"Expected: {namespace.name}, Actual: {model_data['metric']['namespace']}"
+    publication_lag_tracker.track(
+        series=ExpectedSeries(namespace=namespace, model_name=json_data["modelId"], metric_name=metric.value),
+        request_id=response_data["requestId"],
+        trustyai_image=get_trustyai_image(namespace=namespace),
+        scheduled_at=scheduled_at,
     )
 
-    expected_pod_name = get_trustyai_pod(namespace=namespace).name
-    assert (
-        model_data["metric"]["pod"] == expected_pod_name
-    ), f"Incorrect pod name. Expected: {expected_pod_name}, Actual: {model_data['metric']['pod']}"
-    assert (
-        model_data["metric"]["request"] != ""
-    ), "Request is empty"  # TODO: Try to find a way to get the requestId for this
-    assert (
-        model_data["metric"]["service"] == TRUSTYAI_SERVICE
-    ), f"Incorrect service name. Expected: {TRUSTYAI_SERVICE}, Actual: {model_data['metric']['service']}"
-    assert model_data["value"] != "", "Value is empty"
 
+def verify_trustyai_metrics_prometheus(expected: list[ExpectedSeries]) -> None:
+    """
+    Waits for TrustyAI metric series to reach Prometheus, with one query for all of them, then verifies their labels.
 
-def get_prometheus_token(duration: int = "1800s") -> str:
-    token_command = f"oc create token prometheus-k8s -n openshift-monitoring --duration={duration}"
-    try:
-        result = subprocess.run(token_command, shell=True, check=True, capture_output=True, text=True)
-        return result.stdout.strip()
-    except subprocess.CalledProcessError as e:
-        raise RuntimeError(f"Command {token_command} failed to execute: {e.stderr}")
+    :param expected (list[ExpectedSeries]): Metric series expected for each model and namespace
+    """
+    found = prometheus_client.wait_for_series(expected=expected)
+    logger.info(msg=json.dumps(list(found.values()), indent=4))
+
+    pod_names: dict[str, str] = {}
+    errors: list[str] = []
+    for series in expected:
+        labels, value = found[series.key]["metric"], found[series.key]["value"]
+        if series.namespace.name not in pod_names:
+            pod_names[series.namespace.name] = get_trustyai_pod(namespace=series.namespace).name
+
+        expected_labels = {
+            "job": TRUSTYAI_SERVICE,
+            "metricName": series.metric_name.upper(),
+            "pod": pod_names[series.namespace.name],
+            "service": TRUSTYAI_SERVICE,
+        }
+        errors += [
+            f"{series}: incorrect {label}. Expected: {expected_value}, Actual: {labels.get(label)}"
+            for label, expected_value in expected_labels.items()
+            if labels.get(label) != expected_value
+        ]
+        # TODO: Try to find a way to get the requestId for the request label
+        errors += [f"{series}: {label} is empty" for label in ("batch_size", "request") if not labels.get(label)]
+        if value == "":
+            errors.append(f"{series}: value is empty")
+
+    assert not errors, "\n".join(errors)
 
 
 def apply_trustyai_name_mappings(
@@ -547,11 +858,41 @@ def apply_trustyai_name_mappings(
 ) -> None:
     data = {"modelId": inference_service.name, "inputMapping": input_mappings, "outputMapping": output_mappings}
 
-    response = send_trustyai_service_request(namespace=namespace, endpoint="/info/names", method="POST", json=data)
+    response = get_trustyai_client(namespace=namespace).post(endpoint="/info/names", json=data)
 
     assert response.status_code == http.HTTPStatus.OK, f"Wrong status code: {response.status_code}"
 
 
+def reset_trustyai_service(namespace: Namespace) -> None:
+    """
+    Undo what a test class changed in a TrustyAIService through its API, so the next class leasing it from the
+    environment pool starts clean: the scheduled metrics are deleted, and so are the name mappings of every model.
+    TrustyAI can't delete stored inferences, so those are kept.
+
+    :param namespace (Namespace): Namespace where the TrustyAIService lives.
+    """
+    trustyai_client = get_trustyai_client(namespace=namespace)
+
+    response = trustyai_client.get(endpoint="/metrics/all/requests")
+    response.raise_for_status()
+    for scheduled in response.json().get("requests", []):
+        metric_name = scheduled["request"]["metricName"].lower()
+        metric = next((metric for metric in Metric if metric.value == metric_name), None)
+        if metric is None:
+            logger.warning(f"Not deleting scheduled metric {scheduled['id']}: unknown metric {metric_name}")
+            continue
+
+        trustyai_client.delete(
+            endpoint=get_metric_endpoint(metric=metric, schedule=True), json={"requestId": scheduled["id"]}
+        ).raise_for_status()
+        logger.info(f"Deleted scheduled {metric_name} metric {scheduled['id']} in namespace {namespace.name}")
+
+    response = get_trustyai_model_metadata(namespace=namespace)
+    response.raise_for_status()
+    for model_metadata in parse_trustyai_model_metadata(model_metadata=response.content):
+        trustyai_client.delete(endpoint="/info/names", json={"modelId": model_metadata.model_name}).raise_for_status()
+
+
 def get_kserve_route(model_namespace: str, model: InferenceService) -> Any:
     """
     Gets the hostname of a model deployed on KServe.
@@ -646,6 +987,15 @@ def verify_saliency_explanation(model_namespace: str, model: InferenceService, e
             ], f"Unexpected saliency results: {list(item.keys())}"
 
 
+def create_mariadb(namespace: Namespace) -> MariaDB:
+    """MariaDB from its manifest, deployed in the given namespace instead of the one in the manifest."""
+    with open(MARIADB_MANIFEST, "r") as file:
+        kind_dict = yaml.safe_load(file)
+    kind_dict["metadata"]["namespace"] = namespace.name
+
+    return MariaDB(kind_dict=kind_dict)
+
+
 def create_ovms_runtime(namespace: Namespace) -> ServingRuntime:
     supported_model_formats = [
         {"name": OPENVINO_MODEL_FORMAT, "version": "opset1", "autoSelect": True},
@@ -760,68 +1110,129 @@ def wait_for_mariadb_operator_pods(mariadb_operator: MariadbOperator, timeout: i
         "mariadb-operator-webhook",
     ]
 
-    start_time = time()
+    resource_waiter.wait_all(
+        conditions=[
+            WaitCondition(
+                api_version="v1",
+                kind="Pod",
+                namespace=mariadb_operator.namespace,
+                condition=lambda pods, prefix=pod_prefix: any(
+                    pod.metadata.name.startswith(prefix) and is_pod_running(pod=pod) for pod in pods
+                ),
+                description=f"running ({pod_prefix})",
+                pod_name=pod_prefix,
+            )
+            for pod_prefix in expected_pods
+        ],
+        deadline=time() + timeout,
+    )
 
-    for pod_prefix in expected_pods:
-        while True:
-            if time() - start_time > timeout:
-                raise TimeoutError(f"Timed out waiting for MariaDB Operator pods after {timeout} seconds")
 
-            pods = Pod.get(namespace=mariadb_operator.namespace)
-            matching_pods = [pod for pod in pods if pod.name.startswith(pod_prefix)]
+def wait_for_mariadb_pods(mariadb, timeout: int = 300) -> Any:
+    """Wait for the pod of a MariaDB to be Running, and return its raw object."""
+    return resource_waiter.wait_for_pod(
+        namespace=mariadb.namespace,
+        label_selector=MARIADB_POD_LABEL_SELECTOR,
+        predicate=is_pod_running,
+        timeout=timeout,
+        description="running",
+    )
 
-            if matching_pods:
-                pod = matching_pods[0]
-                try:
-                    pod.wait_for_status(status=Pod.Status.RUNNING, timeout=timeout - (time() - start_time))
-                    break
-                except TimeoutError:
-                    raise TimeoutError(f"Timed out waiting for {pod.name} to reach Running status")
-            else:
-                print(f"Waiting for {pod_prefix} pod to be created...")
-                sleep(5)  # Wait for 5 seconds before checking again
 
+def get_database_configuration(secret: Secret) -> dict[str, str]:
+    """Decoded data of a TrustyAI database configuration secret, e.g. db-credentials."""
+    return {key: base64.b64decode(value).decode("utf-8") for key, value in secret.instance.data.items()}
 
-def wait_for_mariadb_pods(mariadb, timeout: int = 300) -> None:
-    start_time = time()
-    namespace = mariadb.namespace
-    label_key = "app.kubernetes.io/instance"
-    label_value = "mariadb"
 
-    while True:
-        if time() - start_time > timeout:
-            raise TimeoutError(f"Timed out waiting for MariaDB pod after {timeout} seconds")
+def check_mysql_connection(
+    host: str, port: int, database_configuration: dict[str, str], timeout: float = MARIADB_CONNECT_TIMEOUT_SECONDS
+) -> None:
+    """
+    Log in to a MySQL-protocol server with the credentials of a database configuration and run a query.
+    Raises a pymysql.MySQLError while the server, the user or the database isn't ready.
 
-        pods = Pod.get(namespace=namespace)
-        matching_pods = [pod for pod in pods if pod.labels.get(label_key) == label_value]
+    :param host (str): Host of the server.
+    :param port (int): Port of the server.
+    :param database_configuration (dict[str, str]): TrustyAI database configuration, see `get_database_configuration`.
+    :param timeout (float): Connect, read and write timeout in seconds.
+    """
+    connection = pymysql.connect(
+        host=host,
+        port=port,
+        user=database_configuration["databaseUsername"],
+        password=database_configuration["databasePassword"],
+        database=database_configuration["databaseName"],
+        connect_timeout=timeout,
+        read_timeout=timeout,
+        write_timeout=timeout,
+    )
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT 1")
+    finally:
+        connection.close()
 
-        if matching_pods:
-            pod = matching_pods[0]
-            try:
-                remaining_time = timeout - (time() - start_time)
-                pod.wait_for_status(status=Pod.Status.RUNNING, timeout=remaining_time)
-                return
-            except TimeoutError:
-                raise TimeoutError(f"Timed out waiting for MariaDB pod {pod.name} to reach Running status")
-        else:
-            sleep(5)
 
+def wait_for_mysql_connection(
+    host: str, port: int, database_configuration: dict[str, str], timeout: float = 300
+) -> None:
+    """Retry `check_mysql_connection`, with exponential backoff, until it succeeds or `timeout` seconds passed."""
+    deadline = time() + timeout
+    delays = get_backoff_delays()
 
-def get_num_running_containers(pod, return_string=False):
-    """Gets the number of running containers in a pod. If return_string, will return it in the form running/total"""
-    containers = [1 if container["started"] else 0 for container in pod.exists.status["containerStatuses"]]
+    while True:
+        try:
+            check_mysql_connection(host=host, port=port, database_configuration=database_configuration)
+            logger.info(f"Connected to database {database_configuration['databaseName']} at {host}:{port}")
+            return
+        except pymysql.MySQLError as e:
+            remaining = deadline - time()
+            if remaining <= 0:
+                raise TimeoutError(f"Could not connect to the database at {host}:{port} after {timeout}s: {e}") from e
+            logger.debug(f"Database at {host}:{port} not ready yet: {e}")
+            sleep(min(next(delays), remaining))
 
-    if return_string:
-        return "{}/{}".format(sum(containers), len(containers))
-    else:
-        return sum(containers)
+
+def wait_for_mariadb_ready(mariadb: MariaDB, db_credentials: Secret, timeout: int = 300) -> None:
+    """
+    Wait until a MariaDB reports Ready and accepts the connections TrustyAI will open, i.e. its user can log in
+    to its database. The SQL handshake goes through a port-forward to the MariaDB pod, as its service is only
+    reachable from inside the cluster.
+
+    :param mariadb (MariaDB): MariaDB custom resource.
+    :param db_credentials (Secret): Database configuration secret of the TrustyAIService.
+    :param timeout (int): Maximum time to wait in seconds, for all the steps.
+    """
+    deadline = time() + timeout
+    resource_waiter.wait(
+        api_version=MARIADB_API_VERSION,
+        kind="MariaDB",
+        namespace=mariadb.namespace,
+        condition=lambda mariadbs: any(
+            resource.metadata.name == mariadb.name and is_resource_ready(resource=resource) for resource in mariadbs
+        ),
+        timeout=timeout,
+        pod_selector=MARIADB_POD_LABEL_SELECTOR,
+    )
+    pod = wait_for_mariadb_pods(mariadb=mariadb, timeout=max(deadline - time(), 0))
+
+    database_configuration = get_database_configuration(secret=db_credentials)
+    with PortForward(
+        namespace=mariadb.namespace, pod_name=pod.metadata.name, port=int(database_configuration["databasePort"])
+    ) as port_forward:
+        wait_for_mysql_connection(
+            host="127.0.0.1",
+            port=port_forward.local_port,
+            database_configuration=database_configuration,
+            timeout=max(deadline - time(), 0),
+        )
 
 
 def log_namespace_events(artifacts_dir, client, namespace, directory, subdirectories=None):
     """Log events in provided namespace to artifacts dir"""
     event_log = ""
-    for event in Event.get(dyn_client=client, namespace=namespace, timeout=3):
-        event_log += yaml.dump(event["raw_object"])
+    for event in informer_cache.list(namespace=namespace, api_version="v1", kind="Event"):
+        event_log += yaml.dump(event.to_dict())
         event_log += "\n\n"
 
     parent_path = os.path.join(artifacts_dir, directory, namespace)
@@ -845,16 +1256,18 @@ def log_namespace_pods(artifacts_dir, namespace, directory, subdirectories=None)
     if subdirectories:
         parent_path = os.path.join(parent_path, *subdirectories)
 
-    for pod in Pod.get(namespace=namespace, timeout=3):
-        subpath = os.path.join(parent_path, "pods", pod.name)
+    for pod in informer_cache.list(namespace=namespace, api_version="v1", kind="Pod"):
+        subpath = os.path.join(parent_path, "pods", pod.metadata.name)
 
         if not os.path.exists(subpath):
             os.makedirs(subpath)
 
-        with open(os.path.join(subpath, f"{pod.name}.yaml"), "w") as f:
-            f.write(yaml.dump(pod.instance.to_dict()))
+        with open(os.path.join(subpath, f"{pod.metadata.name}.yaml"), "w") as f:
+            f.write(yaml.dump(pod.to_dict()))
 
-        pod_status_log += fmt_str.format(pod.name, get_num_running_containers(pod), pod.status)
+        pod_status_log += fmt_str.format(
+            pod.metadata.name, get_num_started_containers(pod=pod), pod.status and pod.status.phase
+        )
 
     if not os.path.exists(parent_path):
         os.makedirs(parent_path)
@@ -873,28 +1286,29 @@ def log_namespace_logs(artifacts_dir, namespace, directory, subdirectories=None)
     if subdirectories:
         parent_path = os.path.join(parent_path, *subdirectories)
 
-    for pod in Pod.get(namespace=namespace, timeout=3):
+    for raw_pod in informer_cache.list(namespace=namespace, api_version="v1", kind="Pod"):
+        pod = Pod(name=raw_pod.metadata.name, namespace=namespace, client=informer_cache.client)
         subpath = os.path.join(parent_path, "pods", pod.name, "logs")
 
         if not os.path.exists(subpath):
             os.makedirs(subpath)
 
-        for container in pod.exists.status["containerStatuses"]:
-            with open(os.path.join(subpath, f"{container['name']}.log"), "w") as f:
-                f.write(pod.log(container=container["name"]))
+        for container in (raw_pod.status and raw_pod.status.containerStatuses) or []:
+            with open(os.path.join(subpath, f"{container.name}.log"), "w") as f:
+                f.write(pod.log(container=container.name))
 
     # restore the kubernetes rest client log level
     logger.setLevel(original_level)
 
 
-def per_test_artifacting_logic(request, client, subdirectories):
+def per_test_artifacting_logic(request, client, subdirectories, namespace="test-namespace"):
     test_name = request.node.name
     if os.environ.get("ARTIFACT_DIR"):
         artifact_dir = os.environ.get("ARTIFACT_DIR")
-        log_namespace_pods(artifact_dir, namespace="test-namespace", directory=test_name, subdirectories=subdirectories)
+        log_namespace_pods(artifact_dir, namespace=namespace, directory=test_name, subdirectories=subdirectories)
         log_namespace_events(
-            artifact_dir, client=client, namespace="test-namespace", directory=test_name, subdirectories=subdirectories
+            artifact_dir, client=client, namespace=namespace, directory=test_name, subdirectories=subdirectories
         )
-        log_namespace_logs(artifact_dir, namespace="test-namespace", directory=test_name, subdirectories=subdirectories)
+        log_namespace_logs(artifact_dir, namespace=namespace, directory=test_name, subdirectories=subdirectories)
     else:
         pass
@@ -0,0 +1,363 @@
+import logging
+import threading
+from time import time
+from typing import Any, Callable, List, Optional
+
+from trustyai_tests.tests.failures import (
+    ResourceFailure,
+    UnrecoverableResourceError,
+    classify_event,
+    classify_pod,
+    get_diagnostics,
+)
+from trustyai_tests.tests.informers import Informer, InformerCache, informer_cache, matches_label_selector
+
+logger: logging.Logger = logging.getLogger(__name__)
+
+WAIT_TIMEOUT_SECONDS: int = 60 * 20
+# Longest time between failure checks, for failures that show without a change, e.g. a pod unschedulable for too long
+FAILURE_CHECK_SECONDS: float = 30
+
+
+def is_resource_ready(resource: Any) -> bool:
+    """Whether a raw object has its Ready condition True, e.g. an InferenceService."""
+    if not resource.status:
+        return False
+
+    return any(
+        condition.type == "Ready" and condition.status == "True" for condition in resource.status.conditions or []
+    )
+
+
+def is_pod_running(pod: Any) -> bool:
+    return bool(pod.status) and pod.status.phase == "Running"
+
+
+def is_pod_ready(pod: Any) -> bool:
+    """Whether a raw Pod object is Running with its Ready condition True."""
+    return is_pod_running(pod=pod) and is_resource_ready(resource=pod)
+
+
+def is_terminating(resource: Any) -> bool:
+    return resource.metadata.deletionTimestamp is not None
+
+
+def get_num_started_containers(pod: Any) -> int:
+    """Number of started containers of a raw Pod object."""
+    container_statuses = (pod.status and pod.status.containerStatuses) or []
+    return sum(1 for container in container_statuses if container.started)
+
+
+class WaitCondition:
+    """
+    A condition on the resources of one kind in one namespace.
+
+    :param condition (Callable): Gets the current raw objects and returns a truthy value once the wait is over.
+    :param label_selector (str): Only pass the resources matching this label selector to the condition.
+    :param description (str): What the condition checks, for the logs and the timeout error.
+    :param fail_fast (bool): Give up as soon as a pod the condition depends on is in a terminal state, e.g. a bad
+        image or a crash loop, or can't be created. Only possible when those pods are given by `pod_selector`
+        or `pod_name`, which enables it by default.
+    :param pod_selector (str): Label selector of the pods the condition depends on. Defaults to the label selector
+        of Pod conditions.
+    :param pod_name (str): Part of the names of the pods the condition depends on, and of their controllers.
+    """
+
+    def __init__(
+        self,
+        api_version: str,
+        kind: str,
+        namespace: str,
+        condition: Callable[[List[Any]], Any],
+        label_selector: Optional[str] = None,
+        description: str = "ready",
+        fail_fast: Optional[bool] = None,
+        pod_selector: Optional[str] = None,
+        pod_name: Optional[str] = None,
+    ):
+        self.api_version = api_version
+        self.kind = kind
+        self.namespace = namespace
+        self.condition = condition
+        self.label_selector = label_selector
+        self.description = description
+        self.pod_selector = label_selector if pod_selector is None and kind == "Pod" else pod_selector
+        self.pod_name = pod_name
+
+        # Without them, the failures of any pod of the namespace would end the wait
+        knows_pods = self.pod_selector is not None or self.pod_name is not None
+        if fail_fast and not knows_pods:
+            raise ValueError(f"Can't fail fast waiting for {self} without the pods it depends on")
+        self.fail_fast = knows_pods if fail_fast is None else fail_fast
+
+    def __str__(self) -> str:
+        selector = f" {self.label_selector}" if self.label_selector else ""
+        return f"{self.kind}{selector} in namespace {self.namespace}"
+
+    def depends_on(self, name: str, labels: Optional[dict[str, str]]) -> bool:
+        """Whether the condition depends on a pod, or on the controller creating its pods, given its name and labels."""
+        return (self.pod_name is None or self.pod_name in name) and matches_label_selector(
+            labels=labels, label_selector=self.pod_selector
+        )
+
+
+class WaitTimeoutError(TimeoutError):
+    def __init__(self, pending: List[WaitCondition]):
+        self.pending = pending
+        waiting_for = "; ".join(f"{condition} to be {condition.description}" for condition in pending)
+        super().__init__(f"Timed out waiting for: {waiting_for}")
+
+
+class ResourceWaiter:
+    """
+    Waits for resources to reach a state without polling the API server.
+
+    Conditions are evaluated against the shared informer cache, and again on every change its watches
+    report, so a wait returns as soon as the API server reports the change.
+    """
+
+    def __init__(self, informers: InformerCache = informer_cache):
+        self.informers = informers
+
+    def wait_all(self, conditions: List[WaitCondition], deadline: float = None) -> List[Any]:
+        """
+        Wait until every condition held once, and return their results in order.
+
+        The conditions are evaluated together whenever any of their informers reports a change, so the wait
+        lasts as long as the slowest condition rather than the sum of them. A condition that held is not
+        evaluated again.
+
+        :param conditions (List[WaitCondition]): Conditions to wait for.
+        :param deadline (float): Time, as returned by `time.time()`, after which a WaitTimeoutError listing the
+            pending conditions is raised. None to wait forever.
+
+        Raises UnrecoverableResourceError, with a diagnostic bundle, as soon as a pending fail-fast condition
+        can't hold anymore.
+        """
+        informers = [
+            self.informers.get_informer(
+                namespace=condition.namespace, api_version=condition.api_version, kind=condition.kind
+            )
+            for condition in conditions
+        ]
+        # Started up front, so the failure checks don't call the API server while holding the lock
+        failure_informers = [
+            self.informers.get_informer(namespace=namespace, api_version="v1", kind=kind)
+            for namespace in {condition.namespace for condition in conditions if condition.fail_fast}
+            for kind in ("Pod", "Event")
+        ]
+        results: List[Any] = [None] * len(conditions)
+
+        # Only woken up by the informers this wait reads from. It's held while evaluating the conditions,
+        # so a change reported in between isn't missed.
+        changed = threading.Condition()
+        watched = set(informers + failure_informers)
+        for informer in watched:
+            informer.add_listener(changed)
+
+        try:
+            failed_namespace, failures = self._wait_for_conditions(
+                conditions=conditions, informers=informers, results=results, changed=changed, deadline=deadline
+            )
+        finally:
+            for informer in watched:
+                informer.remove_listener(changed)
+        if not failures:
+            return results
+
+        # The diagnostics fetch logs, so they're gathered after releasing the lock
+        diagnostics = get_diagnostics(
+            namespace=failed_namespace,
+            failures=failures,
+            pods=self.informers.list(namespace=failed_namespace, api_version="v1", kind="Pod"),
+            events=self.informers.list(namespace=failed_namespace, api_version="v1", kind="Event"),
+            client=self.informers.client,
+        )
+        raise UnrecoverableResourceError(namespace=failed_namespace, failures=failures, diagnostics=diagnostics)
+
+    def _wait_for_conditions(
+        self,
+        conditions: List[WaitCondition],
+        informers: List[Informer],
+        results: List[Any],
+        changed: threading.Condition,
+        deadline: Optional[float],
+    ) -> tuple[Optional[str], List[ResourceFailure]]:
+        """Fill `results` until every condition held, or return the failures of a fail-fast condition."""
+        with changed:
+            while True:
+                for index, (condition, informer) in enumerate(zip(conditions, informers)):
+                    if results[index]:
+                        continue
+                    results[index] = condition.condition(informer.list(label_selector=condition.label_selector))
+                    if results[index]:
+                        logger.info(f"{condition} is {condition.description}")
+
+                pending = [condition for condition, result in zip(conditions, results) if not result]
+                if not pending:
+                    return None, []
+
+                failed_namespace, failures = self._find_failures(conditions=pending)
+                if failures:
+                    return failed_namespace, failures
+
+                remaining = deadline - time() if deadline is not None else None
+                if remaining is not None and remaining <= 0:
+                    raise WaitTimeoutError(pending=pending)
+                logger.debug(
+                    f"Waiting for {len(pending)} condition(s), e.g. {pending[0]} to be {pending[0].description}"
+                )
+                if any(condition.fail_fast for condition in pending):
+                    remaining = (
+                        min(remaining, FAILURE_CHECK_SECONDS) if remaining is not None else FAILURE_CHECK_SECONDS
+                    )
+                changed.wait(timeout=remaining)
+
+    def _find_failures(self, conditions: List[WaitCondition]) -> tuple[Optional[str], List[ResourceFailure]]:
+        """The first namespace where pods or events show that a fail-fast condition can't hold, and the failures."""
+        for condition in conditions:
+            if not condition.fail_fast:
+                continue
+
+            pods = self.informers.list(
+                namespace=condition.namespace, api_version="v1", kind="Pod", label_selector=condition.pod_selector
+            )
+            events = self.informers.list(namespace=condition.namespace, api_version="v1", kind="Event")
+            failures = [
+                failure
+                for pod in pods
+                if condition.depends_on(name=pod.metadata.name, labels=pod.metadata.labels)
+                for failure in classify_pod(pod=pod)
+            ]
+            failures += [
+                failure
+                for event in events
+                if (failure := classify_event(event=event)) is not None
+                and self._depends_on_controller(condition=condition, event=event)
+            ]
+            if failures:
+                return condition.namespace, failures
+
+        return None, []
+
+    def _depends_on_controller(self, condition: WaitCondition, event: Any) -> bool:
+        """
+        Whether a condition depends on the pods of the controller an event is about, e.g. the ReplicaSet failing
+        to create them. Deployments label their ReplicaSets like their pods, so pod selectors match them too.
+        """
+        involved_object = event.involvedObject
+        labels = None
+        if condition.pod_selector is not None:
+            # Only reached when the controller has kept failing for a while, so its informer is rarely started
+            try:
+                controller = self.informers.get_informer(
+                    namespace=condition.namespace, api_version=involved_object.apiVersion, kind=involved_object.kind
+                ).get(name=involved_object.name)
+            except Exception as e:
+                logger.debug(f"Could not get {involved_object.kind} {involved_object.name}: {e}")
+                return False
+            if controller is None:
+                return False
+            labels = controller.metadata.labels
+
+        return condition.depends_on(name=involved_object.name, labels=labels)
+
+    def wait(
+        self,
+        api_version: str,
+        kind: str,
+        namespace: str,
+        condition: Callable[[list[Any]], Any],
+        label_selector: Optional[str] = None,
+        timeout: float = WAIT_TIMEOUT_SECONDS,
+        description: str = "ready",
+        pod_selector: Optional[str] = None,
+    ) -> Any:
+        """
+        Wait until a condition holds on the current set of resources of a kind, and return its result.
+
+        :param api_version (str): API version of the resources, e.g. v1.
+        :param kind (str): Kind of the resources, e.g. Pod.
+        :param namespace (str): Namespace of the resources.
+        :param condition (Callable): Gets the current raw objects and returns a truthy value once the wait is over.
+        :param label_selector (str): Only consider the resources matching this label selector.
+        :param timeout (float): Maximum time to wait in seconds.
+        :param description (str): What the condition checks, for the logs and the timeout error.
+        :param pod_selector (str): Label selector of the pods the resources depend on, to give up as soon as one
+            of them fails. Defaults to `label_selector` when waiting for pods.
+        """
+        wait_condition = WaitCondition(
+            api_version=api_version,
+            kind=kind,
+            namespace=namespace,
+            condition=condition,
+            label_selector=label_selector,
+            description=description,
+            pod_selector=pod_selector,
+        )
+        return self.wait_all(conditions=[wait_condition], deadline=time() + timeout)[0]
+
+    def wait_for_pod(
+        self,
+        namespace: str,
+        label_selector: str,
+        predicate: Callable[[Any], bool],
+        timeout: float = WAIT_TIMEOUT_SECONDS,
+        description: str = "ready",
+    ) -> Any:
+        """Wait for a pod matching a label selector to satisfy a predicate, and return its raw object."""
+        return self.wait(
+            api_version="v1",
+            kind="Pod",
+            namespace=namespace,
+            condition=lambda pods: next((pod for pod in pods if predicate(pod)), None),
+            label_selector=label_selector,
+            timeout=timeout,
+            description=description,
+        )
+
+    def wait_for_ready_pod(self, namespace: str, label_selector: str, timeout: float = WAIT_TIMEOUT_SECONDS) -> Any:
+        """Wait for a pod matching a label selector to be Running and Ready, and return its raw object."""
+        return self.wait_for_pod(
+            namespace=namespace, label_selector=label_selector, predicate=is_pod_ready, timeout=timeout
+        )
+
+    def wait_for_all(
+        self,
+        api_version: str,
+        kind: str,
+        namespace: str,
+        predicate: Callable[[Any], bool],
+        label_selector: Optional[str] = None,
+        allow_empty: bool = False,
+        timeout: float = WAIT_TIMEOUT_SECONDS,
+        description: str = "ready",
+        pod_selector: Optional[str] = None,
+    ) -> list[Any]:
+        """
+        Wait for every resource of a kind that isn't being deleted to satisfy a predicate, and return them.
+
+        :param allow_empty (bool): Also return when there is no such resource. Otherwise wait for at least one.
+        :param pod_selector (str): Label selector of the pods the resources depend on, as for `wait`.
+        """
+
+        def condition(resources: list[Any]) -> Optional[list[Any]]:
+            resources = [resource for resource in resources if not is_terminating(resource=resource)]
+            if not resources and not allow_empty:
+                return None
+            # An empty list is falsy, so it's returned wrapped until the caller unpacks it
+            return [resources] if all(predicate(resource) for resource in resources) else None
+
+        return self.wait(
+            api_version=api_version,
+            kind=kind,
+            namespace=namespace,
+            condition=condition,
+            label_selector=label_selector,
+            timeout=timeout,
+            description=description,
+            pod_selector=pod_selector,
+        )[0]
+
+
+resource_waiter = ResourceWaiter()